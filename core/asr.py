@@ -0,0 +1,278 @@
+"""
+Speech recognition backends
+
+VoiceRecognition talks to one ASRBackend. Every backend takes a
+speech_recognition AudioData plus a language code, returns an ASRResult
+(text and confidence), and raises the usual speech_recognition exceptions:
+UnknownValueError when nothing was understood, RequestError when the engine
+itself failed. Each backend records its own recognition latency.
+
+    google  - Google Web Speech API (network round trip per phrase)
+    whisper - local CPU engine (faster-whisper / CTranslate2, whisper.cpp-style
+              quantized models), model loaded once and kept in memory
+"""
+import json
+import math
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import speech_recognition as sr
+from utils.config import config
+from utils.metrics import LatencyStats
+from utils.storage import storage
+
+WHISPER_AVAILABLE = False
+try:
+    import numpy as np
+    from faster_whisper import WhisperModel
+    WHISPER_AVAILABLE = True
+except ImportError:
+    pass  # faster-whisper not installed, local recognition unavailable
+
+
+SAMPLE_RATE = 16000
+
+
+class ASRResult:
+    """One recognition hypothesis"""
+
+    __slots__ = ('text', 'language', 'confidence', 'backend', 'latency_ms')
+
+    def __init__(self, text, language, confidence, backend, latency_ms):
+        self.text = text
+        self.language = language
+        self.confidence = confidence
+        self.backend = backend
+        self.latency_ms = latency_ms
+
+    def __repr__(self):
+        return (f"ASRResult({self.text!r}, {self.language}, confidence={self.confidence:.2f}, "
+                f"{self.backend}, {self.latency_ms:.0f} ms)")
+
+
+class ASRBackend:
+    """Base class: timing and result wrapping around _recognize"""
+
+    name = 'base'
+    local = False  # runs on this machine (cheap enough for interim results)
+
+    def __init__(self):
+        self.latency = LatencyStats(f"ASR {self.name}")
+
+    def recognize(self, audio, language='tr-TR'):
+        """Recognize AudioData in language ('tr-TR', 'en-US', ...)"""
+        started = time.perf_counter()
+        try:
+            text, confidence = self._recognize(audio, language)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.latency.record(elapsed)
+        if not text:
+            raise sr.UnknownValueError()
+        return ASRResult(text, language.split('-')[0], confidence, self.name, elapsed)
+
+    def _recognize(self, audio, language):
+        """(text, confidence 0..1) for audio; empty text if nothing was understood"""
+        raise NotImplementedError
+
+
+class GoogleBackend(ASRBackend):
+    """Google Web Speech API through speech_recognition"""
+
+    name = 'google'
+
+    def __init__(self, recognizer=None):
+        super().__init__()
+        self.recognizer = recognizer or sr.Recognizer()
+
+    def _recognize(self, audio, language):
+        result = self.recognizer.recognize_google(audio, language=language, with_confidence=True)
+        if isinstance(result, tuple):
+            return result
+        return result, 0.5
+
+
+class WhisperBackend(ASRBackend):
+    """
+    Local Whisper inference on the CPU.
+
+    threads and beam_size trade accuracy for latency: beam_size=1 is greedy
+    decoding (fastest), 5 is Whisper's default. The model is loaded on first
+    use and then kept for the life of the process.
+    """
+
+    name = 'whisper'
+    local = True
+
+    def __init__(self, model='small', threads=4, beam_size=1, compute_type='int8', workers=2):
+        super().__init__()
+        if not WHISPER_AVAILABLE:
+            raise RuntimeError("faster-whisper is not installed")
+        self.model_name = model
+        self.threads = threads
+        self.beam_size = beam_size
+        self.compute_type = compute_type
+        # Parallel transcriptions the model accepts (e.g. both languages at once)
+        self.workers = workers
+        self._model = None
+        self._load_lock = threading.Lock()
+
+    def load(self):
+        """Load the model now (otherwise on first recognition)"""
+        with self._load_lock:
+            if self._model is None:
+                started = time.perf_counter()
+                self._model = WhisperModel(self.model_name, device='cpu', compute_type=self.compute_type,
+                                           cpu_threads=self.threads, num_workers=self.workers)
+                print(f"Whisper model '{self.model_name}' loaded in {time.perf_counter() - started:.1f} s")
+        return self._model
+
+    def _recognize(self, audio, language):
+        model = self._model or self.load()
+        pcm = audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=2)
+        samples = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+        try:
+            segments, _ = model.transcribe(samples, language=language.split('-')[0],
+                                           beam_size=self.beam_size, condition_on_previous_text=False)
+            segments = list(segments)
+        except Exception as e:
+            raise sr.RequestError(f"Whisper recognition failed: {e}")
+        segments = [s for s in segments if s.text.strip() and s.no_speech_prob < 0.6]
+        if not segments:
+            return '', 0.0
+        text = ' '.join(s.text.strip() for s in segments)
+        # Mean token log-probability as a 0..1 confidence
+        confidence = math.exp(sum(s.avg_logprob for s in segments) / len(segments))
+        return text, confidence
+
+
+class LanguagePriors:
+    """
+    Per-user language usage learned from recognized commands.
+
+    prior(lang) is the smoothed share of past commands in that language, so
+    a user who mostly speaks Turkish needs a clearly better English
+    hypothesis before English wins. Counts persist in the storage meta table.
+    """
+
+    SAVE_EVERY = 5
+
+    def __init__(self, languages, user=None):
+        self.languages = [language.split('-')[0] for language in languages]
+        self.user = user or config.get('user.name', 'default')
+        self._lock = threading.Lock()
+        self._unsaved = 0
+        self.counts = {language: 0 for language in self.languages}
+        try:
+            saved = json.loads(storage.get_meta(self._meta_key, '{}'))
+            self.counts.update({k: v for k, v in saved.items() if k in self.counts})
+        except Exception as e:
+            print(f"Error loading language priors: {e}")
+
+    @property
+    def _meta_key(self):
+        return f"asr.language_counts.{self.user}"
+
+    def prior(self, language):
+        total = sum(self.counts.values())
+        return (self.counts.get(language, 0) + 1) / (total + len(self.counts))
+
+    def observe(self, language):
+        with self._lock:
+            if language not in self.counts:
+                return
+            self.counts[language] += 1
+            self._unsaved += 1
+            if self._unsaved < self.SAVE_EVERY:
+                return
+            self._unsaved = 0
+            data = json.dumps(self.counts)
+        try:
+            storage.set_meta(self._meta_key, data)
+        except Exception as e:
+            print(f"Error saving language priors: {e}")
+
+
+class MultiLanguageRecognizer:
+    """
+    Runs one recognition per language concurrently and keeps the most likely one.
+
+    Hypotheses are scored by log(confidence) + log(prior), so worst-case
+    latency is one recognition instead of one per language tried in turn.
+    learn=False keeps the priors fixed (benchmarks, tests).
+    """
+
+    def __init__(self, backend, languages=('tr-TR', 'en-US'), learn=True):
+        self.backend = backend
+        self.languages = list(languages)
+        self.learn = learn
+        self.priors = LanguagePriors(self.languages)
+        self._pool = ThreadPoolExecutor(max_workers=len(self.languages), thread_name_prefix="ASR")
+
+    def _score(self, result):
+        return math.log(max(result.confidence, 1e-3)) + math.log(self.priors.prior(result.language))
+
+    def recognize(self, audio):
+        """Best ASRResult over all languages; raises like ASRBackend.recognize"""
+        if len(self.languages) == 1:
+            result = self.backend.recognize(audio, self.languages[0])
+            if self.learn:
+                self.priors.observe(result.language)
+            return result
+
+        futures = [self._pool.submit(self.backend.recognize, audio, language) for language in self.languages]
+        results = []
+        error = None
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except sr.UnknownValueError:
+                pass
+            except sr.RequestError as e:
+                error = e
+        if not results:
+            raise error or sr.UnknownValueError()
+        best = max(results, key=self._score)
+        if self.learn:
+            self.priors.observe(best.language)
+        return best
+
+    def recognize_partial(self, audio):
+        """
+        Interim hypothesis for a phrase still being spoken: only the language
+        the user most likely speaks, and nothing is learned from it
+        """
+        language = max(self.languages, key=lambda code: self.priors.prior(code.split('-')[0]))
+        return self.backend.recognize(audio, language)
+
+    def close(self):
+        """Release the recognition threads"""
+        self._pool.shutdown(wait=False)
+
+
+def partials_enabled(backend):
+    """Whether to recognize phrases while they are spoken, per config 'asr.partials'"""
+    setting = config.get('asr.partials', 'auto')
+    if setting == 'auto':
+        # One request per interim result is too much for a network service
+        return backend.local
+    return setting is True  # validate_config allows only true, false and "auto"
+
+
+def create_backend(recognizer=None, name=None):
+    """Backend from config 'asr.backend' ('google', 'whisper' or 'auto')"""
+    name = name or config.get('asr.backend', 'google')
+    if name in ('whisper', 'auto'):
+        if WHISPER_AVAILABLE:
+            try:
+                return WhisperBackend(
+                    model=config.get('asr.whisper.model', 'small'),
+                    threads=config.get('asr.whisper.threads', 4),
+                    beam_size=config.get('asr.whisper.beam_size', 1),
+                    compute_type=config.get('asr.whisper.compute_type', 'int8'),
+                )
+            except Exception as e:
+                print(f"Local recognition unavailable, using Google: {e}")
+        elif name == 'whisper':
+            print("faster-whisper is not installed, using Google recognition")
+    return GoogleBackend(recognizer)
@@ -0,0 +1,181 @@
+"""
+Continuous microphone capture into a preallocated ring buffer
+
+A capture thread reads the microphone without pause and writes into one
+int16 ring buffer addressed by absolute sample positions. Readers (the VAD,
+recognition) keep their own positions and take zero-copy views of the
+buffer, so segmentation and recognition can run as slowly as they need to
+while capture never stops: a follow-up command spoken during recognition
+is already in the buffer, first syllable included, when the reader gets
+back to it. Only a reader falling more than the buffer length behind loses
+audio, and that is counted. Sources that are not live (files) are captured
+losslessly instead: the writer waits for the reader to release old audio.
+"""
+import threading
+import numpy as np
+
+
+BUFFER_SECONDS = 20.0
+# Region just ahead of the writer that readers may not see (it can be mid-overwrite)
+GUARD_SECONDS = 0.1
+
+# Shared header fields (int64): samples written, sample rate, writer generation
+HEADER_FIELDS = 3
+_WRITTEN, _SAMPLE_RATE, _GENERATION = range(HEADER_FIELDS)
+
+
+class AudioRingBuffer:
+    """
+    Single-writer, multi-reader ring of int16 samples.
+
+    storage=(header, ring) places the buffer in caller-provided int64 and
+    int16 arrays, e.g. views of shared memory, so readers in another process
+    can attach() to it. Creating a buffer on storage makes it the writer and
+    bumps the generation, which tells attached readers to start over.
+    """
+
+    def __init__(self, sample_rate, seconds=BUFFER_SECONDS, lossless=False, storage=None):
+        if storage is None:
+            storage = (np.zeros(HEADER_FIELDS, dtype=np.int64),
+                       np.zeros(int(sample_rate * seconds), dtype=np.int16))
+        self._header, self._ring = storage
+        self._header[_WRITTEN] = 0
+        self._header[_SAMPLE_RATE] = sample_rate
+        self._header[_GENERATION] += 1
+        self._init(sample_rate, lossless)
+
+    def _init(self, sample_rate, lossless):
+        self.sample_rate = sample_rate
+        self.lossless = lossless
+        self.released = 0  # lossless: position before which the reader needs nothing
+        self._guard = int(sample_rate * GUARD_SECONDS)
+        self.closed = False  # no more audio will be written
+        self._cond = threading.Condition()
+
+    @classmethod
+    def attach(cls, header, ring):
+        """Read-only view of a buffer written elsewhere (see storage)"""
+        buffer = cls.__new__(cls)
+        buffer._header, buffer._ring = header, ring
+        buffer._init(int(header[_SAMPLE_RATE]), False)
+        return buffer
+
+    @property
+    def written(self):
+        """Absolute position of the next sample"""
+        return int(self._header[_WRITTEN])
+
+    @property
+    def generation(self):
+        return int(self._header[_GENERATION])
+
+    @property
+    def capacity(self):
+        """Samples a reader may fall behind before audio is lost"""
+        return len(self._ring) - self._guard
+
+    @property
+    def oldest(self):
+        """Oldest absolute position still readable"""
+        return max(0, self.written - self.capacity)
+
+    def write(self, data):
+        """Append raw PCM bytes (or int16 samples)"""
+        samples = np.frombuffer(data, dtype=np.int16) if isinstance(data, (bytes, bytearray)) else data
+        size = len(self._ring)
+        if len(samples) > size:
+            samples = samples[-size:]
+        if self.lossless:
+            with self._cond:
+                self._cond.wait_for(lambda: self.written + len(samples) - self.released <= self.capacity
+                                    or self.closed)
+        offset = self.written % size
+        first = min(len(samples), size - offset)
+        self._ring[offset:offset + first] = samples[:first]
+        self._ring[:len(samples) - first] = samples[first:]
+        with self._cond:
+            self._header[_WRITTEN] += len(samples)
+            self._cond.notify_all()
+
+    def wait(self, position, timeout=None):
+        """Block until audio beyond position has been written; True if it has"""
+        with self._cond:
+            self._cond.wait_for(lambda: self.written > position or self.closed, timeout)
+            return self.written > position
+
+    def release(self, position):
+        """Reader no longer needs audio before position (lossless mode)"""
+        if self.lossless and position > self.released:
+            with self._cond:
+                self.released = position
+                self._cond.notify_all()
+
+    def close(self):
+        """Mark the end of the audio and wake readers"""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def view(self, start, end):
+        """
+        Samples of the absolute range [start, end), clipped to what is still
+        held. A view into the buffer unless the range wraps around its end,
+        so copy it (tobytes) before handing it to code that keeps it.
+        """
+        size = len(self._ring)
+        start = max(start, self.oldest)
+        end = min(end, self.written)
+        if end <= start:
+            return self._ring[:0]
+        offset = start % size
+        count = end - start
+        if offset + count <= size:
+            return self._ring[offset:offset + count]
+        return np.concatenate((self._ring[offset:], self._ring[:offset + count - size]))
+
+
+class CaptureThread:
+    """
+    Reads an open speech_recognition source into an AudioRingBuffer until
+    stopped. A source that runs out (EOFError, e.g. a file) closes the buffer.
+    meter: a core.level_meter.LevelMeter to publish input levels to.
+    """
+
+    def __init__(self, source, buffer, meter=None):
+        self.source = source
+        self.buffer = buffer
+        self.meter = meter
+        self.error = None
+        self.finished = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="AudioCapture")
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.buffer.write(self.source.stream.read(self.source.CHUNK))
+                if self.meter is not None:
+                    self.meter.publish(self.buffer)
+            except EOFError:
+                self.finished = True
+                self.buffer.close()
+                return
+            except Exception as e:
+                self.error = e
+                break
+        # Wake readers so they notice the capture ended
+        with self.buffer._cond:
+            self.buffer._cond.notify_all()
+
+    @property
+    def alive(self):
+        return self._thread.is_alive()
+
+    def stop(self, timeout=1.0):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
@@ -0,0 +1,315 @@
+"""
+Persistent PCM audio output
+
+TTS backends write decoded signed 16-bit PCM into one long-lived sink. The
+sink keeps a queue of references to the callers' buffers (no copies until
+the audio reaches the device), plays them back to back without gaps and
+reports completion of each buffer through a callback once it has been
+played. No temporary files are involved.
+
+Sinks:
+    DeviceSink  - PyAudio callback stream on the default output device
+    NullSink    - discards audio (optionally at real-time pace), for headless runs
+    WavFileSink - writes everything played into a WAV file, for tests
+"""
+import time
+import wave
+import queue
+import threading
+from collections import deque
+
+PYAUDIO_AVAILABLE = False
+try:
+    import pyaudio
+    PYAUDIO_AVAILABLE = True
+except ImportError:
+    pass  # PyAudio not available, no device output
+
+
+SAMPLE_WIDTH = 2  # signed 16-bit little-endian
+# Audio queued ahead of the device; bounds both memory and how long a flush takes to be heard
+BUFFER_AHEAD = 0.1
+PERIOD = 0.02  # seconds of audio per device callback / sink pull
+
+
+class _Dispatcher:
+    """Runs completion callbacks off the audio thread, at their due time"""
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="AudioCallbacks")
+        self._thread.start()
+
+    def post(self, callback, completed, due=None):
+        self._queue.put((due, callback, completed))
+
+    def _run(self):
+        while True:
+            due, callback, completed = self._queue.get()
+            if due is not None:
+                delay = due - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            try:
+                callback(completed)
+            except Exception as e:
+                print(f"Error in audio completion callback: {e}")
+
+
+class AudioSink:
+    """Gapless queue of PCM buffers consumed by a device or a sink thread"""
+
+    def __init__(self, sample_rate=22050, channels=1):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self._buffers = deque()  # [memoryview, offset, on_done]
+        self._queued = 0  # bytes not yet consumed
+        self._cond = threading.Condition()
+        self._dispatcher = _Dispatcher()
+        self.frames_played = 0
+
+    @property
+    def frame_size(self):
+        return SAMPLE_WIDTH * self.channels
+
+    def _bytes_for(self, seconds):
+        return int(self.sample_rate * seconds) * self.frame_size
+
+    # Producer side
+
+    def enqueue(self, data, on_done=None):
+        """
+        Queue PCM for playback right after what is already queued.
+
+        The buffer is referenced, not copied, so it must not be modified
+        afterwards. on_done(completed) runs once it has been played
+        (completed=True) or flushed (completed=False).
+        """
+        view = memoryview(data).cast('B')
+        if not len(view):
+            if on_done:
+                self._dispatcher.post(on_done, True)
+            return
+        with self._cond:
+            self._buffers.append([view, 0, on_done])
+            self._queued += len(view)
+            self._cond.notify_all()
+
+    def write(self, data, sample_rate=None, channels=None, should_stop=None):
+        """
+        Queue PCM and block while more than BUFFER_AHEAD is waiting (backpressure).
+
+        Returns False if should_stop() became true while waiting.
+        """
+        self.set_format(sample_rate or self.sample_rate, channels or self.channels)
+        limit = self._bytes_for(BUFFER_AHEAD)
+        with self._cond:
+            while self._queued > limit:
+                if should_stop and should_stop():
+                    return False
+                self._cond.wait(PERIOD)
+        if should_stop and should_stop():
+            return False
+        self.enqueue(data)
+        return True
+
+    def set_format(self, sample_rate, channels):
+        """Switch format; queued audio in the old format is played out first"""
+        if (sample_rate, channels) == (self.sample_rate, self.channels):
+            return
+        self.drain()
+        self._reopen(sample_rate, channels)
+
+    def _reopen(self, sample_rate, channels):
+        self.sample_rate = sample_rate
+        self.channels = channels
+
+    def flush(self):
+        """Drop all queued audio at once (e.g. on barge-in); returns bytes dropped"""
+        with self._cond:
+            dropped = self._queued
+            for _, _, on_done in self._buffers:
+                if on_done:
+                    self._dispatcher.post(on_done, False)
+            self._buffers.clear()
+            self._queued = 0
+            self._cond.notify_all()
+        return dropped
+
+    def drain(self, timeout=None):
+        """Wait until everything queued has been consumed; True if it was"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queued:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining if remaining is not None else PERIOD * 5)
+        time.sleep(self.latency())
+        return True
+
+    def pending_seconds(self):
+        return self._queued / (self.sample_rate * self.frame_size)
+
+    def latency(self):
+        """Seconds between consuming audio and hearing it"""
+        return 0.0
+
+    # Consumer side
+
+    def _pull(self, nbytes):
+        """Exactly nbytes of queued audio, padded with silence when starved"""
+        out = bytearray(nbytes)
+        filled = 0
+        finished = []
+        with self._cond:
+            while filled < nbytes and self._buffers:
+                entry = self._buffers[0]
+                view, offset, on_done = entry
+                take = min(nbytes - filled, len(view) - offset)
+                out[filled:filled + take] = view[offset:offset + take]
+                filled += take
+                entry[1] = offset + take
+                if entry[1] == len(view):
+                    self._buffers.popleft()
+                    if on_done:
+                        finished.append(on_done)
+            self._queued -= filled
+            self._cond.notify_all()
+        self.frames_played += filled // self.frame_size
+        due = time.monotonic() + self.latency() + filled / (self.sample_rate * self.frame_size)
+        for on_done in finished:
+            self._dispatcher.post(on_done, True, due)
+        return out, filled
+
+    def close(self):
+        self.flush()
+
+
+class DeviceSink(AudioSink):
+    """Persistent PyAudio callback stream; silence is played while idle"""
+
+    def __init__(self, sample_rate=22050, channels=1):
+        if not PYAUDIO_AVAILABLE:
+            raise RuntimeError("PyAudio not available for audio output")
+        super().__init__(sample_rate, channels)
+        self._pa = pyaudio.PyAudio()
+        self._stream = None
+        self._reopen(sample_rate, channels)
+
+    def _reopen(self, sample_rate, channels):
+        if self._stream is not None:
+            self._stream.stop_stream()
+            self._stream.close()
+        super()._reopen(sample_rate, channels)
+        self._stream = self._pa.open(format=pyaudio.paInt16, channels=channels, rate=sample_rate,
+                                     output=True, frames_per_buffer=int(sample_rate * PERIOD),
+                                     stream_callback=self._callback)
+        self._stream.start_stream()
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        data, _ = self._pull(frame_count * self.frame_size)
+        return bytes(data), pyaudio.paContinue
+
+    def latency(self):
+        try:
+            return self._stream.get_output_latency()
+        except Exception:
+            return 0.0
+
+    def close(self):
+        super().close()
+        if self._stream is not None:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+        self._pa.terminate()
+
+
+class _ThreadedSink(AudioSink):
+    """Sink consumed by its own thread, PERIOD at a time"""
+
+    def __init__(self, sample_rate=22050, channels=1, realtime=False):
+        super().__init__(sample_rate, channels)
+        self.realtime = realtime
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True, name=type(self).__name__)
+        self._thread.start()
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while not self._closed:
+            with self._cond:
+                while not self._queued and not self._closed:
+                    self._cond.wait()
+            if self._closed:
+                break
+            data, filled = self._pull(self._bytes_for(PERIOD))
+            if filled:
+                self._consume(memoryview(data)[:filled])
+            if self.realtime:
+                next_tick += PERIOD
+                delay = next_tick - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_tick = time.monotonic()
+
+    def _consume(self, data):
+        pass
+
+    def close(self):
+        super().close()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class NullSink(_ThreadedSink):
+    """Discards audio; realtime=True paces it like a device"""
+
+
+class WavFileSink(_ThreadedSink):
+    """Writes the played audio into a WAV file"""
+
+    def __init__(self, path, sample_rate=22050, channels=1, realtime=False):
+        self.path = path
+        self._wav = None
+        self._open_wav(sample_rate, channels)
+        super().__init__(sample_rate, channels, realtime)
+
+    def _open_wav(self, sample_rate, channels):
+        self._wav = wave.open(str(self.path), 'wb')
+        self._wav.setnchannels(channels)
+        self._wav.setsampwidth(SAMPLE_WIDTH)
+        self._wav.setframerate(sample_rate)
+
+    def _reopen(self, sample_rate, channels):
+        # A WAV file holds a single format, so a format change starts the file over
+        self._wav.close()
+        super()._reopen(sample_rate, channels)
+        self._open_wav(sample_rate, channels)
+
+    def _consume(self, data):
+        self._wav.writeframes(data)
+
+    def close(self):
+        self.drain()
+        super().close()
+        self._wav.close()
+
+
+def create_sink(spec='device', sample_rate=22050, channels=1):
+    """
+    Sink for a config spec: 'device', 'null', 'null:realtime' or 'file:<path.wav>'.
+    Falls back to a real-time NullSink when no output device is available.
+    """
+    if spec.startswith('file:'):
+        return WavFileSink(spec[5:], sample_rate, channels)
+    if spec.startswith('null'):
+        return NullSink(sample_rate, channels, realtime=spec == 'null:realtime')
+    try:
+        return DeviceSink(sample_rate, channels)
+    except Exception as e:
+        print(f"Audio output device unavailable, discarding audio: {e}")
+        return NullSink(sample_rate, channels, realtime=True)
@@ -0,0 +1,161 @@
+"""
+Audio sources for the listen loop
+
+VoiceRecognition reads any speech_recognition-style AudioSource: an object
+that, once entered, has SAMPLE_RATE, SAMPLE_WIDTH, CHUNK and a stream with
+read(frames). Besides the microphone, recorded audio can be fed through the
+exact same capture, segmentation and recognition path:
+
+    ScriptedSource([1.0, "a.wav", 0.8, "b.wav", 1.0])
+        WAV files (resampled to mono 16 kHz) separated by silence gaps given
+        in seconds; numpy arrays of int16 samples are accepted as well
+    ScriptedSource.from_directory("recordings/", gap=1.0)
+        every WAV file of a directory, in name order
+
+The source ends with EOFError from read(). segments lists where each
+scripted utterance lies (absolute sample positions), for benchmarks.
+"""
+import time
+import wave
+import audioop
+from pathlib import Path
+import numpy as np
+import speech_recognition as sr
+
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+CHUNK = 1024
+
+
+def load_wav(path, sample_rate=SAMPLE_RATE):
+    """Mono 16-bit samples of a WAV file at sample_rate"""
+    with wave.open(str(path), 'rb') as wav:
+        data = wav.readframes(wav.getnframes())
+        width, channels, rate = wav.getsampwidth(), wav.getnchannels(), wav.getframerate()
+    if width != SAMPLE_WIDTH:
+        data = audioop.lin2lin(data, width, SAMPLE_WIDTH)
+    if channels == 2:
+        data = audioop.tomono(data, SAMPLE_WIDTH, 0.5, 0.5)
+    elif channels != 1:
+        raise ValueError(f"{path}: {channels} channels not supported")
+    if rate != sample_rate:
+        data, _ = audioop.ratecv(data, SAMPLE_WIDTH, 1, rate, sample_rate, None)
+    return np.frombuffer(data, dtype=np.int16)
+
+
+def _speech_end(samples, frame=320):
+    """Length of samples without trailing silence (frame RMS below 1/20 of the peak)"""
+    count = len(samples) // frame
+    if not count:
+        return len(samples)
+    frames = samples[:count * frame].reshape(count, frame).astype(np.float32)
+    energy = np.sqrt((frames ** 2).mean(axis=1))
+    active = np.flatnonzero(energy > energy.max() / 20)
+    return (active[-1] + 1) * frame if len(active) else len(samples)
+
+
+class Segment:
+    """Where one scripted utterance lies in the source"""
+
+    __slots__ = ('label', 'start', 'end', 'speech_end')
+
+    def __init__(self, label, start, end, speech_end=None):
+        self.label = label
+        self.start = start
+        self.end = end
+        self.speech_end = end if speech_end is None else speech_end  # end without trailing silence
+
+    def __repr__(self):
+        return f"Segment({self.label!r}, {self.start}, {self.end})"
+
+
+class _ScriptStream:
+    def __init__(self, source):
+        self._source = source
+
+    def read(self, size):
+        return self._source._read(size)
+
+    def close(self):
+        pass
+
+
+class ScriptedSource(sr.AudioSource):
+    """
+    Recorded utterances and silence gaps played as if from a microphone.
+
+    realtime=True paces reads like a device; otherwise they return at once.
+    noise adds Gaussian background noise of that RMS to the whole stream.
+    """
+
+    def __init__(self, script, sample_rate=SAMPLE_RATE, chunk=CHUNK, realtime=False, noise=0.0, seed=0):
+        self.SAMPLE_RATE = sample_rate
+        self.SAMPLE_WIDTH = SAMPLE_WIDTH
+        self.CHUNK = chunk
+        self.realtime = realtime
+        # Not live unless paced: capture may then wait for the reader instead of dropping audio
+        self.live = realtime
+        self.segments = []
+        parts = []
+        position = 0
+        for item in script:
+            if isinstance(item, (int, float)):
+                samples = np.zeros(int(item * sample_rate), dtype=np.int16)
+            else:
+                label, samples = self._utterance(item, sample_rate)
+                self.segments.append(Segment(label, position, position + len(samples),
+                                             position + _speech_end(samples)))
+            parts.append(samples)
+            position += len(samples)
+        self._audio = np.concatenate(parts) if parts else np.zeros(0, dtype=np.int16)
+        if noise:
+            noisy = self._audio + np.random.default_rng(seed).normal(0, noise, len(self._audio))
+            self._audio = np.clip(noisy, -32768, 32767).astype(np.int16)
+        self.stream = None
+        self.position = 0
+        self.started = None  # monotonic time the stream was opened
+
+    @staticmethod
+    def _utterance(item, sample_rate):
+        if isinstance(item, tuple):
+            label, samples = item
+            return label, np.asarray(samples, dtype=np.int16)
+        if isinstance(item, np.ndarray):
+            return None, item.astype(np.int16, copy=False)
+        path = Path(item)
+        return path.stem, load_wav(path, sample_rate)
+
+    @classmethod
+    def from_directory(cls, directory, gap=1.0, **options):
+        files = sorted(Path(directory).glob('*.wav'))
+        if not files:
+            raise FileNotFoundError(f"no WAV files in {directory}")
+        script = [gap]
+        for path in files:
+            script += [path, gap]
+        return cls(script, **options)
+
+    @property
+    def duration(self):
+        return len(self._audio) / self.SAMPLE_RATE
+
+    def __enter__(self):
+        self.position = 0
+        self.started = time.monotonic()
+        self.stream = _ScriptStream(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream = None
+
+    def _read(self, size):
+        if self.position >= len(self._audio):
+            raise EOFError("end of scripted audio")
+        data = self._audio[self.position:self.position + size]
+        self.position += len(data)
+        if self.realtime:
+            delay = self.started + self.position / self.SAMPLE_RATE - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        return data.tobytes()
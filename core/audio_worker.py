@@ -0,0 +1,304 @@
+"""
+Audio front-end in a separate process
+
+Capture, endpointing, the wake word gate and recognition run in a worker
+process, so they never compete for the GIL with the Qt event loop, command
+processing or speech output. The worker writes the microphone into a ring
+buffer in shared memory and sends only events back over a pipe:
+
+    ('ready', sample_rate)       capturing into the shared buffer
+    ('phrase', start, end)       a phrase was endpointed (buffer positions)
+    ('partial', text)            interim text of the phrase being spoken
+    ('text', text, language)     recognized text
+    ('error', message)
+
+The GUI process reads the shared buffer directly (no copies, no pickling)
+for barge-in detection, and input levels from a shared LevelMeter. If the worker dies it is started
+again with exponential backoff; a missing microphone stops it for good.
+"""
+import sys
+import time
+import threading
+import multiprocessing
+import numpy as np
+from utils.config import config
+from core.audio_buffer import AudioRingBuffer, HEADER_FIELDS, BUFFER_SECONDS
+from core.barge_in import BargeInMonitor
+from core.level_meter import LevelMeter, BANDS, VALUE_FIELDS
+from core.vad import NoiseFloor, frame_rms, FRAME_MS
+from core.voice_recognition import VoiceRecognition
+
+
+# Shared ring sized for the highest capture rate expected
+MAX_SAMPLE_RATE = 48000
+RESTART_DELAY = 0.5
+MAX_RESTART_DELAY = 10.0
+# A worker that ran this long is considered healthy again (backoff resets)
+STABLE_SECONDS = 60.0
+EXIT_LISTEN_FAILED = 1
+EXIT_NO_MICROPHONE = 3
+POLL_INTERVAL = 0.02
+
+
+def _views(header, ring):
+    return np.frombuffer(header, dtype=np.int64), np.frombuffer(ring, dtype=np.int16)
+
+
+def _meter_views(sequence, values):
+    return np.frombuffer(sequence, dtype=np.int64), np.frombuffer(values, dtype=np.float64)
+
+
+class _WorkerRecognition(VoiceRecognition):
+    """VoiceRecognition capturing into the shared buffer and announcing it"""
+
+    def __init__(self, conn, header, ring, **options):
+        self._conn = conn
+        self._storage = _views(header, ring)
+        super().__init__(barge_in=False, **options)
+
+    def _create_buffer(self, source):
+        header, ring = self._storage
+        seconds = len(ring) / source.SAMPLE_RATE
+        buffer = AudioRingBuffer(source.SAMPLE_RATE, seconds, lossless=not getattr(source, 'live', True),
+                                 storage=(header, ring))
+        self._conn.send(('ready', source.SAMPLE_RATE))
+        return buffer
+
+
+def _worker_main(conn, header, ring, levels, options, partials):
+    """Worker process: listen until told to stop or the parent goes away"""
+    meter = LevelMeter(storage=_meter_views(*levels))
+    recognition = _WorkerRecognition(conn, header, ring, meter=meter, **options)
+    if not recognition.microphone:
+        conn.send(('error', "Mikrofon bulunamadı"))
+        sys.exit(EXIT_NO_MICROPHONE)
+
+    # Events come from the listen thread and the interim recognition thread
+    send_lock = threading.Lock()
+
+    def send(*event):
+        with send_lock:
+            conn.send(event)
+
+    stop_event = threading.Event()
+    thread = recognition.listen_continuous(
+        lambda text, language: send('text', text, language),
+        stop_event,
+        on_phrase=lambda phrase: send('phrase', phrase.start, phrase.end),
+        on_partial=(lambda text: send('partial', text)) if partials else None)
+    try:
+        while thread.is_alive():
+            if conn.poll(0.2) and conn.recv() == 'stop':
+                stop_event.set()
+                break
+    except (EOFError, OSError):
+        stop_event.set()  # Parent went away
+    thread.join(2.0)
+    recognition.close()
+    if not stop_event.is_set() and not recognition.source_ended:
+        # The listen loop gave up: let the parent restart us
+        sys.exit(EXIT_LISTEN_FAILED)
+
+
+class _BargeInTap:
+    """Barge-in detection in the GUI process, fed from the shared buffer"""
+
+    def __init__(self):
+        # Imported here: the spawned worker imports this module and must not start the TTS service
+        from core.text_to_speech import get_tts
+        self.monitor = BargeInMonitor(get_tts(), self)
+        self.noise = NoiseFloor(FRAME_MS)
+        self.buffer = None
+        self.frame = 0
+        self.position = 0
+        self.generation = None
+        self.phrase_open = False
+        self.last_rms = 0.0
+
+    @property
+    def energy_threshold(self):
+        return self.noise.threshold()
+
+    def attach(self, buffer):
+        self.buffer = buffer
+        self.frame = int(buffer.sample_rate * FRAME_MS / 1000)
+        self.monitor.attach_frames(buffer.sample_rate, self.frame)
+        self.generation = buffer.generation
+        self.position = buffer.written
+
+    def poll(self):
+        """Check audio captured since the last poll"""
+        buffer = self.buffer
+        if buffer is None:
+            return
+        if buffer.generation != self.generation:
+            self.generation = buffer.generation
+            self.position = buffer.written
+        self.position = max(self.position, buffer.oldest)
+        count = (buffer.written - self.position) // self.frame
+        if not count:
+            return
+        samples = buffer.view(self.position, self.position + count * self.frame)
+        self.position += count * self.frame
+        energies = frame_rms(samples, self.frame)
+        self.noise.update(energies)
+        self.last_rms = float(energies[-1])
+        for block in samples.reshape(count, self.frame):
+            self.monitor.feed(block.tobytes())
+
+    def on_phrase(self):
+        if self.phrase_open:
+            # The previous phrase produced no text
+            self.monitor.start_phrase()
+        self.phrase_open = True
+
+    def is_echo(self, text):
+        echo = self.monitor.is_echo(text)
+        self.monitor.start_phrase()
+        self.phrase_open = False
+        return echo
+
+
+class AudioWorker:
+    """
+    Continuous listening in a worker process, with the listen_continuous /
+    stop_listening interface of VoiceRecognition. options are passed to the
+    worker's VoiceRecognition (source, backend, wake_word; they must be
+    picklable, the worker is spawned). Barge-in detection runs here, on the
+    shared buffer.
+    """
+
+    def __init__(self, barge_in=True, **options):
+        self.barge_in = barge_in
+        self.options = options
+        # Spawn, not fork: by now the parent runs Qt, audio and timer threads whose
+        # held locks a forked child would inherit
+        self._context = multiprocessing.get_context('spawn')
+        seconds = config.get('voice.capture.buffer_seconds', BUFFER_SECONDS)
+        self._header = self._context.RawArray('q', HEADER_FIELDS)
+        self._ring = self._context.RawArray('h', int(MAX_SAMPLE_RATE * seconds))
+        self.buffer = None  # shared capture buffer, once the worker is capturing
+        self._levels = (self._context.RawArray('q', 1), self._context.RawArray('d', VALUE_FIELDS + BANDS))
+        # Input levels published by the worker's capture thread
+        self.meter = LevelMeter(storage=_meter_views(*self._levels))
+        self.is_listening = False
+        self.restarts = 0
+        self._process = None
+        self._conn = None
+
+    def listen_continuous(self, callback, stop_event=None, on_partial=None):
+        """
+        Start the worker; callback(text, language) and on_partial(text)
+        (interim text, see VoiceRecognition.listen_continuous) run on a
+        supervisor thread
+        """
+        self.is_listening = True
+        thread = threading.Thread(target=self._supervise, args=(callback, stop_event, on_partial),
+                                  daemon=True, name="AudioWorkerSupervisor")
+        thread.start()
+        return thread
+
+    def stop_listening(self):
+        self.is_listening = False
+
+    def close(self):
+        """Stop listening; the worker releases its own resources when it exits"""
+        self.stop_listening()
+
+    def _running(self, stop_event):
+        return self.is_listening and (stop_event is None or not stop_event.is_set())
+
+    def _spawn(self, partials):
+        conn, child_conn = self._context.Pipe()
+        self._process = self._context.Process(target=_worker_main,
+                                              args=(child_conn, self._header, self._ring, self._levels,
+                                                    self.options, partials),
+                                              daemon=True, name="AudioWorker")
+        self._process.start()
+        child_conn.close()
+        self._conn = conn
+
+    def _supervise(self, callback, stop_event, on_partial):
+        tap = _BargeInTap() if self.barge_in else None
+        delay = RESTART_DELAY
+        while self._running(stop_event):
+            started = time.monotonic()
+            self._spawn(partials=on_partial is not None)
+            try:
+                self._pump(callback, stop_event, tap, on_partial)
+            except Exception as e:
+                print(f"Error in audio worker supervisor: {e}")
+            if not self._running(stop_event):
+                break
+            self._process.join(1.0)
+            exitcode = self._process.exitcode
+            # The worker may still be running (the pump failed, not the worker): stop
+            # it and close its pipe, so only one process ever writes the shared buffer
+            self._shutdown()
+            if exitcode in (0, EXIT_NO_MICROPHONE):
+                break  # Source ended, or there is nothing to listen to
+            if time.monotonic() - started > STABLE_SECONDS:
+                delay = RESTART_DELAY
+            self.restarts += 1
+            print(f"Audio worker exited (code {exitcode}), restarting in {delay:.1f} s")
+            time.sleep(delay)
+            delay = min(delay * 2, MAX_RESTART_DELAY)
+        self._shutdown()
+        self.is_listening = False
+
+    def _pump(self, callback, stop_event, tap, on_partial):
+        """Relay worker events until it exits or listening stops"""
+        while self._running(stop_event):
+            if tap is not None:
+                tap.poll()
+            try:
+                if not self._conn.poll(POLL_INTERVAL):
+                    if not self._process.is_alive():
+                        return
+                    continue
+                event = self._conn.recv()
+            except (EOFError, OSError):
+                return
+            kind = event[0]
+            if kind == 'ready':
+                self.buffer = AudioRingBuffer.attach(*_views(self._header, self._ring))
+                if tap is not None:
+                    tap.attach(self.buffer)
+            elif kind == 'phrase':
+                if tap is not None:
+                    tap.on_phrase()
+            elif kind == 'partial':
+                if on_partial:
+                    on_partial(event[1])
+            elif kind == 'text':
+                _, text, language = event
+                if tap is not None:
+                    tap.poll()
+                    if tap.is_echo(text):
+                        print(f"Ignoring own speech picked up by the microphone: {text}")
+                        continue
+                if callback:
+                    callback(text, language)
+            elif kind == 'error':
+                print(f"Audio worker: {event[1]}")
+
+    def _shutdown(self):
+        if self._process is None:
+            return
+        try:
+            self._conn.send('stop')
+        except (OSError, ValueError):
+            pass
+        self._process.join(2.0)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join(1.0)
+        self._conn.close()
+        self._process = None
+
+
+def create_listener():
+    """Continuous listener per config 'voice.capture.process': worker process or in-process"""
+    if config.get('voice.capture.process', True):
+        return AudioWorker()
+    return VoiceRecognition()
@@ -0,0 +1,109 @@
+"""
+Barge-in and echo suppression for the listen loop
+
+While the assistant is speaking, every microphone chunk read by the
+recognizer is also checked here. Sustained energy well above the
+recognizer's speech threshold means the user is talking over the assistant:
+speech is cut and the queue flushed at once, and the recognizer keeps
+capturing the new utterance as usual.
+
+Phrases captured while the assistant was speaking (or just after) that did
+not trigger a barge-in are assumed to be the assistant hearing itself and
+are dropped, as are phrases that repeat what it just said.
+"""
+import time
+import audioop
+from utils.config import config
+from utils.text_normalize import tokenize
+
+
+# Share of a recognized phrase's words found in recent speech that marks it as echo
+ECHO_SIMILARITY = 0.7
+
+
+class _MonitoredStream:
+    """Microphone stream proxy passing every chunk read to a callback"""
+
+    def __init__(self, stream, on_chunk):
+        self._stream = stream
+        self._on_chunk = on_chunk
+
+    def read(self, size):
+        data = self._stream.read(size)
+        self._on_chunk(data)
+        return data
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+class BargeInMonitor:
+    """Watches microphone energy during speech and interrupts the TTS service"""
+
+    def __init__(self, tts, recognizer):
+        self.tts = tts
+        self.recognizer = recognizer
+        self.enabled = config.key('voice.barge_in.enabled', True)
+        self.factor = config.key('voice.barge_in.factor', 2.5)
+        self.min_ms = config.key('voice.barge_in.min_ms', 60)
+        self.echo_tail = config.key('voice.barge_in.echo_tail', 0.5)
+        self.sample_width = 2
+        self.chunk_ms = 0.0
+        self._active_ms = 0.0
+        self._heard_speech = False  # current phrase overlapped our own output
+        self._barged_in = False
+
+    def attach(self, source):
+        """Start monitoring an open speech_recognition audio source"""
+        self.sample_width = source.SAMPLE_WIDTH
+        self.chunk_ms = 1000.0 * source.CHUNK / source.SAMPLE_RATE
+        source.stream = _MonitoredStream(source.stream, self._on_chunk)
+
+    def attach_frames(self, sample_rate, frame):
+        """Monitor 16-bit audio passed to feed() in blocks of frame samples"""
+        self.sample_width = 2
+        self.chunk_ms = 1000.0 * frame / sample_rate
+
+    def feed(self, data):
+        """Check one block of audio (see attach_frames)"""
+        self._on_chunk(data)
+
+    def start_phrase(self):
+        """Reset per-phrase state (call before each listen)"""
+        self._active_ms = 0.0
+        self._heard_speech = False
+        self._barged_in = False
+
+    def _on_chunk(self, data):
+        if not self.tts.in_echo_window(self.echo_tail()):
+            self._active_ms = 0.0
+            return
+        energy = audioop.rms(data, self.sample_width)
+        if energy > self.recognizer.energy_threshold:
+            self._heard_speech = True
+        if not self.enabled() or not self.tts.speaking:
+            return
+        # Our own output raises the floor; only clearly louder sound counts as the user
+        if energy > self.recognizer.energy_threshold * self.factor():
+            self._active_ms += self.chunk_ms
+            if self._active_ms >= self.min_ms() and not self._barged_in:
+                self._barged_in = True
+                started = time.perf_counter()
+                self.tts.barge_in()
+                print(f"Barge-in after {self._active_ms:.0f} ms of speech, "
+                      f"stopped in {(time.perf_counter() - started) * 1000:.1f} ms")
+        else:
+            self._active_ms = 0.0
+
+    def is_echo(self, text):
+        """Whether a recognized phrase is most likely the assistant hearing itself"""
+        if self._heard_speech and not self._barged_in:
+            return True
+        words = set(tokenize(text))
+        if not words:
+            return False
+        for spoken in list(self.tts.recent_speech):
+            overlap = len(words & set(tokenize(spoken))) / len(words)
+            if overlap >= ECHO_SIMILARITY and self.tts.in_echo_window(self.echo_tail() + 5.0):
+                return True
+        return False
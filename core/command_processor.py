@@ -4,6 +4,7 @@ Now with LLM integration for natural language understanding
 """
 import re
 import json
+from concurrent.futures import ThreadPoolExecutor
 from features import (system_control, file_operations, web_search, weather, 
                      calculator, notes, reminders, media_control, system_monitor,
                      security, email, calendar, command_history, entertainment,
@@ -13,6 +14,7 @@ from core.prompts import get_system_prompt, get_chat_prompt
 from core.conversation_manager import ConversationManager
 from core.multi_step_processor import MultiStepProcessor
 import features.command_history as command_history_module
+from utils.config import config
 
 # Import optional modules
 try:
@@ -39,6 +41,11 @@ class CommandProcessor:
         self.conversation_manager = ConversationManager()
         self.use_llm = self.llm_client.is_available()
         self.multi_step_processor = MultiStepProcessor(self)
+        self.last_intent = None  # Intent of the last processed command ('chat' for small talk)
+        # Speculative preparation from interim recognition text, off the caller's thread
+        self._prewarm_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Prewarm")
+        self._prewarmed = None
+        config.subscribe(self._on_config_changed, 'llm.enabled')
         
         # Fallback regex patterns (kept for when LLM is unavailable)
         self.turkish_patterns = {
@@ -67,16 +74,66 @@ class CommandProcessor:
             'list_notes': [
                 r'notlar(ı|i)?\s+(listele|göster|show)',
             ],
+            'search_notes': [
+                r'notlar(ı|i|da|de)?\s+(ara|search)\s*:?\s*(.+)',
+                r'search\s+notes?\s*:?\s*(.+)',
+            ],
             'search': [
                 r'google.*ara\s*:?\s*(.+)',
                 r'ara\s*:?\s*(.+)',
             ],
         }
     
+    def _on_config_changed(self, changed_keys, snapshot):
+        """
+        Follow LLM enable/disable without being rebuilt. Runs on the thread
+        that changed the config (the ConfigWatcher thread for edits of
+        config.json), so the server check happens there and not on the GUI
+        thread; commands only read the resulting flag, replaced in one
+        assignment. The LLM client has already applied the snapshot (it
+        subscribed first), so is_available() checks the new settings.
+        """
+        self.use_llm = snapshot.get('llm.enabled', True) and self.llm_client.is_available()
+    
+    def predict_intent(self, text):
+        """Local guess at the intent of (possibly partial) text: (intent, regex match) or (None, None)"""
+        for command_type, pattern_list in self.turkish_patterns.items():
+            for pattern in pattern_list:
+                match = re.search(pattern, text, re.IGNORECASE)
+                if match:
+                    return command_type, match
+        return None, None
+    
+    def prewarm(self, partial_text):
+        """
+        Prepare what the likely command needs while it is still being spoken
+        (interim recognition text): the application path for open_app, and
+        the LLM connection whenever commands go through the LLM. Returns at
+        once; process_command then finds the work done.
+        """
+        intent, _ = self.predict_intent(partial_text.strip().lower())
+        app_name = self._extract_app_name(partial_text) if intent == 'open_app' else None
+        key = (intent, app_name)
+        if key == self._prewarmed:
+            return
+        self._prewarmed = key
+        self._prewarm_pool.submit(self._prewarm, intent, app_name)
+    
+    def _prewarm(self, intent, app_name):
+        try:
+            if intent == 'open_app' and app_name:
+                system_control.prewarm_application(app_name)
+            if self.use_llm:
+                self.llm_client.warm_up()
+        except Exception as e:
+            print(f"Error preparing command: {e}")
+    
     def process_command(self, text, language='tr'):
         """Process a command using LLM first, fallback to regex"""
         text = text.strip()
         original_text = text
+        self.last_intent = None
+        self._prewarmed = None
         
         # Add to conversation history
         self.conversation_manager.add_message("user", text)
@@ -125,6 +182,7 @@ class CommandProcessor:
             
             # Extract intent and parameters
             intent = command_data.get('intent', 'chat')
+            self.last_intent = intent
             parameters = command_data.get('parameters', {})
             llm_response = command_data.get('response', '')
             
@@ -233,6 +291,12 @@ class CommandProcessor:
                 response = llm_response if llm_response else result[1]
                 return result[0], response
             
+            elif intent == 'search_notes':
+                query = parameters.get('query', '')
+                result = notes.search_notes(query)
+                # Search results are the answer itself, so they always win over the LLM text
+                return result[0], result[1]
+            
             elif intent == 'web_search':
                 query = parameters.get('query', text)
                 result = web_search.search_google(query)
@@ -272,10 +336,11 @@ class CommandProcessor:
             elif intent == 'create_reminder':
                 message = parameters.get('message', '')
                 duration = parameters.get('duration', '')
+                recurrence = parameters.get('recurrence', None)
                 if not message:
                     response = llm_response if llm_response else "Hatırlatıcı mesajı belirtilmedi"
                     return False, response
-                result = reminders.create_reminder(message, duration)
+                result = reminders.create_reminder(message, duration, recurrence=recurrence)
                 response = llm_response if llm_response else result[1]
                 return result[0], response
             
@@ -290,6 +355,24 @@ class CommandProcessor:
                 response = llm_response if llm_response else result[1]
                 return result[0], response
             
+            elif intent == 'cancel_timer':
+                timer_id = parameters.get('timer_id', None)
+                result = reminders.cancel_timer(timer_id)
+                response = llm_response if llm_response and result[0] else result[1]
+                return result[0], response
+            
+            elif intent == 'delete_reminder' or intent == 'cancel_reminder':
+                reminder_id = parameters.get('reminder_id', None)
+                if reminder_id is None:
+                    return False, "Silinecek hatırlatıcının numarası belirtilmedi"
+                try:
+                    reminder_id = int(reminder_id)
+                except (TypeError, ValueError):
+                    return False, f"Geçersiz hatırlatıcı numarası: {reminder_id}"
+                result = reminders.delete_reminder(reminder_id)
+                response = llm_response if llm_response and result[0] else result[1]
+                return result[0], response
+            
             elif intent == 'screenshot':
                 try:
                     # Check if user wants to save to Pictures folder
@@ -710,6 +793,7 @@ class CommandProcessor:
             
             else:
                 # Unknown intent, use LLM response as chat
+                self.last_intent = 'chat'
                 self.conversation_manager.add_message("assistant", llm_response)
                 return True, llm_response
         
@@ -720,14 +804,10 @@ class CommandProcessor:
     
     def _process_with_regex(self, text, language, original_text):
         """Fallback: Process command using regex patterns"""
-        patterns = self.turkish_patterns
-        
         # Try to match patterns
-        for command_type, pattern_list in patterns.items():
-            for pattern in pattern_list:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    return self._execute_command(command_type, match, text, language)
+        command_type, match = self.predict_intent(text)
+        if match:
+            return self._execute_command(command_type, match, text, language)
         
         # If no pattern matches, try generic handlers
         return self._try_generic_handlers(text, language, original_text)
@@ -822,6 +902,10 @@ class CommandProcessor:
             elif command_type == 'list_notes':
                 return notes.list_notes()
             
+            elif command_type == 'search_notes':
+                query = match.group(len(match.groups()))
+                return notes.search_notes(query.strip())
+            
             elif command_type == 'search':
                 query = match.group(2) if len(match.groups()) >= 2 else match.group(1)
                 return web_search.search_google(query.strip())
@@ -858,6 +942,7 @@ class CommandProcessor:
                     self.conversation_manager.get_recent_context(3)
                 )
                 if success:
+                    self.last_intent = 'chat'
                     self.conversation_manager.add_message("assistant", response)
                     return True, response
             except:
@@ -20,6 +20,13 @@ class ConversationManager:
         self.max_history = MAX_HISTORY
         self.save_history = config.get('conversation.save_history', False)
         self.load_history()
+        config.subscribe(self._on_config_changed, 'user.name', 'conversation')
+    
+    def _on_config_changed(self, changed_keys, snapshot):
+        """Apply user name and history settings changes in place"""
+        self.user_name = snapshot.get('user.name', 'Kullanıcı')
+        self.max_history = snapshot.get('conversation.max_history', MAX_HISTORY)
+        self.save_history = snapshot.get('conversation.save_history', False)
     
     def load_history(self):
         """Load conversation history from file"""
@@ -0,0 +1,60 @@
+"""
+Streaming ElevenLabs synthesis
+
+Uses the HTTP streaming endpoint with raw PCM output, so each network chunk
+can be written to the audio device as soon as it arrives instead of waiting
+for and decoding a complete MP3.
+"""
+import requests
+
+
+DEFAULT_API_BASE = "https://api.elevenlabs.io"
+OUTPUT_FORMAT = "pcm_22050"
+SAMPLE_RATE = 22050
+SAMPLE_WIDTH = 2  # signed 16-bit little-endian mono
+CHUNK_SIZE = 4096
+
+
+class ElevenLabsStreamer:
+    """Client for the ElevenLabs text-to-speech streaming endpoint"""
+
+    def __init__(self, api_key, api_base=DEFAULT_API_BASE, timeout=10):
+        self.api_key = api_key
+        self.api_base = api_base.rstrip('/')
+        self.timeout = timeout
+        # Keep-alive session: later utterances skip the TCP/TLS handshake
+        self.session = requests.Session()
+
+    def stream(self, text, voice_id, model_id, stability=0.5, similarity_boost=0.75,
+               chunk_size=CHUNK_SIZE):
+        """
+        Yield PCM chunks (whole samples only) as they arrive.
+
+        Closing the generator early (e.g. on stop) closes the HTTP response.
+        """
+        response = self.session.post(
+            f"{self.api_base}/v1/text-to-speech/{voice_id}/stream",
+            params={'output_format': OUTPUT_FORMAT},
+            headers={'xi-api-key': self.api_key, 'Accept': 'audio/pcm'},
+            json={
+                'text': text,
+                'model_id': model_id,
+                'voice_settings': {'stability': stability, 'similarity_boost': similarity_boost},
+            },
+            stream=True,
+            timeout=self.timeout,
+        )
+        with response:
+            response.raise_for_status()
+            remainder = b''
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if remainder:
+                    chunk = remainder + chunk
+                # A network chunk may end mid-sample; carry the odd byte over
+                usable = len(chunk) - len(chunk) % SAMPLE_WIDTH
+                remainder = chunk[usable:]
+                if usable:
+                    yield chunk[:usable] if remainder else chunk
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,169 @@
+"""
+Local stand-in for the ElevenLabs streaming endpoint
+
+Serves canned PCM audio in HTTP chunks with configurable delays, so the
+streaming playback path and time-to-first-audio can be exercised without
+network access or an API key:
+
+    python -m core.elevenlabs_stub --port 8765
+    (then set tts.elevenlabs.api_base to http://127.0.0.1:8765)
+
+    python -m core.elevenlabs_stub --measure 20
+    (streams 20 utterances from an in-process server and prints TTFA)
+"""
+import re
+import json
+import math
+import time
+import array
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from core.elevenlabs_stream import ElevenLabsStreamer, SAMPLE_RATE
+
+
+_STREAM_PATH = re.compile(r'^/v1/text-to-speech/([^/?]+)/stream(?:\?.*)?$')
+
+
+def tone(seconds, frequency=220.0, sample_rate=SAMPLE_RATE, amplitude=0.3):
+    """Signed 16-bit mono sine tone as bytes"""
+    count = int(seconds * sample_rate)
+    scale = amplitude * 32767
+    step = 2 * math.pi * frequency / sample_rate
+    return array.array('h', (int(scale * math.sin(step * i)) for i in range(count))).tobytes()
+
+
+class StubElevenLabsServer:
+    """Threaded HTTP server answering text-to-speech stream requests with canned PCM"""
+
+    def __init__(self, host='127.0.0.1', port=0, audio=None, chunk_size=2048,
+                 first_chunk_delay=0.05, chunk_delay=0.01):
+        self.audio = audio
+        self.chunk_size = chunk_size
+        self.first_chunk_delay = first_chunk_delay
+        self.chunk_delay = chunk_delay
+        self.requests = []  # (voice_id, body) of every request served
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve in a daemon thread; returns the base URL"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True,
+                                        name="ElevenLabsStub")
+        self._thread.start()
+        return self.url
+
+    def serve_forever(self):
+        """Serve on the calling thread until interrupted"""
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _audio_for(self, text):
+        if self.audio is not None:
+            return self.audio
+        # Roughly speech-length audio for the text
+        return tone(min(5.0, 0.3 + 0.05 * len(text)))
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                match = _STREAM_PATH.match(self.path)
+                if not match:
+                    self._reply(404, b'{"detail": "not found"}')
+                    return
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if not self.headers.get('xi-api-key'):
+                    self._reply(401, b'{"detail": "missing api key"}')
+                    return
+                try:
+                    payload = json.loads(body or b'{}')
+                except ValueError:
+                    self._reply(400, b'{"detail": "invalid json"}')
+                    return
+                server.requests.append((match.group(1), payload))
+
+                audio = server._audio_for(payload.get('text', ''))
+                self.send_response(200)
+                self.send_header('Content-Type', 'audio/pcm')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                time.sleep(server.first_chunk_delay)
+                try:
+                    for start in range(0, len(audio), server.chunk_size):
+                        chunk = audio[start:start + server.chunk_size]
+                        self.wfile.write(b'%X\r\n%s\r\n' % (len(chunk), chunk))
+                        self.wfile.flush()
+                        time.sleep(server.chunk_delay)
+                    self.wfile.write(b'0\r\n\r\n')
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client stopped listening (e.g. speech interrupted)
+
+            def _reply(self, status, body):
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def measure(count, **server_options):
+    """Stream `count` utterances from an in-process stub; returns TTFA samples in ms"""
+    server = StubElevenLabsServer(**server_options)
+    streamer = ElevenLabsStreamer('stub-key', api_base=server.start())
+    samples = []
+    try:
+        for i in range(count):
+            started = time.perf_counter()
+            first = None
+            for _ in streamer.stream(f"Test cümlesi {i}", 'stub-voice', 'stub-model'):
+                if first is None:
+                    first = time.perf_counter()
+            samples.append((first - started) * 1000)
+    finally:
+        streamer.close()
+        server.stop()
+    return samples
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Local ElevenLabs streaming stand-in")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--first-chunk-delay', type=float, default=0.05)
+    parser.add_argument('--chunk-delay', type=float, default=0.01)
+    parser.add_argument('--measure', type=int, metavar='N', help="measure TTFA over N utterances and exit")
+    args = parser.parse_args()
+
+    if args.measure:
+        samples = sorted(measure(args.measure, first_chunk_delay=args.first_chunk_delay,
+                                 chunk_delay=args.chunk_delay))
+        print(f"TTFA over {len(samples)} utterances: p50 {samples[len(samples) // 2]:.1f} ms, "
+              f"max {samples[-1]:.1f} ms")
+    else:
+        stub = StubElevenLabsServer(args.host, args.port, first_chunk_delay=args.first_chunk_delay,
+                                    chunk_delay=args.chunk_delay)
+        print(f"ElevenLabs stand-in listening on {stub.url}")
+        stub.serve_forever()
@@ -0,0 +1,123 @@
+"""
+Audio level metering for the GUI
+
+The capture thread publishes the RMS of the newest frame and a spectrum
+of the newest FFT_SIZE samples (NumPy rfft, grouped into BANDS
+log-spaced bands) at most RATE times per second. Publishing is a
+seqlock: the single writer bumps a sequence number to odd, writes the
+values and bumps it to even again; a reader copies the values and keeps
+them only if the sequence was even and unchanged. Neither side ever
+waits for the other, so a slow or stalled GUI cannot hold up capture.
+The storage can live in shared memory (see core.audio_worker), so the
+GUI process reads levels published by the capture process.
+"""
+import time
+import numpy as np
+
+
+BANDS = 20
+RATE = 25.0  # publications per second at most
+FFT_SIZE = 1024
+FRAME_MS = 20  # RMS window
+MIN_FREQUENCY = 80.0
+MAX_FREQUENCY = 8000.0
+FLOOR_DB = -70.0  # levels are 0 at this many dB below full scale, 1 at full scale
+
+# Values layout (float64): publication time, frame RMS, RMS level, band levels
+_TIME, _RMS, _LEVEL = range(3)
+VALUE_FIELDS = 3
+
+
+def _level(db):
+    return np.clip((db - FLOOR_DB) / -FLOOR_DB, 0.0, 1.0)
+
+
+class Levels:
+    """One publication: when, frame RMS (int16 units), its 0..1 level and band levels"""
+
+    __slots__ = ('time', 'rms', 'level', 'bands')
+
+    def __init__(self, values):
+        self.time = float(values[_TIME])
+        self.rms = float(values[_RMS])
+        self.level = float(values[_LEVEL])
+        self.bands = values[VALUE_FIELDS:]
+
+    @property
+    def age(self):
+        """Seconds since publication"""
+        return time.monotonic() - self.time
+
+
+class LevelMeter:
+    """
+    Single-writer, lock-free level publication.
+
+    storage=(sequence, values) places it in caller-provided int64 (one
+    element) and float64 (VALUE_FIELDS + BANDS) arrays, e.g. views of
+    shared memory.
+    """
+
+    def __init__(self, bands=BANDS, storage=None):
+        if storage is None:
+            storage = (np.zeros(1, dtype=np.int64), np.zeros(VALUE_FIELDS + bands, dtype=np.float64))
+        self._sequence, self._values = storage
+        self._sequence[0] = 0  # a writer killed mid-publication leaves it odd
+        self.bands = len(self._values) - VALUE_FIELDS
+        self.interval = 1.0 / RATE
+        self._next = 0.0
+        self._sample_rate = None
+        self._window = np.hanning(FFT_SIZE).astype(np.float32)
+        self._edges = None
+        # A full-scale sine comes out of the windowed rfft at about this magnitude
+        self._full_scale = FFT_SIZE / 4 * 32768.0
+
+    def _band_edges(self, sample_rate):
+        """rfft bins where the bands start, plus where the last one ends (strictly increasing)"""
+        resolution = sample_rate / FFT_SIZE
+        top = min(MAX_FREQUENCY, sample_rate / 2)
+        edges = np.geomspace(MIN_FREQUENCY / resolution, top / resolution, self.bands + 1).astype(int)
+        for i in range(1, len(edges)):
+            edges[i] = max(edges[i], edges[i - 1] + 1)
+        return np.minimum(edges, FFT_SIZE // 2 + 1)
+
+    def publish(self, buffer):
+        """
+        Measure the newest audio of an AudioRingBuffer, unless the last
+        publication was less than 1/RATE seconds ago (then this is only a
+        clock read)
+        """
+        now = time.monotonic()
+        if now < self._next:
+            return
+        self._next = now + self.interval
+        if buffer.sample_rate != self._sample_rate:
+            self._sample_rate = buffer.sample_rate
+            self._edges = self._band_edges(buffer.sample_rate)
+        written = buffer.written
+        samples = buffer.view(written - FFT_SIZE, written)
+        if len(samples) < FFT_SIZE:
+            return
+        samples = samples.astype(np.float32)
+        frame = samples[-int(buffer.sample_rate * FRAME_MS / 1000):]
+        rms = float(np.sqrt(np.dot(frame, frame) / len(frame)))
+        magnitude = np.abs(np.fft.rfft(samples * self._window)) / self._full_scale
+        bands = np.maximum.reduceat(magnitude[:self._edges[-1]], self._edges[:-1])
+        # Seqlock write: odd while the values are inconsistent
+        self._sequence[0] += 1
+        self._values[_TIME] = now
+        self._values[_RMS] = rms
+        self._values[_LEVEL] = _level(20 * np.log10(max(rms, 1.0) / 32768.0))
+        self._values[VALUE_FIELDS:] = _level(20 * np.log10(np.maximum(bands, 1e-6)))
+        self._sequence[0] += 1
+
+    def read(self, retries=3):
+        """Latest Levels, or None before the first publication (or if the writer kept interfering)"""
+        for _ in range(retries):
+            before = int(self._sequence[0])
+            if before % 2:
+                continue
+            values = self._values.copy()
+            if int(self._sequence[0]) == before:
+                return Levels(values) if before else None
+        return None
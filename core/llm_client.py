@@ -4,22 +4,56 @@ LM Studio API Client for JARVIS
 import requests
 import json
 import time
+import threading
+from contextlib import contextmanager
 from typing import List, Dict, Optional, Tuple
 from utils.config import config
 
 
+# warm_up() checks the server again only if the last check is older than this (seconds)
+WARM_INTERVAL = 5.0
+
+
 class LLMClient:
     """Client for LM Studio OpenAI-compatible API"""
     
     def __init__(self):
-        self.api_url = config.get('llm.api_url', 'http://localhost:1234/v1/chat/completions')
-        self.model = config.get('llm.model', 'qwen3-4b-2507')
-        self.temperature = config.get('llm.temperature', 0.7)
-        self.max_tokens = config.get('llm.max_tokens', 200)
-        self.timeout = config.get('llm.timeout', 10)
-        self.enabled = config.get('llm.enabled', True)
         self._connection_ok = None
         self._last_check = 0
+        # Keep-alive connections: a warmed-up connection is reused by the next request.
+        # requests.Session is not thread-safe (warm_up runs on another thread than
+        # chat), so each request borrows an idle session, newest first, and returns it
+        self._sessions = []
+        self._sessions_lock = threading.Lock()
+        self._apply_config(config.snapshot())
+        config.subscribe(self._on_config_changed, 'llm')
+    
+    def _apply_config(self, snapshot):
+        """Take LLM settings from a config snapshot"""
+        self.api_url = snapshot.get('llm.api_url', 'http://localhost:1234/v1/chat/completions')
+        self.model = snapshot.get('llm.model', 'qwen3-4b-2507')
+        self.temperature = snapshot.get('llm.temperature', 0.7)
+        self.max_tokens = snapshot.get('llm.max_tokens', 200)
+        self.timeout = snapshot.get('llm.timeout', 10)
+        self.enabled = snapshot.get('llm.enabled', True)
+    
+    def _on_config_changed(self, changed_keys, snapshot):
+        """Apply LLM settings changes in place"""
+        self._apply_config(snapshot)
+        if 'llm.api_url' in changed_keys or 'llm.enabled' in changed_keys:
+            # Endpoint changed, re-check connectivity on next use
+            self._connection_ok = None
+    
+    @contextmanager
+    def _session(self):
+        """An HTTP session used by no other thread until the block ends"""
+        with self._sessions_lock:
+            session = self._sessions.pop() if self._sessions else requests.Session()
+        try:
+            yield session
+        finally:
+            with self._sessions_lock:
+                self._sessions.append(session)
     
     def is_available(self) -> bool:
         """Check if LM Studio API is available"""
@@ -33,10 +67,11 @@ class LLMClient:
         
         try:
             # Simple health check
-            response = requests.get(
-                self.api_url.replace('/v1/chat/completions', '/v1/models'),
-                timeout=2
-            )
+            with self._session() as session:
+                response = session.get(
+                    self.api_url.replace('/v1/chat/completions', '/v1/models'),
+                    timeout=2
+                )
             self._connection_ok = response.status_code == 200
         except:
             self._connection_ok = False
@@ -44,6 +79,18 @@ class LLMClient:
         self._last_check = current_time
         return self._connection_ok
     
+    def warm_up(self) -> bool:
+        """
+        Check the server now (unless just checked), so a request made right
+        after finds the availability cached and a connection already open
+        """
+        if not self.enabled:
+            return False
+        if self._connection_ok is not None and time.time() - self._last_check < WARM_INTERVAL:
+            return self._connection_ok
+        self._last_check = 0
+        return self.is_available()
+    
     def chat(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None) -> Tuple[bool, str]:
         """
         Send chat request to LM Studio
@@ -85,12 +132,13 @@ class LLMClient:
             }
             
             # Send request
-            response = requests.post(
-                self.api_url,
-                json=payload,
-                timeout=self.timeout,
-                headers={"Content-Type": "application/json"}
-            )
+            with self._session() as session:
+                response = session.post(
+                    self.api_url,
+                    json=payload,
+                    timeout=self.timeout,
+                    headers={"Content-Type": "application/json"}
+                )
             
             if response.status_code == 200:
                 data = response.json()
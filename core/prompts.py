@@ -29,11 +29,16 @@ Görevlerin:
 3. Not Yönetimi:
    - Not kaydetme (intent: "save_note")
    - Notları listeleme (intent: "list_notes")
+   - Notlarda arama (intent: "search_notes", parameters: "query")
 
 4. Hatırlatıcılar ve Zamanlayıcılar:
    - Hatırlatıcı oluşturma (intent: "create_reminder", parameters: "message", "duration")
+   - Tekrarlayan hatırlatıcı (intent: "create_reminder", parameters: "message", "recurrence")
+     - "recurrence" örnekleri: "her gün 08:30", "hafta içi 09:00", "her pazartesi 10:00", "her 30 dakikada", "cron: 0 9 * * 1-5"
    - Hatırlatıcıları listeleme (intent: "list_reminders")
    - Zamanlayıcı başlatma (intent: "start_timer", parameters: "duration")
+   - Zamanlayıcı iptal etme (intent: "cancel_timer", parameters: "timer_id" (opsiyonel))
+   - Hatırlatıcı silme (intent: "delete_reminder", parameters: "reminder_id")
 
 5. Medya Kontrolü:
    - Ekran görüntüsü (intent: "screenshot")
@@ -136,7 +141,9 @@ Kullanıcının komutunu analiz et ve JSON formatında döndür:
 - "Bugün hava nasıl?" → {{"intent": "weather", "response": "Hava durumunu kontrol ediyorum."}}
 - "İki artı iki kaç eder?" → {{"intent": "calculate", "parameters": {{"expression": "2+2"}}, "response": "İki artı iki dört eder."}}
 - "Not kaydet: Yarın toplantı var" → {{"intent": "save_note", "parameters": {{"note_text": "Yarın toplantı var"}}, "response": "Not kaydedildi."}}
+- "Notlarda ara: toplantı" → {{"intent": "search_notes", "parameters": {{"query": "toplantı"}}, "response": "Notlarınızda arıyorum."}}
 - "10 dakika sonra hatırlat: Toplantı" → {{"intent": "create_reminder", "parameters": {{"message": "Toplantı", "duration": "10 dakika"}}, "response": "Hatırlatıcı oluşturuldu."}}
+- "Her gün 09:00'da hatırlat: İlaç al" → {{"intent": "create_reminder", "parameters": {{"message": "İlaç al", "recurrence": "her gün 09:00"}}, "response": "Her gün 09:00 için hatırlatıcı kuruldu."}}
 - "Ekran görüntüsü al" → {{"intent": "screenshot", "response": "Ekran görüntüsü alınıyor."}}
 - "Sistem durumu nasıl?" → {{"intent": "system_status", "response": "Sistem durumunu kontrol ediyorum."}}
 - "Bellek kullanımı ne kadar?" → {{"intent": "memory_usage", "response": "Bellek kullanımını kontrol ediyorum."}}
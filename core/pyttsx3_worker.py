@@ -0,0 +1,172 @@
+"""
+Long-lived pyttsx3 engine worker
+
+pyttsx3 engines do not tolerate being driven from several threads, and
+re-running their loop in the same thread fails on some drivers ("run loop
+already started"). The engine therefore lives in one dedicated worker,
+a subprocess by default, that is initialized once and then fed a stream of
+utterances. Voices are enumerated once and the match for each language is
+cached, so offline speech starts without paying engine startup each time.
+"""
+import queue
+import threading
+import multiprocessing
+
+
+READY_TIMEOUT = 10.0
+
+# Substrings identifying a voice for each language (name, then id)
+_LANGUAGE_HINTS = {
+    'tr': ('turkish', 'tr'),
+    'en': ('english', 'en'),
+}
+
+
+def _find_voice(voices, language):
+    """Id of the first installed voice matching language, or None"""
+    name_hint, id_hint = _LANGUAGE_HINTS.get(language, (language, language))
+    for voice in voices:
+        if name_hint in (voice.name or '').lower() or id_hint in (voice.id or '').lower():
+            return voice.id
+    return None
+
+
+def _engine_main(requests, responses):
+    """Worker loop: one engine, utterances in, ('done'|'error', id, ...) out"""
+    try:
+        import pyttsx3
+        engine = pyttsx3.init()
+        voices = engine.getProperty('voices')
+    except Exception as e:
+        responses.put(('failed', None, str(e)))
+        return
+    responses.put(('ready', None, None))
+
+    voice_cache = {}
+    current = {}  # property -> value last applied to the engine
+    while True:
+        request = requests.get()
+        if request is None:  # Poison pill
+            break
+        utterance_id, text, language, rate, volume = request
+        try:
+            if language not in voice_cache:
+                voice_cache[language] = _find_voice(voices, language)
+            wanted = {'rate': rate, 'volume': volume, 'voice': voice_cache[language]}
+            for name, value in wanted.items():
+                if value is not None and current.get(name) != value:
+                    engine.setProperty(name, value)
+                    current[name] = value
+            engine.say(text)
+            engine.runAndWait()
+            responses.put(('done', utterance_id, None))
+        except Exception as e:
+            responses.put(('error', utterance_id, str(e)))
+
+
+class Pyttsx3Worker:
+    """Client for the engine worker (mode: 'process' or 'thread')"""
+
+    def __init__(self, mode='process'):
+        self.mode = mode
+        self._worker = None
+        self._requests = None
+        self._responses = None
+        self._ready = False
+        self._speaking = False
+        self.failed = False
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the worker in the background (engine init happens there)"""
+        if self.mode == 'process':
+            try:
+                # Spawn, not fork: the parent already runs Qt and audio threads (and may
+                # hold their locks), which a forked child would inherit mid-state
+                context = multiprocessing.get_context('spawn')
+                self._requests = context.Queue()
+                self._responses = context.Queue()
+                self._worker = context.Process(target=_engine_main, args=(self._requests, self._responses),
+                                               daemon=True, name="Pyttsx3Worker")
+                self._worker.start()
+                return True
+            except Exception as e:
+                print(f"pyttsx3 worker process unavailable, using a thread: {e}")
+                self.mode = 'thread'
+        self._requests = queue.Queue()
+        self._responses = queue.Queue()
+        self._worker = threading.Thread(target=_engine_main, args=(self._requests, self._responses),
+                                        daemon=True, name="Pyttsx3Worker")
+        self._worker.start()
+        return True
+
+    def _wait_ready(self):
+        if self._ready and self._is_alive():
+            return True
+        if self._ready:
+            self._reset()
+        if self.failed:
+            return False
+        if self._worker is None:
+            self.start()
+        try:
+            status, _, error = self._responses.get(timeout=READY_TIMEOUT)
+        except queue.Empty:
+            print("pyttsx3 engine did not start in time")
+            return False
+        if status != 'ready':
+            print(f"Error initializing pyttsx3 engine: {error}")
+            self._worker = None
+            self.failed = True  # No engine on this system; don't respawn per utterance
+            return False
+        self._ready = True
+        return True
+
+    def speak(self, text, language='tr', rate=None, volume=None):
+        """Speak one utterance; blocks until it finished. Returns True on success"""
+        with self._lock:
+            if not self._wait_ready():
+                return False
+            self._next_id += 1
+            utterance_id = self._next_id
+            self._requests.put((utterance_id, text, language, rate, volume))
+            self._speaking = True
+            try:
+                return self._wait_done(utterance_id)
+            finally:
+                self._speaking = False
+
+    def _wait_done(self, utterance_id):
+        while True:
+            try:
+                status, done_id, error = self._responses.get(timeout=0.1)
+            except queue.Empty:
+                if not self._is_alive():
+                    # Interrupted (or crashed): bring a fresh engine up for the next utterance
+                    self._reset()
+                    self.start()
+                    return False
+                continue
+            if done_id != utterance_id:
+                continue  # Late answer for an interrupted utterance
+            if status == 'error':
+                print(f"Error in pyttsx3 speak: {error}")
+            return status == 'done'
+
+    def _is_alive(self):
+        return self._worker is not None and self._worker.is_alive()
+
+    def _reset(self):
+        self._worker = None
+        self._ready = False
+
+    def interrupt(self):
+        """Cut the current utterance short (process mode only)"""
+        if self.mode == 'process' and self._speaking and self._is_alive():
+            self._worker.terminate()
+
+    def close(self):
+        if self._is_alive():
+            self._requests.put(None)
+        self._reset()
@@ -0,0 +1,105 @@
+"""
+Sentence-pipelined speech synthesis
+
+Long responses are split into sentences; while one sentence plays, the
+audio for the next ones is already being fetched on a producer thread. The
+producer runs at most `lookahead` sentences ahead, which bounds memory and
+the synthesis wasted when speech is interrupted.
+"""
+import queue
+import threading
+
+
+LOOKAHEAD = 2
+_END = object()
+
+
+class SentencePipeline:
+    """Plays sentences in order while synthesizing the following ones"""
+
+    def __init__(self, fetch, lookahead=LOOKAHEAD):
+        # fetch(sentence) -> iterator of PCM chunks (may be a generator that streams)
+        self.fetch = fetch
+        self.lookahead = max(1, lookahead)
+
+    def run(self, sentences, play, interrupted):
+        """
+        Play every sentence through play(chunk) until interrupted() is true.
+
+        Returns True if everything was played. Synthesis errors are raised
+        from here, on the playing thread.
+        """
+        if len(sentences) == 1:
+            return self._play_inline(sentences[0], play, interrupted)
+
+        slots = queue.Queue(maxsize=self.lookahead)
+        cancelled = threading.Event()
+        producer = threading.Thread(target=self._produce, args=(sentences, slots, cancelled),
+                                    daemon=True, name="SpeechPipeline")
+        producer.start()
+        try:
+            while True:
+                chunks = slots.get()
+                if chunks is _END:
+                    return True
+                while True:
+                    item = chunks.get()
+                    if item is _END:
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+                    if interrupted():
+                        return False
+                    play(item)
+        finally:
+            cancelled.set()
+            # Unblock a producer waiting for a free slot
+            while producer.is_alive():
+                try:
+                    slots.get(timeout=0.05)
+                except queue.Empty:
+                    pass
+
+    def _play_inline(self, sentence, play, interrupted):
+        chunks = iter(self.fetch(sentence))
+        try:
+            for chunk in chunks:
+                if interrupted():
+                    return False
+                play(chunk)
+            return True
+        finally:
+            close = getattr(chunks, 'close', None)
+            if close:
+                close()
+
+    def _produce(self, sentences, slots, cancelled):
+        for sentence in sentences:
+            chunks = queue.Queue()
+            if not self._put(slots, chunks, cancelled):
+                return
+            source = iter(self.fetch(sentence))
+            try:
+                for chunk in source:
+                    if cancelled.is_set():
+                        return
+                    chunks.put(chunk)
+            except Exception as e:
+                chunks.put(e)
+                return
+            finally:
+                close = getattr(source, 'close', None)
+                if close:
+                    close()
+                chunks.put(_END)
+        self._put(slots, _END, cancelled)
+
+    @staticmethod
+    def _put(slots, item, cancelled):
+        while not cancelled.is_set():
+            try:
+                slots.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
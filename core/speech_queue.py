@@ -0,0 +1,134 @@
+"""
+Priority-aware, coalescing speech queue
+
+Utterances are served by priority (reminder alerts before command results
+before chit-chat), FIFO within a priority. A keyed utterance replaces any
+still-queued utterance with the same key, so a newer status message
+supersedes a stale one, and utterances past their TTL are dropped unspoken
+instead of being read out late. Removal is lazy (entries are marked dead),
+so put, replace and get stay O(log n).
+"""
+import heapq
+import itertools
+import threading
+import time
+
+
+PRIORITY_ALERT = 0
+PRIORITY_RESULT = 1
+PRIORITY_CHAT = 2
+
+# Seconds an utterance may wait before it is no longer worth saying
+DEFAULT_TTL = {
+    PRIORITY_ALERT: None,
+    PRIORITY_RESULT: 30.0,
+    PRIORITY_CHAT: 15.0,
+}
+
+
+class SpeechItem:
+    __slots__ = ('text', 'language', 'priority', 'key', 'expires', 'done', 'seq', 'dead')
+
+    def __init__(self, text, language, priority, key, expires, done, seq):
+        self.text = text
+        self.language = language
+        self.priority = priority
+        self.key = key
+        self.expires = expires
+        self.done = done
+        self.seq = seq
+        self.dead = False
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+    def release(self):
+        """Wake a speak_sync caller waiting on this item"""
+        if self.done is not None:
+            self.done.set()
+
+
+class SpeechQueue:
+    """Thread-safe priority queue of utterances with key replacement and TTL"""
+
+    def __init__(self):
+        self._heap = []
+        self._keys = {}
+        self._live = 0
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self.replaced = 0
+        self.expired = 0
+
+    def put(self, text, language='tr', priority=PRIORITY_RESULT, key=None, ttl=None, done=None):
+        """Queue an utterance; ttl None means the priority's default"""
+        if ttl is None:
+            ttl = DEFAULT_TTL.get(priority)
+        expires = time.monotonic() + ttl if ttl else None
+        with self._cond:
+            if key is not None:
+                stale = self._keys.pop(key, None)
+                if stale is not None and not stale.dead:
+                    self._kill(stale)
+                    self.replaced += 1
+            item = SpeechItem(text, language, priority, key, expires, done, next(self._seq))
+            heapq.heappush(self._heap, item)
+            self._live += 1
+            if key is not None:
+                self._keys[key] = item
+            self._cond.notify()
+        return item
+
+    def _kill(self, item):
+        item.dead = True
+        self._live -= 1
+        item.release()
+
+    def get(self, timeout=None):
+        """Next live, unexpired utterance by priority; None on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                while self._heap:
+                    item = heapq.heappop(self._heap)
+                    if item.dead:
+                        continue
+                    self._live -= 1
+                    if item.key is not None and self._keys.get(item.key) is item:
+                        del self._keys[item.key]
+                    if item.expires is not None and time.monotonic() > item.expires:
+                        self.expired += 1
+                        item.release()
+                        continue
+                    return item
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def flush(self, below=None):
+        """
+        Atomically drop queued utterances (all, or only those with
+        priority > below). Returns how many were dropped.
+        """
+        with self._cond:
+            if below is None:
+                dropped = [item for item in self._heap if not item.dead]
+                self._heap = []
+                self._keys.clear()
+                self._live = 0
+                for item in dropped:
+                    item.dead = True
+                    item.release()
+                return len(dropped)
+            dropped = 0
+            for item in self._heap:
+                if not item.dead and item.priority > below:
+                    if item.key is not None and self._keys.get(item.key) is item:
+                        del self._keys[item.key]
+                    self._kill(item)
+                    dropped += 1
+            return dropped
+
+    def __len__(self):
+        return self._live
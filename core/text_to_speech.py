@@ -1,11 +1,27 @@
 """
 Text-to-Speech module with ElevenLabs and pyttsx3 fallback
+
+Streamed ElevenLabs speech is played through one persistent PCM sink
+(core.audio_output), gapless across sentences and cut at once by
+stop(). The two fallbacks have their own output: the non-streaming
+ElevenLabs SDK returns MP3, played with pygame, and pyttsx3 speaks
+through its engine worker. stop() (and so barge-in) cuts each of them its
+own way: pygame is stopped, and the pyttsx3 worker process is
+terminated; in 'thread' worker mode the current pyttsx3 utterance cannot
+be cut and plays to its end. The echo window covers all three paths.
 """
-import pyttsx3
 import threading
-import queue
+import time
 import io
+from collections import deque
 from utils.config import config
+from utils.metrics import LatencyStats
+from core.audio_output import create_sink, PYAUDIO_AVAILABLE
+from core.tts_cache import TtsCache, cache_key, PHRASE_CATALOGUE
+from core.pyttsx3_worker import Pyttsx3Worker
+from core.speech_pipeline import SentencePipeline, LOOKAHEAD
+from core.speech_queue import SpeechQueue, PRIORITY_ALERT, PRIORITY_RESULT, PRIORITY_CHAT
+from utils.text_normalize import split_sentences
 
 # Try to import ElevenLabs
 ELEVENLABS_AVAILABLE = False
@@ -17,6 +33,15 @@ try:
 except ImportError:
     pass  # ElevenLabs not available, using pyttsx3 only
 
+# Streaming synthesis needs only requests and a PCM output sink
+STREAMING_AVAILABLE = False
+try:
+    from core.elevenlabs_stream import ElevenLabsStreamer, DEFAULT_API_BASE, SAMPLE_RATE
+    STREAMING_AVAILABLE = True
+except ImportError:
+    SAMPLE_RATE = 22050
+    pass  # requests not available, no streaming synthesis
+
 # Try to import pygame for audio playback
 PYGAME_AVAILABLE = False
 try:
@@ -31,57 +56,83 @@ class TextToSpeech:
     """Text-to-Speech engine with ElevenLabs (primary) and pyttsx3 (fallback) support"""
     
     def __init__(self):
-        self.provider = config.get('tts.provider', 'elevenlabs' if ELEVENLABS_AVAILABLE else 'pyttsx3')
-        self.elevenlabs_api_key = config.get('tts.elevenlabs.api_key', '')
-        self.elevenlabs_voice_id = config.get('tts.elevenlabs.voice_id', '21m00Tcm4TlvDq8ikWAM')  # Default voice
-        self.elevenlabs_model = config.get('tts.elevenlabs.model_id', 'eleven_multilingual_v2')
-        self.elevenlabs_stability = config.get('tts.elevenlabs.stability', 0.5)
-        self.elevenlabs_similarity = config.get('tts.elevenlabs.similarity_boost', 0.75)
-        
-        # Initialize ElevenLabs if available and configured
-        if ELEVENLABS_AVAILABLE and self.elevenlabs_api_key:
-            try:
-                set_api_key(self.elevenlabs_api_key)
-                print("ElevenLabs initialized successfully")
-            except Exception as e:
-                print(f"Error initializing ElevenLabs: {e}")
-                self.provider = 'pyttsx3'
+        # Per-utterance settings are read through precompiled config accessors
+        self.rate = config.key('tts.rate', 150)
+        self.volume = config.key('tts.volume', 0.9)
+        self.elevenlabs_api_key = ''
+        self.streamer = None
+        # Persistent PCM sink for streamed speech ('device', 'null' or 'file:<path.wav>');
+        # the SDK and pyttsx3 fallbacks play through pygame and their engine instead
+        output_spec = config.get('tts.output', 'device')
+        self.output = (create_sink(output_spec, SAMPLE_RATE)
+                       if PYAUDIO_AVAILABLE or output_spec != 'device' else None)
+        self.ttfa = LatencyStats('TTS time-to-first-audio')
+        self.cache = TtsCache(max_bytes=int(config.get('tts.cache.max_mb', 50) * 1024 * 1024))
+        self._interrupted = threading.Event()
+        self._prewarm_thread = None
+        self._apply_config(config.snapshot())
         
         # Initialize pyttsx3 as fallback
-        self.pyttsx3_engine = None
+        self.pyttsx3_worker = None
         self.initialized = False
-        self.speak_queue = queue.Queue()
+        self.speak_queue = SpeechQueue()
+        self._current_priority = None
+        self._state_lock = threading.Lock()
         self.speaking = False
+        self.last_speech_end = 0.0
+        self.recent_speech = deque(maxlen=5)  # Texts spoken lately, for echo suppression
         self.speak_thread = None
         self._init_pyttsx3()
         self._start_speak_thread()
+        self.prewarm()
+        config.subscribe(self._on_config_changed, 'tts')
+    
+    def _apply_config(self, snapshot):
+        """Take provider and ElevenLabs settings from a config snapshot"""
+        self.provider = snapshot.get('tts.provider', 'elevenlabs' if ELEVENLABS_AVAILABLE else 'pyttsx3')
+        api_key = snapshot.get('tts.elevenlabs.api_key', '')
+        self.elevenlabs_voice_id = snapshot.get('tts.elevenlabs.voice_id', '21m00Tcm4TlvDq8ikWAM')  # Default voice
+        self.elevenlabs_model = snapshot.get('tts.elevenlabs.model_id', 'eleven_multilingual_v2')
+        self.elevenlabs_stability = snapshot.get('tts.elevenlabs.stability', 0.5)
+        self.elevenlabs_similarity = snapshot.get('tts.elevenlabs.similarity_boost', 0.75)
+        self.elevenlabs_streaming = snapshot.get('tts.elevenlabs.streaming', True)
+        self.pipeline_lookahead = snapshot.get('tts.pipeline.lookahead', LOOKAHEAD)
+        self.cache_enabled = snapshot.get('tts.cache.enabled', True)
+        self.cache_prewarm = snapshot.get('tts.cache.prewarm', True)
+        self.cache.max_bytes = int(snapshot.get('tts.cache.max_mb', 50) * 1024 * 1024)
+        api_base = snapshot.get('tts.elevenlabs.api_base', DEFAULT_API_BASE if STREAMING_AVAILABLE else '')
+        
+        # Streaming client keeps one keep-alive session per key/endpoint
+        if STREAMING_AVAILABLE and api_key and (
+                self.streamer is None or (self.streamer.api_key, self.streamer.api_base) != (api_key, api_base.rstrip('/'))):
+            if self.streamer:
+                self.streamer.close()
+            self.streamer = ElevenLabsStreamer(api_key, api_base)
+        
+        # Initialize ElevenLabs if available and configured (again only when the key changes)
+        if ELEVENLABS_AVAILABLE and api_key and api_key != self.elevenlabs_api_key:
+            try:
+                set_api_key(api_key)
+                print("ElevenLabs initialized successfully")
+            except Exception as e:
+                print(f"Error initializing ElevenLabs: {e}")
+                self.provider = 'pyttsx3'
+        self.elevenlabs_api_key = api_key
+    
+    def _on_config_changed(self, changed_keys, snapshot):
+        """Apply TTS settings changes in place"""
+        self._apply_config(snapshot)
+        if any(key.startswith(('tts.elevenlabs.', 'tts.cache.')) for key in changed_keys):
+            # New voice settings address different cache entries
+            self.prewarm()
     
     def _init_pyttsx3(self):
-        """Initialize pyttsx3 engine as fallback"""
+        """Start the long-lived pyttsx3 engine worker (fallback)"""
+        self.pyttsx3_worker = Pyttsx3Worker(mode=config.get('tts.pyttsx3.worker', 'process'))
         try:
-            self.pyttsx3_engine = pyttsx3.init()
-            
-            # Set properties from config
-            rate = config.get('tts.rate', 150)
-            volume = config.get('tts.volume', 0.9)
-            
-            self.pyttsx3_engine.setProperty('rate', rate)
-            self.pyttsx3_engine.setProperty('volume', volume)
-            
-            # Try to set Turkish voice if available
-            voices = self.pyttsx3_engine.getProperty('voices')
-            turkish_voice = None
-            for voice in voices:
-                if 'turkish' in voice.name.lower() or 'tr' in voice.id.lower():
-                    turkish_voice = voice.id
-                    break
-            
-            if turkish_voice:
-                self.pyttsx3_engine.setProperty('voice', turkish_voice)
-            
-            self.initialized = True
+            self.initialized = self.pyttsx3_worker.start()
         except Exception as e:
-            print(f"Error initializing pyttsx3 engine: {e}")
+            print(f"Error starting pyttsx3 worker: {e}")
             self.initialized = False
     
     def _start_speak_thread(self):
@@ -90,42 +141,149 @@ class TextToSpeech:
             while True:
                 try:
                     item = self.speak_queue.get()
-                    if item is None:  # Poison pill
-                        break
-                    
-                    text, language = item if isinstance(item, tuple) else (item, 'tr')
-                    
-                    # Try ElevenLabs first if configured
-                    if self.provider == 'elevenlabs' and ELEVENLABS_AVAILABLE and self.elevenlabs_api_key:
-                        try:
-                            self._speak_elevenlabs(text, language)
-                            self.speak_queue.task_done()
-                            continue
-                        except Exception as e:
-                            print(f"ElevenLabs error, falling back to pyttsx3: {e}")
-                            # Fall through to pyttsx3
-                    
-                    # Use pyttsx3 (fallback or primary)
-                    if self.initialized:
-                        try:
-                            self._speak_pyttsx3(text, language)
-                        except Exception as e:
-                            print(f"Error in pyttsx3 speak: {e}")
-                    
-                    self.speak_queue.task_done()
+                    with self._state_lock:
+                        self._interrupted.clear()
+                        self._current_priority = item.priority
+                    try:
+                        self._speak_now(item.text, item.language)
+                    finally:
+                        with self._state_lock:
+                            self._current_priority = None
+                        item.release()
                     
                 except Exception as e:
                     print(f"Error in TTS worker thread: {e}")
-                    try:
-                        self.speak_queue.task_done()
-                    except:
-                        pass
         
-        self.speak_thread = threading.Thread(target=_speak_worker, daemon=True)
+        self.speak_thread = threading.Thread(target=_speak_worker, daemon=True, name="TextToSpeech")
         self.speak_thread.start()
     
+    def _can_stream(self):
+        return (STREAMING_AVAILABLE and self.elevenlabs_streaming and self.streamer is not None
+                and self.output is not None)
+    
+    def _elevenlabs_ready(self):
+        """ElevenLabs selected, configured and usable through the SDK or streaming"""
+        return (self.provider == 'elevenlabs' and bool(self.elevenlabs_api_key)
+                and (ELEVENLABS_AVAILABLE or self._can_stream()))
+    
+    def _speak_now(self, text, language='tr'):
+        """Synthesize and play one utterance (speak thread only)"""
+        self.speaking = True
+        self.recent_speech.append(text)
+        try:
+            self._play_utterance(text, language)
+        finally:
+            self.speaking = False
+            self.last_speech_end = time.monotonic()
+    
+    def _play_utterance(self, text, language):
+        # Try ElevenLabs first if configured
+        if self._elevenlabs_ready():
+            try:
+                self._speak_elevenlabs(text, language)
+                return
+            except Exception as e:
+                print(f"ElevenLabs error, falling back to pyttsx3: {e}")
+                # Fall through to pyttsx3
+        
+        # Use pyttsx3 (fallback or primary), unless stop() came while ElevenLabs failed
+        if self.initialized and not self._interrupted.is_set():
+            try:
+                self._speak_pyttsx3(text, language)
+            except Exception as e:
+                print(f"Error in pyttsx3 speak: {e}")
+    
+    def _cache_key(self, text):
+        return cache_key(text, self.elevenlabs_voice_id, self.elevenlabs_model,
+                         self.elevenlabs_stability, self.elevenlabs_similarity)
+    
+    def _sentence_audio(self, sentence, chunk_size=8192):
+        """PCM chunks for one sentence: from the cache, or streamed and cached once complete"""
+        key = self._cache_key(sentence) if self.cache_enabled else None
+        audio = self.cache.get(key) if key else None
+        if audio is not None:
+            # Cached: no network round trip and no API cost
+            view = memoryview(audio)
+            for start in range(0, len(view), chunk_size):
+                yield view[start:start + chunk_size]
+            return
+        
+        received = []
+        chunks = self.streamer.stream(sentence, self.elevenlabs_voice_id, self.elevenlabs_model,
+                                      self.elevenlabs_stability, self.elevenlabs_similarity)
+        try:
+            for chunk in chunks:
+                received.append(chunk)
+                yield chunk
+        finally:
+            chunks.close()
+        # Not reached when playback stopped early: only whole sentences are cached
+        if key:
+            self.cache.put(key, b''.join(received))
+    
+    def _speak_elevenlabs_stream(self, text):
+        """Speak using the ElevenLabs streaming endpoint, sentence by sentence with lookahead"""
+        started = time.perf_counter()
+        first_audio = True
+        
+        def play(chunk):
+            nonlocal first_audio
+            if first_audio:
+                first_audio = False
+                self.ttfa.record((time.perf_counter() - started) * 1000)
+            self.output.write(chunk, sample_rate=SAMPLE_RATE, channels=1,
+                              should_stop=self._interrupted.is_set)
+        
+        pipeline = SentencePipeline(self._sentence_audio, self.pipeline_lookahead)
+        try:
+            pipeline.run(split_sentences(text), play, self._interrupted.is_set)
+        except Exception as e:
+            if first_audio:
+                raise  # Nothing played yet, let the caller fall back
+            print(f"ElevenLabs stream interrupted: {e}")
+        # Stay "speaking" until the audio has actually been heard
+        if self._interrupted.is_set():
+            self.output.flush()
+        else:
+            self.output.drain()
+    
+    def prewarm(self, phrases=None):
+        """Synthesize fixed phrases into the cache in the background (no playback)"""
+        if not (self.cache_enabled and self.cache_prewarm and self._can_stream() and self.elevenlabs_api_key):
+            return
+        if self._prewarm_thread and self._prewarm_thread.is_alive():
+            return
+        self._prewarm_thread = threading.Thread(target=self._prewarm_worker,
+                                                args=(phrases or PHRASE_CATALOGUE,),
+                                                daemon=True, name="TTSPrewarm")
+        self._prewarm_thread.start()
+    
+    def _prewarm_worker(self, phrases):
+        # Separate client: requests sessions are not shared across threads
+        streamer = ElevenLabsStreamer(self.streamer.api_key, self.streamer.api_base)
+        synthesized = 0
+        try:
+            for phrase in phrases:
+                voice_settings = (self.elevenlabs_voice_id, self.elevenlabs_model,
+                                  self.elevenlabs_stability, self.elevenlabs_similarity)
+                key = cache_key(phrase, *voice_settings)
+                if key in self.cache:
+                    continue
+                self.cache.put(key, b''.join(streamer.stream(phrase, *voice_settings)))
+                synthesized += 1
+        except Exception as e:
+            print(f"TTS cache prewarm stopped: {e}")
+        finally:
+            streamer.close()
+        if synthesized:
+            print(f"TTS cache prewarmed {synthesized} phrases")
+    
     def _speak_elevenlabs(self, text, language='tr'):
         """Speak using ElevenLabs API"""
+        if self._can_stream():
+            self._speak_elevenlabs_stream(text)
+            return
+        
         if not ELEVENLABS_AVAILABLE or not self.elevenlabs_api_key:
             raise Exception("ElevenLabs not available")
         
@@ -138,42 +296,19 @@ class TextToSpeech:
                 stream=False
             )
             
-            # Play audio using pygame
-            if PYGAME_AVAILABLE:
-                audio_stream = io.BytesIO(audio)
-                pygame.mixer.music.load(audio_stream)
-                pygame.mixer.music.play()
-                
-                # Wait for playback to finish
-                while pygame.mixer.music.get_busy():
-                    pygame.time.wait(100)
-            else:
-                # Fallback: save to temp file and play
-                import tempfile
-                import os
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as f:
-                    f.write(audio)
-                    temp_path = f.name
-                
-                try:
-                    import subprocess
-                    import platform
-                    if platform.system() == 'Windows':
-                        os.startfile(temp_path)
-                    elif platform.system() == 'Darwin':
-                        subprocess.run(['afplay', temp_path])
-                    else:
-                        subprocess.run(['mpg123', temp_path])
-                    
-                    # Wait a bit for playback
-                    import time
-                    time.sleep(len(text) * 0.1)  # Rough estimate
-                finally:
-                    try:
-                        os.unlink(temp_path)
-                    except:
-                        pass
-                        
+            # MP3 from the SDK is decoded and played by pygame
+            if not PYGAME_AVAILABLE:
+                raise Exception("No MP3 playback available")
+            if self._interrupted.is_set():
+                return  # stop() came while the audio was generated
+            pygame.mixer.music.load(io.BytesIO(audio))
+            pygame.mixer.music.play()
+            while pygame.mixer.music.get_busy() and not self._interrupted.is_set():
+                pygame.time.wait(20)
+            # stop() may have run between load and play; make sure nothing keeps playing
+            if self._interrupted.is_set():
+                pygame.mixer.music.stop()
+        
         except Exception as e:
             print(f"Error in ElevenLabs TTS: {e}")
             raise
@@ -183,126 +318,120 @@ class TextToSpeech:
         if not self.initialized:
             return
         
-        try:
-            # Create a new engine instance for each speak to avoid "run loop already started" error
-            engine = pyttsx3.init()
-            
-            # Set properties
-            rate = config.get('tts.rate', 150)
-            volume = config.get('tts.volume', 0.9)
-            engine.setProperty('rate', rate)
-            engine.setProperty('volume', volume)
-            
-            # Try to set voice based on language
-            try:
-                voices = engine.getProperty('voices')
-                selected_voice = None
-                for voice in voices:
-                    if language == 'tr' and ('turkish' in voice.name.lower() or 'tr' in voice.id.lower()):
-                        selected_voice = voice.id
-                        break
-                    elif language == 'en' and ('english' in voice.name.lower() or 'en' in voice.id.lower()):
-                        selected_voice = voice.id
-                        break
-                
-                if selected_voice:
-                    engine.setProperty('voice', selected_voice)
-            except:
-                pass
-            
-            engine.say(text)
-            engine.runAndWait()
-            engine.stop()
-        except Exception as e:
-            print(f"Error in pyttsx3 speak: {e}")
-            raise
+        if not self.pyttsx3_worker.speak(text, language, self.rate(), self.volume()):
+            self.initialized = not self.pyttsx3_worker.failed
     
-    def speak(self, text, language='tr'):
-        """Speak text asynchronously"""
+    def speak(self, text, language='tr', priority=PRIORITY_RESULT, key=None, ttl=None):
+        """
+        Speak text asynchronously.
+        
+        priority: PRIORITY_ALERT, PRIORITY_RESULT or PRIORITY_CHAT
+        key: a newer utterance with the same key replaces this one while queued
+        ttl: seconds after which it is dropped unspoken (default per priority)
+        """
         if not text:
             return None
         
         try:
-            # Add to queue
-            self.speak_queue.put((text, language))
+            self._enqueue(text, language, priority, key, ttl)
             return True
         except Exception as e:
             print(f"Error queuing TTS: {e}")
             return None
     
-    def speak_sync(self, text, language='tr'):
-        """Speak text synchronously (blocks until done)"""
+    def speak_sync(self, text, language='tr', timeout=None, priority=PRIORITY_RESULT):
+        """Speak text synchronously (blocks until done, in order with queued speech)"""
         if not text:
             return
         
-        # Try ElevenLabs first
-        if self.provider == 'elevenlabs' and ELEVENLABS_AVAILABLE and self.elevenlabs_api_key:
-            try:
-                self._speak_elevenlabs(text, language)
-                return
-            except Exception as e:
-                print(f"ElevenLabs sync error, using pyttsx3: {e}")
-        
-        # Fallback to pyttsx3
-        self._speak_pyttsx3(text, language)
+        # Goes through the same queue so it never talks over queued speech
+        done = threading.Event()
+        self._enqueue(text, language, priority, None, None, done)
+        done.wait(timeout)
+    
+    def _enqueue(self, text, language, priority, key, ttl, done=None):
+        self.speak_queue.put(text, language, priority, key, ttl, done)
+        # Alerts never wait behind lower-priority speech already playing
+        with self._state_lock:
+            current = self._current_priority
+            if priority == PRIORITY_ALERT and current is not None and current > PRIORITY_ALERT:
+                self._interrupted.set()
     
     def set_rate(self, rate):
         """Set speech rate (for pyttsx3)"""
-        if self.pyttsx3_engine:
-            try:
-                self.pyttsx3_engine.setProperty('rate', rate)
-                config.set('tts.rate', rate)
-            except:
-                pass
+        # Applied by the engine worker from the next utterance on
+        config.set('tts.rate', rate)
     
     def set_volume(self, volume):
         """Set speech volume (0.0 to 1.0)"""
-        if self.pyttsx3_engine:
-            try:
-                self.pyttsx3_engine.setProperty('volume', volume)
-                config.set('tts.volume', volume)
-            except:
-                pass
+        config.set('tts.volume', volume)
     
     def set_provider(self, provider):
         """Switch TTS provider (elevenlabs or pyttsx3)"""
         if provider in ['elevenlabs', 'pyttsx3']:
-            self.provider = provider
             config.set('tts.provider', provider)
             return True
         return False
     
     def set_elevenlabs_settings(self, stability=None, similarity_boost=None):
         """Update ElevenLabs voice settings"""
-        if stability is not None:
-            self.elevenlabs_stability = stability
-            config.set('tts.elevenlabs.stability', stability)
-        if similarity_boost is not None:
-            self.elevenlabs_similarity = similarity_boost
-            config.set('tts.elevenlabs.similarity_boost', similarity_boost)
+        with config.batch():
+            if stability is not None:
+                config.set('tts.elevenlabs.stability', stability)
+            if similarity_boost is not None:
+                config.set('tts.elevenlabs.similarity_boost', similarity_boost)
+    
+    def stats(self):
+        """Latency summaries for diagnostics (see utils.metrics.LatencyStats.summary)"""
+        return {'ttfa': self.ttfa.summary()}
+    
+    def in_echo_window(self, tail=0.0):
+        """True while speaking and for `tail` seconds after, when the mic may hear our own output"""
+        return self.speaking or time.monotonic() - self.last_speech_end < tail
+    
+    def barge_in(self):
+        """The user started talking: cut current speech and drop everything queued"""
+        if self.speaking:
+            print("Barge-in: speech interrupted")
+        self.stop()
     
     def stop(self):
-        """Stop current speech"""
-        # Clear queue
-        try:
-            while not self.speak_queue.empty():
-                try:
-                    self.speak_queue.get_nowait()
-                except:
-                    break
-        except:
-            pass
+        """Stop current speech on whichever output plays it (see the module docstring)"""
+        self._interrupted.set()
+        
+        # Drop everything queued in one step, releasing any speak_sync callers
+        self.speak_queue.flush()
         
-        # Stop pygame if playing
+        # Cut streamed audio already handed to the PCM sink
+        if self.output:
+            self.output.flush()
+        
+        # Stop SDK (MP3) speech playing through pygame
         if PYGAME_AVAILABLE:
             try:
                 pygame.mixer.music.stop()
             except:
                 pass
         
-        # Stop pyttsx3
-        if self.pyttsx3_engine:
-            try:
-                self.pyttsx3_engine.stop()
-            except:
-                pass
+        # Stop pyttsx3 speech (terminates its worker process; no effect in thread mode)
+        if self.pyttsx3_worker:
+            self.pyttsx3_worker.interrupt()
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_tts():
+    """
+    Process-wide TextToSpeech service.
+    
+    All modules speak through this one instance: one engine, one ordered
+    queue and one output device, so speech from different sources never overlaps.
+    """
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = TextToSpeech()
+    return _service
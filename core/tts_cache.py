@@ -0,0 +1,150 @@
+"""
+Content-addressed on-disk cache for synthesized speech
+
+Each entry is the raw PCM for one utterance, stored under the SHA-256 of
+everything that affects the audio (text, voice, model and voice settings),
+so a settings change can never replay stale audio. The directory is kept
+under a size bound by evicting the least recently played entries.
+"""
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from utils.storage import DATA_DIR
+
+
+CACHE_DIR = DATA_DIR / "tts_cache"
+MAX_BYTES = 50 * 1024 * 1024
+SUFFIX = '.pcm'
+
+# Fixed responses worth synthesizing ahead of time
+PHRASE_CATALOGUE = [
+    "Jarvis hazır. Komutlarınızı dinliyorum.",
+    "Jarvis durduruldu.",
+    "Üzgünüm, komutu anlayamadım. Lütfen tekrar deneyin.",
+    "Zamanlayıcı bitti!",
+    "Ses seviyesi artırıldı",
+    "Ses seviyesi azaltıldı",
+    "Ses kapatıldı",
+    "Medya oynatıldı/durduruldu",
+    "Sonraki şarkı",
+    "Önceki şarkı",
+] + [f"Ses seviyesi {level}% olarak ayarlandı" for level in range(0, 101, 10)]
+
+
+def cache_key(text, voice_id, model_id, stability, similarity_boost):
+    """Content address of an utterance"""
+    material = json.dumps([text.strip(), voice_id, model_id, float(stability), float(similarity_boost)],
+                          ensure_ascii=False)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class TtsCache:
+    """Size-bounded LRU cache of PCM audio files"""
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = None  # key -> size, least recently used first
+        self._total = 0
+
+    def _load_index(self):
+        """Build the LRU order from file mtimes (called with the lock held)"""
+        if self._entries is not None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        files = []
+        for path in self.directory.glob('*' + SUFFIX):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, path.stem, st.st_size))
+        files.sort()
+        self._entries = OrderedDict((key, size) for _, key, size in files)
+        self._total = sum(self._entries.values())
+        self._evict()
+
+    def _path(self, key):
+        return self.directory / (key + SUFFIX)
+
+    def __contains__(self, key):
+        with self._lock:
+            self._load_index()
+            return key in self._entries
+
+    def get(self, key):
+        """Cached PCM bytes, or None on a miss"""
+        with self._lock:
+            self._load_index()
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+        try:
+            data = self._path(key).read_bytes()
+            # Persist recency across restarts
+            os.utime(self._path(key))
+        except OSError:
+            with self._lock:
+                self._discard(key)
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, key, data):
+        """Store PCM bytes atomically, then evict down to the size bound"""
+        if not data or len(data) > self.max_bytes:
+            return
+        with self._lock:
+            self._load_index()
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"Error writing TTS cache entry: {e}")
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            return
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = len(data)
+            self._total += len(data)
+            self._evict()
+
+    def _discard(self, key):
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._total -= size
+
+    def _evict(self):
+        while self._total > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total -= size
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries or ()),
+                'bytes': self._total,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
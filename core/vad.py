@@ -0,0 +1,245 @@
+"""
+Streaming voice activity detection and endpointing
+
+Microphone chunks are cut into short frames whose RMS energy is computed
+for the whole chunk at once with NumPy. A phrase starts after START_MS of
+frames above the speech threshold and ends as soon as HANGOVER_MS of
+frames have stayed below it (with hysteresis, so soft word endings do not
+split a phrase). Frames are read as views of the capture ring buffer
+(core.audio_buffer), so the phrase handed to recognition includes
+PRE_ROLL_MS before the detected start and nothing is copied until a phrase
+is complete. A phrase longer than MAX_PHRASE is cut into segments that
+overlap by OVERLAP_MS, so a word on the cut is not lost.
+
+The threshold follows a running percentile of frame energy (NoiseFloor),
+so there is no blocking ambient-noise calibration before listening.
+
+Compared with speech_recognition's listen() (0.8 s pause threshold and a
+0.5 s timeout loop around it) a phrase is delivered HANGOVER_MS after the
+user stops speaking.
+"""
+import numpy as np
+from utils.config import config
+
+
+SAMPLE_WIDTH = 2  # speech_recognition microphones capture signed 16-bit PCM
+FRAME_MS = 20
+START_MS = 60  # speech needed before a phrase starts
+HANGOVER_MS = 300  # silence needed before a phrase ends
+PRE_ROLL_MS = 300  # audio kept from before the detected start
+TAIL_MS = 100  # silence kept after the last speech frame
+MIN_PHRASE_MS = 200  # shorter bursts (clicks, knocks) are dropped
+MAX_PHRASE = 8.0  # seconds; longer phrases are cut here
+OVERLAP_MS = 500  # audio shared by the two sides of such a cut
+# A phrase continues while energy stays above this share of the start threshold
+HYSTERESIS = 0.7
+# Background estimate: this percentile of frame RMS over the last NOISE_WINDOW seconds,
+# times NOISE_RATIO, is the speech threshold
+NOISE_PERCENTILE = 20
+NOISE_WINDOW = 3.0
+NOISE_RATIO = 2.5
+MIN_THRESHOLD = 100.0
+
+
+class NoiseFloor:
+    """
+    Running estimate of the background level from frame energies.
+
+    The floor is a low percentile of the frame RMS over the last WINDOW
+    seconds, which stays on the background even while someone talks, so
+    the speech threshold follows the room without a calibration pause.
+    """
+
+    def __init__(self, frame_ms=FRAME_MS, initial=300.0):
+        self.percentile = config.get('voice.noise.percentile', NOISE_PERCENTILE)
+        self.ratio = config.get('voice.noise.ratio', NOISE_RATIO)
+        self.minimum = config.get('voice.noise.min_threshold', MIN_THRESHOLD)
+        frames = int(config.get('voice.noise.window', NOISE_WINDOW) * 1000 / frame_ms)
+        self._history = np.zeros(max(frames, 1), dtype=np.float32)
+        self._count = 0
+        self._warm_up = min(len(self._history), int(500 / frame_ms))
+        self.floor = initial / self.ratio
+        self._threshold = float(initial)
+
+    def update(self, energies):
+        """Add frame energies and re-estimate"""
+        size = len(self._history)
+        energies = energies[-size:]
+        offset = self._count % size
+        first = min(len(energies), size - offset)
+        self._history[offset:offset + first] = energies[:first]
+        self._history[:len(energies) - first] = energies[first:]
+        self._count += len(energies)
+        held = min(self._count, size)
+        if held < self._warm_up:
+            return
+        self.floor = float(np.percentile(self._history[:held], self.percentile))
+        self._threshold = max(self.minimum, self.floor * self.ratio)
+
+    def threshold(self):
+        return self._threshold
+
+
+def frame_rms(samples, frame):
+    """RMS of each whole frame of int16 samples (vectorized)"""
+    count = len(samples) // frame
+    frames = samples[:count * frame].reshape(count, frame).astype(np.float32)
+    return np.sqrt(np.einsum('ij,ij->i', frames, frames) / frame)
+
+
+class Phrase:
+    """One endpointed phrase: PCM plus absolute sample positions in the capture buffer"""
+
+    __slots__ = ('pcm', 'start', 'end', 'detected')
+
+    def __init__(self, pcm, start, end, detected):
+        self.pcm = pcm
+        self.start = start
+        self.end = end
+        self.detected = detected  # position at which the phrase was known to be over
+
+
+class StreamingVAD:
+    """
+    Frame-based endpointer reading from an AudioRingBuffer.
+
+    The speech RMS threshold comes from threshold() if given, otherwise
+    from a NoiseFloor estimate updated with every frame. advance() analyses everything captured
+    since the last call and returns the Phrases completed in it;
+    process(data) writes PCM into the buffer first (for callers without a
+    capture thread).
+    """
+
+    def __init__(self, buffer, threshold=None):
+        self.buffer = buffer
+        self.sample_rate = sample_rate = buffer.sample_rate
+        self.frame_ms = config.get('voice.vad.frame_ms', FRAME_MS)
+        self.noise = NoiseFloor(self.frame_ms) if threshold is None else None
+        self.threshold = threshold or self.noise.threshold
+        self.frame = int(sample_rate * self.frame_ms / 1000)
+        self.start_frames = self._frames(config.get('voice.vad.start_ms', START_MS))
+        self.hangover_frames = self._frames(config.get('voice.vad.hangover_ms', HANGOVER_MS))
+        self.pre_roll = self._samples(config.get('voice.vad.pre_roll_ms', PRE_ROLL_MS))
+        self.overlap = self._samples(config.get('voice.vad.overlap_ms', OVERLAP_MS))
+        self.tail = self._samples(TAIL_MS)
+        self.min_phrase = self._samples(MIN_PHRASE_MS)
+        self.max_phrase = int(config.get('voice.vad.max_phrase', MAX_PHRASE) * sample_rate)
+        self.position = buffer.written  # next sample to analyse
+        self.lost = 0  # samples overwritten before they were analysed
+        self._speech_run = 0
+        self._silence_run = 0
+        self._start = None  # absolute start of the current phrase, pre-roll included
+        self._onset = 0  # where speech was detected
+        self._last_speech = 0
+        self.last_rms = 0.0
+        self.in_phrase = False
+
+    def _frames(self, milliseconds):
+        return max(1, int(round(milliseconds / self.frame_ms)))
+
+    def _samples(self, milliseconds):
+        return int(self.sample_rate * milliseconds / 1000)
+
+    def reset(self):
+        """Forget the phrase in progress and skip to the newest audio"""
+        self.position = self.buffer.written
+        self._speech_run = 0
+        self._silence_run = 0
+        self._start = None
+        self.in_phrase = False
+
+    @property
+    def lag(self):
+        """Seconds of captured audio not analysed yet"""
+        return (self.buffer.written - self.position) / self.sample_rate
+
+    def process(self, data):
+        """Write PCM bytes into the buffer and analyse them"""
+        self.buffer.write(data)
+        return self.advance()
+
+    def advance(self):
+        """Analyse newly captured whole frames; returns the phrases that ended in them"""
+        if self.position < self.buffer.oldest:
+            # Fell behind by more than the buffer holds
+            self.lost += self.buffer.oldest - self.position
+            self.reset()
+            return []
+        count = (self.buffer.written - self.position) // self.frame
+        if not count:
+            return []
+        start = self.position
+        energies = frame_rms(self.buffer.view(start, start + count * self.frame), self.frame)
+        self.position += count * self.frame
+        self.last_rms = float(energies[-1])
+        if self.noise is not None:
+            self.noise.update(energies)
+        phrases = self._advance(energies, start)
+        self.buffer.release(self._start if self.in_phrase else self.position - self.pre_roll)
+        return phrases
+
+    def _advance(self, energies, start):
+        phrases = []
+        threshold = self.threshold()
+        for i, energy in enumerate(energies.tolist()):
+            frame_end = start + (i + 1) * self.frame
+            if not self.in_phrase:
+                if energy > threshold:
+                    self._speech_run += 1
+                    if self._speech_run >= self.start_frames:
+                        self.in_phrase = True
+                        self._silence_run = 0
+                        self._last_speech = frame_end
+                        self._onset = frame_end - self._speech_run * self.frame
+                        self._start = max(0, self._onset - self.pre_roll)
+                else:
+                    self._speech_run = 0
+                continue
+            if energy > threshold * HYSTERESIS:
+                self._silence_run = 0
+                self._last_speech = frame_end
+            else:
+                self._silence_run += 1
+            if frame_end - self._start >= self.max_phrase and self._silence_run < self.hangover_frames:
+                # Still talking: cut here and continue with a new segment overlapping this one
+                phrases.append(self._phrase(self._start, frame_end, frame_end))
+                self._start = self._onset = frame_end - self.overlap
+                continue
+            if self._silence_run >= self.hangover_frames:
+                phrase = self._end_phrase(frame_end)
+                if phrase is not None:
+                    phrases.append(phrase)
+        return phrases
+
+    def _phrase(self, start, end, detected):
+        return Phrase(self.buffer.view(start, end).tobytes(), start, end, detected)
+
+    def _end_phrase(self, position):
+        end = min(position, self._last_speech + self.tail)
+        phrase = None
+        if self._last_speech - self._onset >= self.min_phrase:
+            phrase = self._phrase(self._start, end, position)
+        self.in_phrase = False
+        self._speech_run = 0
+        self._start = None
+        return phrase
+
+    @property
+    def phrase_start(self):
+        """Absolute start of the phrase in progress, None between phrases"""
+        return self._start if self.in_phrase else None
+
+    def partial(self):
+        """PCM of the phrase in progress up to the newest analysed frame, or None"""
+        if not self.in_phrase:
+            return None
+        return self.buffer.view(self._start, self.position).tobytes()
+
+    def finish(self):
+        """At the end of the input: analyse what is left and close an open phrase"""
+        phrases = self.advance()
+        if self.in_phrase:
+            phrase = self._end_phrase(self.position)
+            if phrase is not None:
+                phrases.append(phrase)
+        return phrases
@@ -0,0 +1,191 @@
+"""
+Reproducible benchmark of the listen path
+
+Feeds scripted audio through VoiceRecognition.listen_continuous (capture
+thread, ring buffer, VAD, recognition) with a stub recognizer, so results
+do not depend on a microphone, the network or an ASR model:
+
+    python -m core.voice_benchmark                    # 20 synthetic utterances
+    python -m core.voice_benchmark --wav-dir recordings/ --gap 1.0
+    python -m core.voice_benchmark --realtime --delay 0.3
+
+Reports:
+    segmentation   - scripted utterances that came out as exactly one phrase,
+                     and how many were missed, split, merged or spurious
+    end of speech  - audio time from the end of an utterance to the moment
+                     its phrase was endpointed, plus recognition time
+    throughput     - seconds of audio processed per CPU second (one core)
+"""
+import os
+import time
+import atexit
+import shutil
+import argparse
+import tempfile
+import numpy as np
+
+if __name__ == '__main__':
+    # Before the app modules load their settings: a throwaway data directory gives
+    # default settings and no learned language priors, so runs are reproducible and
+    # the user's config.json and jarvis.db are left alone
+    if 'JARVIS_DATA_DIR' not in os.environ:
+        os.environ['JARVIS_DATA_DIR'] = tempfile.mkdtemp(prefix='jarvis-benchmark-')
+        atexit.register(shutil.rmtree, os.environ['JARVIS_DATA_DIR'], True)
+
+from core.asr import ASRBackend, MultiLanguageRecognizer
+from core.audio_source import ScriptedSource, SAMPLE_RATE
+from core.voice_recognition import VoiceRecognition
+
+
+class StubBackend(ASRBackend):
+    """Recognizes every phrase as 'phrase <n>' after a fixed delay"""
+
+    name = 'stub'
+
+    def __init__(self, delay=0.0):
+        super().__init__()
+        self.delay = delay
+        self.calls = 0
+
+    def _recognize(self, audio, language):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return f"phrase {self.calls}", 1.0
+
+
+def synthetic_utterance(seconds, rng, sample_rate=SAMPLE_RATE):
+    """Speech-like bursts: voiced syllables of harmonics with short pauses between them"""
+    parts = []
+    total = int(seconds * sample_rate)
+    length = 0
+    f0 = rng.uniform(100, 220)
+    while length < total:
+        syllable = int(rng.uniform(0.12, 0.25) * sample_rate)
+        t = np.arange(syllable) / sample_rate
+        voiced = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 6))
+        envelope = np.sin(np.pi * np.arange(syllable) / syllable)
+        parts.append(voiced * envelope * rng.uniform(3000, 8000))
+        pause = int(rng.uniform(0.03, 0.12) * sample_rate)
+        parts.append(np.zeros(pause))
+        length += syllable + pause
+    return np.concatenate(parts[:-1]).astype(np.int16)
+
+
+def synthetic_script(count=20, seed=0):
+    """Utterances of 0.5-3 s separated by 0.8-2 s gaps"""
+    rng = np.random.default_rng(seed)
+    script = [1.0]
+    for i in range(count):
+        script.append((f"utterance {i + 1}", synthetic_utterance(rng.uniform(0.5, 3.0), rng)))
+        script.append(float(rng.uniform(0.8, 2.0)))
+    return script
+
+
+def score(segments, phrases):
+    """Match phrases to scripted segments by overlap"""
+    hits = {id(segment): [] for segment in segments}
+    spurious = 0
+    for phrase in phrases:
+        overlapping = [s for s in segments if phrase.start < s.end and phrase.end > s.start]
+        if not overlapping:
+            spurious += 1
+        for segment in overlapping:
+            hits[id(segment)].append(phrase)
+    correct, missed, split, merged = [], 0, 0, 0
+    for segment in segments:
+        matched = hits[id(segment)]
+        if not matched:
+            missed += 1
+        elif len(matched) > 1:
+            split += 1
+        elif any(other is not segment and matched[0] in hits[id(other)] for other in segments):
+            merged += 1
+        else:
+            correct.append((segment, matched[0]))
+    return correct, missed, split, merged, spurious
+
+
+def run(source, delay=0.0):
+    """Run the listen path over source; returns the report as a dict"""
+    backend = StubBackend(delay)
+    recognition = VoiceRecognition(source=source, backend=backend, wake_word=False, barge_in=False)
+    recognition.multi_language.close()
+    recognition.multi_language = MultiLanguageRecognizer(backend, ['tr-TR'], learn=False)
+    phrases = []
+    emitted = {}
+    results = []
+
+    def on_phrase(phrase):
+        phrases.append(phrase)
+        emitted[id(phrase)] = time.perf_counter()
+
+    def on_text(text, language):
+        results.append((phrases[-1], time.perf_counter()))
+
+    cpu_started = time.process_time()
+    wall_started = time.perf_counter()
+    recognition.listen_continuous(on_text, on_phrase=on_phrase).join()
+    recognition.close()
+    wall = time.perf_counter() - wall_started
+    cpu = time.process_time() - cpu_started
+
+    correct, missed, split, merged, spurious = score(source.segments, phrases)
+    endpoint = [(phrase.detected - segment.speech_end) * 1000 / source.SAMPLE_RATE
+                for segment, phrase in correct]
+    recognized = {id(phrase): at for phrase, at in results}
+    recognition_ms = [(recognized[id(phrase)] - emitted[id(phrase)]) * 1000
+                      for _, phrase in correct if id(phrase) in recognized]
+    return {
+        'utterances': len(source.segments),
+        'phrases': len(phrases),
+        'correct': len(correct),
+        'missed': missed,
+        'split': split,
+        'merged': merged,
+        'spurious': spurious,
+        'accuracy': len(correct) / len(source.segments) if source.segments else 0.0,
+        'endpoint_ms': endpoint,
+        'recognition_ms': recognition_ms,
+        'audio_seconds': source.duration,
+        'wall_seconds': wall,
+        'cpu_seconds': cpu,
+    }
+
+
+def _describe(samples):
+    if not samples:
+        return "n/a"
+    ordered = sorted(samples)
+    return (f"mean {sum(ordered) / len(ordered):.0f} ms, p50 {ordered[len(ordered) // 2]:.0f} ms, "
+            f"p95 {ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]:.0f} ms")
+
+
+def print_report(report):
+    print(f"Segmentation: {report['correct']}/{report['utterances']} utterances as one phrase "
+          f"({report['accuracy'] * 100:.0f}%), {report['missed']} missed, {report['split']} split, "
+          f"{report['merged']} merged, {report['spurious']} spurious ({report['phrases']} phrases)")
+    print(f"End of speech to endpoint: {_describe(report['endpoint_ms'])}")
+    print(f"Endpoint to recognized text: {_describe(report['recognition_ms'])}")
+    cpu = max(report['cpu_seconds'], 1e-9)
+    print(f"Throughput: {report['audio_seconds']:.1f} s of audio in {report['wall_seconds']:.2f} s "
+          f"({report['cpu_seconds']:.2f} CPU s, {report['audio_seconds'] / cpu:.0f}x real time per core)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Segmentation and latency benchmark of the listen path")
+    parser.add_argument('--wav-dir', help="directory of WAV utterances (default: synthetic speech)")
+    parser.add_argument('--gap', type=float, default=1.0, help="silence between WAV files, seconds")
+    parser.add_argument('--count', type=int, default=20, help="synthetic utterances")
+    parser.add_argument('--noise', type=float, default=50.0, help="background noise RMS")
+    parser.add_argument('--delay', type=float, default=0.0, help="stub recognition time, seconds")
+    parser.add_argument('--realtime', action='store_true', help="pace the audio like a microphone")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    options = dict(realtime=args.realtime, noise=args.noise, seed=args.seed)
+    if args.wav_dir:
+        source = ScriptedSource.from_directory(args.wav_dir, gap=args.gap, **options)
+    else:
+        source = ScriptedSource(synthetic_script(args.count, args.seed), **options)
+    print_report(run(source, args.delay))
@@ -4,26 +4,61 @@ Voice Recognition module using speech_recognition
 import speech_recognition as sr
 import threading
 import queue
+from concurrent.futures import ThreadPoolExecutor
+from core.asr import create_backend, partials_enabled, WhisperBackend, MultiLanguageRecognizer
+from utils.config import config
+from core.barge_in import BargeInMonitor
+from core.wake_word import WakeWordGate
+from core.vad import StreamingVAD
+from core.audio_buffer import AudioRingBuffer, CaptureThread
+from core.level_meter import LevelMeter
+
+
+PARTIAL_INTERVAL = 0.5  # seconds of new speech between interim results
 
 
 class VoiceRecognition:
     """Voice recognition with Turkish and English support"""
     
-    def __init__(self, language='tr-TR'):
+    def __init__(self, language='tr-TR', source=None, backend=None, wake_word=True, barge_in=True,
+                 meter=None):
+        """
+        source: speech_recognition AudioSource to read instead of the
+        microphone (e.g. core.audio_source.ScriptedSource); backend: an
+        ASRBackend instead of the configured one; wake_word: gate continuous
+        listening behind the wake word; barge_in: watch the microphone for
+        the user talking over our speech (needs the TTS service in this process);
+        meter: LevelMeter the capture publishes input levels to.
+        """
         self.recognizer = sr.Recognizer()
         self.microphone = None
         self.language = language
         self.is_listening = False
+        self.source_ended = False  # listening stopped because a file source ran out
         self.audio_queue = queue.Queue()
-        self._init_microphone()
+        self.wake_word = wake_word
+        self.barge_in = barge_in
+        # Input levels while listening continuously, for the GUI
+        self.meter = meter or LevelMeter()
+        self.backend = backend or create_backend(self.recognizer)
+        # Turkish and English hypotheses are requested at the same time
+        self.multi_language = MultiLanguageRecognizer(
+            self.backend, config.get('asr.languages', ['tr-TR', 'en-US']))
+        if isinstance(self.backend, WhisperBackend):
+            # Load the local model in the background, once
+            threading.Thread(target=self.backend.load, daemon=True, name="ASRModelLoad").start()
+        if source is not None:
+            self.microphone = source
+        else:
+            self._init_microphone()
     
     def _init_microphone(self):
         """Initialize microphone"""
         try:
             self.microphone = sr.Microphone()
-            # Adjust for ambient noise
-            with self.microphone as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=1)
+            # Make sure it opens; the noise level is tracked while listening
+            with self.microphone:
+                pass
         except Exception as e:
             print(f"Error initializing microphone: {e}")
             self.microphone = None
@@ -45,18 +80,12 @@ class VoiceRecognition:
                     phrase_time_limit=phrase_time_limit
                 )
             
-            # Recognize speech
+            # Recognize speech (Turkish and English at once)
             try:
-                # Try Turkish first
-                text = self.recognizer.recognize_google(audio, language='tr-TR')
+                text = self.multi_language.recognize(audio).text
                 return True, text
             except sr.UnknownValueError:
-                # Try English if Turkish fails
-                try:
-                    text = self.recognizer.recognize_google(audio, language='en-US')
-                    return True, text
-                except sr.UnknownValueError:
-                    return False, "Ses anlaşılamadı"
+                return False, "Ses anlaşılamadı"
             except sr.RequestError as e:
                 return False, f"API hatası: {e}"
         
@@ -65,11 +94,21 @@ class VoiceRecognition:
         except Exception as e:
             return False, f"Hata: {e}"
     
-    def listen_continuous(self, callback, stop_event=None):
+    def _create_buffer(self, source):
+        """Capture ring buffer for an opened source"""
+        return AudioRingBuffer(source.SAMPLE_RATE, config.get('voice.capture.buffer_seconds', 20.0),
+                               lossless=not getattr(source, 'live', True))
+    
+    def listen_continuous(self, callback, stop_event=None, on_phrase=None, on_partial=None):
         """
         Continuously listen for commands
         callback: function(text: str, language: str) -> None
         stop_event: threading.Event to stop listening
+        on_phrase: function(phrase: core.vad.Phrase) -> None, called for each
+            endpointed phrase before recognition
+        on_partial: function(text: str) -> None, interim text of the phrase
+            being spoken (config 'asr.partials'); runs on a recognition thread
+        Listening ends by itself when a file source runs out.
         """
         if not self.microphone:
             return None
@@ -83,72 +122,127 @@ class VoiceRecognition:
             # Open microphone once, reuse it
             try:
                 with self.microphone as source:
-                    # Initial ambient noise adjustment
-                    self.recognizer.adjust_for_ambient_noise(source, duration=1)
+                    # Interrupt our own speech when the user talks over it
+                    monitor = None
+                    if self.barge_in:
+                        from core.text_to_speech import get_tts
+                        monitor = BargeInMonitor(get_tts(), self.recognizer)
+                        monitor.attach(source)
+                    # Only phrases addressed to us ("Jarvis ...") reach recognition
+                    gate = WakeWordGate() if self.wake_word else None
+                    
+                    # Capture never stops; phrases are endpointed off the ring buffer,
+                    # so audio spoken during recognition is picked up afterwards
+                    buffer = self._create_buffer(source)
+                    # Speech threshold from the background level, estimated as audio arrives
+                    vad = StreamingVAD(buffer)
+                    
+                    # Interim results: the phrase so far is recognized on one side thread,
+                    # a new request only once the previous one is done
+                    partial_pool = None
+                    if on_partial is not None and partials_enabled(self.backend):
+                        partial_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ASRPartial")
+                    partial_step = int(config.get('asr.partial_interval', PARTIAL_INTERVAL) * source.SAMPLE_RATE)
+                    partial_job = None
+                    partial_at = (None, 0)  # (phrase start, position of the last interim request)
                     
-                    while self.is_listening and (stop_event is None or not stop_event.is_set()):
+                    def _recognize_partial(audio, start):
                         try:
-                            # Listen for audio with shorter timeout
+                            if gate is not None:
+                                audio = gate.filter(audio, commit=False)
+                                if audio is None:
+                                    return
+                            result = self.multi_language.recognize_partial(audio)
+                        except (sr.UnknownValueError, sr.RequestError):
+                            return
+                        except Exception as e:
+                            print(f"Error in interim recognition: {e}")
+                            return
+                        if vad.phrase_start == start:  # Not superseded by the final result
+                            on_partial(result.text)
+                    
+                    capture = CaptureThread(source, buffer, self.meter).start()
+                    
+                    try:
+                        while self.is_listening and (stop_event is None or not stop_event.is_set()):
                             try:
-                                audio = self.recognizer.listen(
-                                    source, 
-                                    timeout=0.5, 
-                                    phrase_time_limit=8
-                                )
-                            except sr.WaitTimeoutError:
-                                continue
-                            
-                            # Try to recognize
-                            text = None
-                            language = None
+                                # Wake up for whole frames only
+                                if not buffer.wait(vad.position + vad.frame - 1, timeout=0.5):
+                                    if capture.error is not None:
+                                        raise capture.error
+                                    if not capture.finished:
+                                        continue
+                                if capture.finished and buffer.written - vad.position < vad.frame:
+                                    # Source ran out: close the last phrase and stop
+                                    phrases = vad.finish()
+                                    self.source_ended = True
+                                    self.is_listening = False
+                                else:
+                                    phrases = vad.advance()
+                                # Shared with barge-in detection and listen_once
+                                self.recognizer.energy_threshold = vad.threshold()
+                                
+                                for phrase in phrases:
+                                    if on_phrase:
+                                        on_phrase(phrase)
+                                    audio = sr.AudioData(phrase.pcm, source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+                                    if gate is not None:
+                                        audio = gate.filter(audio)
+                                        if audio is None:
+                                            continue
+                                    
+                                    # Both languages concurrently, best hypothesis wins
+                                    try:
+                                        result = self.multi_language.recognize(audio)
+                                        error_count = 0  # Reset error count on success
+                                    except sr.UnknownValueError:
+                                        continue
+                                    except sr.RequestError as e:
+                                        error_count += 1
+                                        if error_count >= max_errors:
+                                            print(f"Too many API errors, pausing...")
+                                            import time
+                                            time.sleep(2)
+                                            error_count = 0
+                                        continue
+                                    
+                                    if result.text and monitor and monitor.is_echo(result.text):
+                                        print(f"Ignoring own speech picked up by the microphone: {result.text}")
+                                        continue
+                                    
+                                    if result.text and callback:
+                                        callback(result.text, result.language)
+                                
+                                if phrases and monitor:
+                                    monitor.start_phrase()
+                                
+                                if (partial_pool is not None and vad.in_phrase
+                                        and (partial_job is None or partial_job.done())):
+                                    start = vad.phrase_start
+                                    last = partial_at[1] if partial_at[0] == start else start
+                                    if vad.position - last >= partial_step:
+                                        partial_at = (start, vad.position)
+                                        audio = sr.AudioData(vad.partial(), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+                                        partial_job = partial_pool.submit(_recognize_partial, audio, start)
                             
-                            # Try Turkish first
-                            try:
-                                text = self.recognizer.recognize_google(audio, language='tr-TR')
-                                language = 'tr'
-                                error_count = 0  # Reset error count on success
-                            except sr.UnknownValueError:
-                                # Try English
-                                try:
-                                    text = self.recognizer.recognize_google(audio, language='en-US')
-                                    language = 'en'
-                                    error_count = 0
-                                except sr.UnknownValueError:
-                                    continue
-                                except sr.RequestError as e:
-                                    error_count += 1
-                                    if error_count >= max_errors:
-                                        print(f"Too many API errors, pausing...")
-                                        import time
-                                        time.sleep(2)
-                                        error_count = 0
-                                    continue
-                            except sr.RequestError as e:
+                            except Exception as e:
                                 error_count += 1
+                                print(f"Error in continuous listening: {e}")
                                 if error_count >= max_errors:
-                                    print(f"Too many API errors, pausing...")
-                                    import time
-                                    time.sleep(2)
-                                    error_count = 0
+                                    print(f"Too many errors, resetting microphone...")
+                                    try:
+                                        # Capture again; the noise estimate carries over
+                                        capture.stop()
+                                        capture = CaptureThread(source, buffer, self.meter).start()
+                                        vad.reset()
+                                        error_count = 0
+                                    except:
+                                        break
                                 continue
-                            
-                            if text and callback:
-                                callback(text, language)
-                        
-                        except sr.WaitTimeoutError:
-                            continue
-                        except Exception as e:
-                            error_count += 1
-                            print(f"Error in continuous listening: {e}")
-                            if error_count >= max_errors:
-                                print(f"Too many errors, resetting microphone...")
-                                try:
-                                    # Re-adjust for ambient noise
-                                    self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                                    error_count = 0
-                                except:
-                                    break
-                            continue
+                    finally:
+                        capture.stop()
+                        if partial_pool is not None:
+                            partial_pool.shutdown(wait=False)
             except Exception as e:
                 print(f"Fatal error in listen loop: {e}")
                 self.is_listening = False
@@ -161,6 +255,11 @@ class VoiceRecognition:
         """Stop continuous listening"""
         self.is_listening = False
     
+    def close(self):
+        """Stop listening and release the recognition threads (the instance is done)"""
+        self.stop_listening()
+        self.multi_language.close()
+    
     def set_language(self, language):
         """Set recognition language ('tr-TR' or 'en-US')"""
         self.language = language
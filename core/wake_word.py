@@ -0,0 +1,279 @@
+"""
+Local wake-word gate ("Jarvis")
+
+Phrases picked up by the continuous listen loop are only forwarded to
+speech recognition when they start with the wake word, so TV audio,
+conversations in the room and the assistant's own voice never cost an API
+call or turn into a command. Detection runs locally on NumPy features:
+
+    features - log filterbank energies (25 ms Hann frames, 10 ms hop),
+               normalized per frame
+    model    - a few enrolled recordings of the wake word (templates)
+    matching - subsequence DTW of each template against the start of the
+               phrase, cosine frame distance normalized by template length
+
+Audio after the end of the match is forwarded. A wake word said on its own
+arms the gate for the next phrase (FOLLOW_UP seconds). Templates are
+recorded with:
+
+    python -m core.wake_word --enroll 3
+"""
+import time
+import argparse
+import threading
+import speech_recognition as sr
+from utils.config import config
+from utils.storage import DATA_DIR
+
+NUMPY_AVAILABLE = False
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    pass  # NumPy not installed, the gate lets every phrase through
+
+
+SAMPLE_RATE = 16000
+FRAME = 400  # 25 ms
+HOP = 160  # 10 ms
+N_FFT = 512
+N_BANDS = 24
+MODEL_FILE = DATA_DIR / "wake_word.npz"
+
+# Distance accepted when the model has a single template (otherwise derived at enrollment)
+DEFAULT_THRESHOLD = 0.3
+# Seconds of audio after the wake word below which the phrase counts as the wake word alone
+MIN_COMMAND = 0.4
+FOLLOW_UP = 5.0
+# The wake word is looked for within this many seconds from the start of a phrase
+SEARCH_WINDOW = 2.0
+
+
+def _mel_filterbank(n_bands=N_BANDS, n_fft=N_FFT, sample_rate=SAMPLE_RATE, low=80.0, high=7600.0):
+    """Triangular mel filters, shape (n_bands, n_fft // 2 + 1)"""
+    def to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def to_hz(mel):
+        return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+
+    edges = to_hz(np.linspace(to_mel(low), to_mel(high), n_bands + 2))
+    bins = np.fft.rfftfreq(n_fft, 1.0 / sample_rate)
+    lower, center, upper = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+    rising = (bins - lower) / (center - lower)
+    falling = (upper - bins) / (upper - center)
+    return np.maximum(0.0, np.minimum(rising, falling)).astype(np.float32)
+
+
+_FILTERBANK = _mel_filterbank() if NUMPY_AVAILABLE else None
+_WINDOW = np.hanning(FRAME).astype(np.float32) if NUMPY_AVAILABLE else None
+
+
+def features(samples):
+    """
+    Log filterbank features of int16 or float PCM at SAMPLE_RATE,
+    shape (frames, N_BANDS), mean-removed and L2-normalized per frame.
+    """
+    x = np.asarray(samples)
+    if x.dtype == np.int16:
+        x = x.astype(np.float32) / 32768.0
+    else:
+        x = x.astype(np.float32, copy=False)
+    if len(x) < FRAME:
+        return np.zeros((0, N_BANDS), dtype=np.float32)
+    # Zero-copy frame view over the signal
+    frames = np.lib.stride_tricks.sliding_window_view(x, FRAME)[::HOP]
+    spectrum = np.abs(np.fft.rfft(frames * _WINDOW, n=N_FFT)) ** 2
+    energies = np.log(spectrum @ _FILTERBANK.T + 1e-8)
+    # Per-frame normalization: spectral shape only, independent of loudness and context
+    energies -= energies.mean(axis=1, keepdims=True)
+    energies /= np.linalg.norm(energies, axis=1, keepdims=True) + 1e-8
+    return energies
+
+
+def _voiced(samples):
+    """Trim leading and trailing silence (enrollment recordings)"""
+    x = np.asarray(samples, dtype=np.float32)
+    if len(x) < FRAME:
+        return x
+    frames = np.lib.stride_tricks.sliding_window_view(x, FRAME)[::HOP]
+    energy = np.sqrt((frames ** 2).mean(axis=1))
+    active = np.flatnonzero(energy > energy.max() * 0.1)
+    if not len(active):
+        return x
+    return x[active[0] * HOP:active[-1] * HOP + FRAME]
+
+
+def subsequence_dtw(template, query):
+    """
+    Best match of template anywhere in query.
+
+    Returns (distance, end_frame): mean cosine distance along the best path
+    and the query frame where that match ends. Steps advance one template
+    frame per row and 0-2 query frames, so every row is one vectorized
+    update (speaking rates from half to double the template are matched).
+    """
+    cost = 1.0 - template @ query.T  # (template frames, query frames)
+    acc = cost[0].copy()  # free start anywhere in the query
+    inf = np.float32(np.inf)
+    for row in cost[1:]:
+        stay = acc
+        diagonal = np.concatenate(([inf], acc[:-1]))
+        skip = np.concatenate(([inf, inf], acc[:-2]))
+        acc = row + np.minimum(np.minimum(stay, diagonal), skip)
+    end = int(np.argmin(acc))
+    return float(acc[end]) / len(template), end
+
+
+class WakeWordDetector:
+    """Template model of the wake word plus CPU accounting"""
+
+    def __init__(self, path=MODEL_FILE):
+        self.path = path
+        self.templates = []
+        self.threshold = DEFAULT_THRESHOLD
+        self.audio_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self._lock = threading.Lock()
+        self.load()
+
+    @property
+    def ready(self):
+        return NUMPY_AVAILABLE and bool(self.templates)
+
+    def load(self):
+        if not NUMPY_AVAILABLE or not self.path.exists():
+            return
+        try:
+            with np.load(self.path) as model:
+                lengths = model['lengths']
+                stacked = model['templates']
+                self.threshold = float(model['threshold'])
+            self.templates = np.split(stacked, np.cumsum(lengths)[:-1])
+        except Exception as e:
+            print(f"Error loading wake word model: {e}")
+
+    def enroll(self, recordings):
+        """Build and save the model from int16 recordings of the wake word alone"""
+        templates = [features(_voiced(np.asarray(r, dtype=np.float32) / 32768.0)) for r in recordings]
+        templates = [t for t in templates if len(t) >= 10]
+        if not templates:
+            raise ValueError("no usable wake word recordings")
+        threshold = DEFAULT_THRESHOLD
+        if len(templates) > 1:
+            # Accept anything about as close as the recordings are to each other
+            distances = [subsequence_dtw(a, b)[0] for a in templates for b in templates if a is not b]
+            threshold = min(0.5, max(0.1, max(distances) * 1.3))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(self.path, templates=np.concatenate(templates), threshold=threshold,
+                 lengths=np.array([len(t) for t in templates]))
+        with self._lock:
+            self.templates = templates
+            self.threshold = threshold
+        return threshold
+
+    def detect(self, samples):
+        """
+        Look for the wake word at the start of int16 samples.
+        Returns the sample index where it ends, or None.
+        """
+        started = time.thread_time()
+        try:
+            query = features(samples[:int(SEARCH_WINDOW * SAMPLE_RATE)])
+            best, end = None, 0
+            for template in self.templates:
+                if len(query) < len(template) // 2:
+                    continue
+                distance, frame = subsequence_dtw(template, query)
+                if best is None or distance < best:
+                    best, end = distance, frame
+            if best is None or best > self.threshold:
+                return None
+            return end * HOP + FRAME
+        finally:
+            self.cpu_seconds += time.thread_time() - started
+            self.audio_seconds += len(samples) / SAMPLE_RATE
+
+    def cpu_load(self):
+        """CPU seconds spent per second of audio examined"""
+        return self.cpu_seconds / self.audio_seconds if self.audio_seconds else 0.0
+
+
+class WakeWordGate:
+    """Passes on only the part of a phrase that follows the wake word"""
+
+    def __init__(self, detector=None):
+        self.enabled = config.key('wake_word.enabled', True)
+        self.follow_up = config.key('wake_word.follow_up', FOLLOW_UP)
+        self.detector = detector or WakeWordDetector()
+        self._armed_until = 0.0
+        # Counts for reports (with detector.cpu_load()); nothing is printed per phrase
+        self.checked = 0
+        self.passed = 0
+        if self.enabled() and not self.detector.ready:
+            print("No wake word model, every phrase is recognized "
+                  "(record one with: python -m core.wake_word --enroll 3)")
+
+    def filter(self, audio, commit=True):
+        """
+        AudioData to recognize, or None if the phrase was not addressed to us.
+        commit=False only peeks (interim audio of a phrase still being
+        spoken): the gate is neither armed nor disarmed and nothing is counted.
+        """
+        if not self.enabled() or not self.detector.ready:
+            return audio
+        if time.monotonic() < self._armed_until:
+            if commit:
+                self._armed_until = 0.0
+            return audio
+        pcm = audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=2)
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        end = self.detector.detect(samples)
+        if not commit:
+            if end is None or len(samples) - end < MIN_COMMAND * SAMPLE_RATE:
+                return None
+            return sr.AudioData(samples[end:].tobytes(), SAMPLE_RATE, 2)
+        self.checked += 1
+        if end is None:
+            return None
+        self.passed += 1
+        if len(samples) - end < MIN_COMMAND * SAMPLE_RATE:
+            # Wake word alone: the command follows in the next phrase
+            self._armed_until = time.monotonic() + self.follow_up()
+            return None
+        return sr.AudioData(samples[end:].tobytes(), SAMPLE_RATE, 2)
+
+
+def _record(count):
+    recognizer = sr.Recognizer()
+    recordings = []
+    with sr.Microphone(sample_rate=SAMPLE_RATE) as source:
+        recognizer.adjust_for_ambient_noise(source, duration=1)
+        for i in range(count):
+            print(f"[{i + 1}/{count}] Say the wake word...")
+            audio = recognizer.listen(source, timeout=10, phrase_time_limit=2)
+            pcm = audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=2)
+            recordings.append(np.frombuffer(pcm, dtype=np.int16))
+    return recordings
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Wake word enrollment and testing")
+    parser.add_argument('--enroll', type=int, metavar='N', help="record N examples and save the model")
+    parser.add_argument('--test', action='store_true', help="print detections from the microphone")
+    args = parser.parse_args()
+
+    detector = WakeWordDetector()
+    if args.enroll:
+        threshold = detector.enroll(_record(args.enroll))
+        print(f"Wake word model saved to {detector.path} (threshold {threshold:.3f})")
+    if args.test:
+        recognizer = sr.Recognizer()
+        with sr.Microphone(sample_rate=SAMPLE_RATE) as source:
+            recognizer.adjust_for_ambient_noise(source, duration=1)
+            while True:
+                audio = recognizer.listen(source)
+                samples = np.frombuffer(audio.get_raw_data(SAMPLE_RATE, 2), dtype=np.int16)
+                end = detector.detect(samples)
+                print("wake word" if end is not None else "-",
+                      f"(CPU {detector.cpu_load() * 100:.2f}% of audio time)")
@@ -1,50 +1,15 @@
 """
 Command history and learning features
 """
-import json
-from pathlib import Path
 from datetime import datetime, timedelta
-from collections import Counter
 from utils.config import config
-
-
-HISTORY_FILE = Path(__file__).parent.parent / "command_history.json"
-
-
-def load_history():
-    """Load command history from file"""
-    try:
-        if HISTORY_FILE.exists():
-            with open(HISTORY_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return []
-    except Exception as e:
-        print(f"Error loading history: {e}")
-        return []
-
-
-def save_history(history):
-    """Save command history to file"""
-    try:
-        # Keep only last 1000 commands
-        history = history[-1000:]
-        with open(HISTORY_FILE, 'w', encoding='utf-8') as f:
-            json.dump(history, f, indent=2, ensure_ascii=False)
-    except Exception as e:
-        print(f"Error saving history: {e}")
+from utils.storage import storage
 
 
 def add_command(command_text, success=True, response=""):
     """Add a command to history"""
     try:
-        history = load_history()
-        history.append({
-            'command': command_text,
-            'success': success,
-            'response': response,
-            'timestamp': datetime.now().isoformat()
-        })
-        save_history(history)
+        storage.command_history.add(command_text, success, response)
     except Exception as e:
         print(f"Error adding command to history: {e}")
 
@@ -52,18 +17,15 @@ def add_command(command_text, success=True, response=""):
 def get_command_stats():
     """Get command usage statistics"""
     try:
-        history = load_history()
-        if not history:
+        total_commands = storage.command_history.count()
+        if not total_commands:
             return True, "Henüz komut geçmişi yok."
         
-        total_commands = len(history)
-        successful = sum(1 for cmd in history if cmd.get('success', False))
+        successful = storage.command_history.success_count()
         success_rate = (successful / total_commands * 100) if total_commands > 0 else 0
         
         # Most common commands
-        commands = [cmd['command'].lower() for cmd in history]
-        command_counts = Counter(commands)
-        top_commands = command_counts.most_common(5)
+        top_commands = storage.command_history.most_common(5)
         
         stats_text = f"Toplam komut: {total_commands}\n"
         stats_text += f"Başarı oranı: {success_rate:.1f}%\n"
@@ -81,14 +43,10 @@ def get_command_stats():
 def get_frequent_commands(limit=5):
     """Get most frequently used commands"""
     try:
-        history = load_history()
-        if not history:
+        top_commands = storage.command_history.most_common(limit)
+        if not top_commands:
             return True, "Henüz komut geçmişi yok."
         
-        commands = [cmd['command'].lower() for cmd in history]
-        command_counts = Counter(commands)
-        top_commands = command_counts.most_common(limit)
-        
         result = "Sık kullanılan komutlar:\n"
         for i, (cmd, count) in enumerate(top_commands, 1):
             result += f"{i}. {cmd} ({count} kez)\n"
@@ -102,16 +60,11 @@ def get_frequent_commands(limit=5):
 def get_recent_commands(days=1, limit=10):
     """Get recent commands"""
     try:
-        history = load_history()
-        if not history:
+        if not storage.command_history.count():
             return True, "Henüz komut geçmişi yok."
         
         cutoff = datetime.now() - timedelta(days=days)
-        recent = [
-            cmd for cmd in history
-            if datetime.fromisoformat(cmd['timestamp']) >= cutoff
-        ]
-        recent = recent[-limit:]
+        recent = storage.command_history.since(cutoff, limit)
         
         if not recent:
             return True, f"Son {days} günde komut bulunamadı."
@@ -1,33 +1,9 @@
 """
 Personalization features with advanced profile management
 """
-import json
-from pathlib import Path
 from datetime import datetime
 from utils.config import config
-
-PROFILES_FILE = Path(__file__).parent.parent / "user_profiles.json"
-
-
-def load_profiles():
-    """Load user profiles"""
-    try:
-        if PROFILES_FILE.exists():
-            with open(PROFILES_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {}
-    except Exception as e:
-        print(f"Error loading profiles: {e}")
-        return {}
-
-
-def save_profiles(profiles):
-    """Save user profiles"""
-    try:
-        with open(PROFILES_FILE, 'w', encoding='utf-8') as f:
-            json.dump(profiles, f, indent=2, ensure_ascii=False)
-    except Exception as e:
-        print(f"Error saving profiles: {e}")
+from utils.storage import storage
 
 
 def set_tts_rate(rate):
@@ -66,7 +42,7 @@ def set_tts_provider(provider):
 def set_default_app(app_name, app_path):
     """Set default application for a name"""
     try:
-        apps = config.get('applications', {})
+        apps = dict(config.get('applications', {}))
         apps[app_name] = app_path
         config.set('applications', apps)
         return True, f"Varsayılan uygulama ayarlandı: {app_name}"
@@ -77,13 +53,11 @@ def set_default_app(app_name, app_path):
 def create_profile(profile_name, settings):
     """Create a new user profile"""
     try:
-        profiles = load_profiles()
-        profiles[profile_name.lower()] = {
+        storage.profiles.put(profile_name, {
             'name': profile_name,
             'settings': settings,
             'created_at': datetime.now().isoformat()
-        }
-        save_profiles(profiles)
+        })
         return True, f"Profil oluşturuldu: {profile_name}"
     except Exception as e:
         print(f"Error creating profile: {e}")
@@ -93,21 +67,23 @@ def create_profile(profile_name, settings):
 def load_profile(profile_name):
     """Load and apply a user profile"""
     try:
-        profiles = load_profiles()
-        profile = profiles.get(profile_name.lower())
+        profile = storage.profiles.get(profile_name)
         
         if not profile:
             return False, f"'{profile_name}' adında profil bulunamadı"
         
         settings = profile.get('settings', {})
         
-        # Apply settings
-        if 'tts_rate' in settings:
-            config.set('tts.rate', settings['tts_rate'])
-        if 'tts_volume' in settings:
-            config.set('tts.volume', settings['tts_volume'])
-        if 'tts_provider' in settings:
-            config.set('tts.provider', settings['tts_provider'])
+        # Apply settings in one config transaction
+        setting_keys = {
+            'tts_rate': 'tts.rate',
+            'tts_volume': 'tts.volume',
+            'tts_provider': 'tts.provider',
+        }
+        config.update({
+            config_key: settings[name]
+            for name, config_key in setting_keys.items() if name in settings
+        })
         
         return True, f"Profil yüklendi: {profile_name}"
     except Exception as e:
@@ -118,7 +94,7 @@ def load_profile(profile_name):
 def list_profiles():
     """List all user profiles"""
     try:
-        profiles = load_profiles()
+        profiles = storage.profiles.all()
         
         if not profiles:
             return True, "Kayıtlı profil bulunamadı"
@@ -1,39 +1,16 @@
 """
 Reminders and timers features
 """
-import json
-import threading
-import time
-from pathlib import Path
+import itertools
 from datetime import datetime, timedelta
-from core.text_to_speech import TextToSpeech
+from core.text_to_speech import get_tts, PRIORITY_ALERT
+from utils.config import config
+from utils.storage import storage
+from utils.scheduler import timer_service
+from utils import recurrence as recurrence_utils
 
 
-REMINDERS_FILE = Path(__file__).parent.parent / "reminders.json"
-tts = TextToSpeech()
-
-
-def load_reminders():
-    """Load reminders from file"""
-    try:
-        if REMINDERS_FILE.exists():
-            with open(REMINDERS_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return []
-    except Exception as e:
-        print(f"Error loading reminders: {e}")
-        return []
-
-
-def save_reminders(reminders):
-    """Save reminders to file"""
-    try:
-        with open(REMINDERS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(reminders, f, indent=2, ensure_ascii=False)
-        return True
-    except Exception as e:
-        print(f"Error saving reminders: {e}")
-        return False
+_timer_ids = itertools.count(1)
 
 
 def parse_time_duration(text):
@@ -62,10 +39,11 @@ def parse_time_duration(text):
         return timedelta(minutes=amount)
 
 
-def create_reminder(message, duration_str=None, absolute_time=None):
-    """Create a reminder"""
+def create_reminder(message, duration_str=None, absolute_time=None, recurrence=None):
+    """Create a reminder (recurrence: e.g. 'her gün 08:30', 'hafta içi 9:00', 'her 30 dakikada')"""
     try:
-        reminders = load_reminders()
+        if recurrence:
+            return _create_recurring_reminder(message, recurrence)
         
         if absolute_time:
             reminder_time = datetime.fromisoformat(absolute_time)
@@ -77,19 +55,9 @@ def create_reminder(message, duration_str=None, absolute_time=None):
         else:
             return False, "Zaman belirtilmedi"
         
-        reminder = {
-            'id': len(reminders) + 1,
-            'message': message,
-            'time': reminder_time.isoformat(),
-            'created': datetime.now().isoformat(),
-            'active': True
-        }
+        reminder = storage.reminders.add(message, reminder_time.isoformat())
         
-        reminders.append(reminder)
-        save_reminders(reminders)
-        
-        # Start timer thread
-        _start_reminder_timer(reminder)
+        _schedule_reminder(reminder)
         
         time_str = reminder_time.strftime("%H:%M")
         return True, f"Hatırlatıcı oluşturuldu: '{message}' - {time_str}"
@@ -98,47 +66,85 @@ def create_reminder(message, duration_str=None, absolute_time=None):
         return False, f"Hata: {str(e)}"
 
 
-def _start_reminder_timer(reminder):
-    """Start a timer thread for reminder"""
-    def reminder_callback():
-        reminder_time = datetime.fromisoformat(reminder['time'])
-        wait_time = (reminder_time - datetime.now()).total_seconds()
-        
-        if wait_time > 0:
-            time.sleep(wait_time)
-            
-            # Check if reminder is still active
-            reminders = load_reminders()
-            for r in reminders:
-                if r['id'] == reminder['id'] and r.get('active', True):
-                    # Trigger reminder
-                    tts.speak(f"Hatırlatma: {reminder['message']}")
-                    
-                    # Mark as inactive
-                    r['active'] = False
-                    save_reminders(reminders)
-                    break
+def _create_recurring_reminder(message, recurrence):
+    """Create a reminder that repeats on a schedule"""
+    spec = recurrence_utils.parse_recurrence(recurrence)
+    if not spec:
+        return False, "Tekrar zamanı anlaşılamadı. Örneğin: 'her gün 08:30', 'hafta içi 09:00', 'her 30 dakikada'"
     
-    thread = threading.Thread(target=reminder_callback, daemon=True)
-    thread.start()
+    now = datetime.now()
+    first_time = recurrence_utils.next_fire(spec, now, now)
+    if first_time is None:
+        return False, "Bu tekrar ifadesi hiçbir zaman gerçekleşmiyor"
+    
+    reminder = storage.reminders.add(message, first_time.isoformat(), recurrence=spec)
+    _schedule_reminder(reminder)
+    
+    return True, (f"Tekrarlayan hatırlatıcı oluşturuldu: '{message}' - "
+                  f"{recurrence_utils.describe(spec)} (ilk: {first_time.strftime('%d.%m %H:%M')})")
+
+
+def _speak(text, key=None):
+    """Announce through the shared TTS service, ahead of any other speech"""
+    get_tts().speak(text, priority=PRIORITY_ALERT, key=key)
+
+
+def _reminder_key(reminder_id):
+    return ('reminder', reminder_id)
+
+
+def _schedule_reminder(reminder):
+    """Register a reminder with the shared timer service (one heap entry, even if recurring)"""
+    timer_service.schedule(
+        datetime.fromisoformat(reminder['time']),
+        _fire_reminder, reminder,
+        key=_reminder_key(reminder['id'])
+    )
+
+
+def _advance_recurring(reminder, after):
+    """Move a recurring reminder to its next occurrence after `after`; False if it ended or was deleted"""
+    due = datetime.fromisoformat(reminder['time'])
+    next_time = recurrence_utils.next_fire(reminder['recurrence'], due, after)
+    if next_time is None:
+        storage.reminders.deactivate(reminder['id'])
+        return False
+    if not storage.reminders.reschedule(reminder['id'], next_time.isoformat()):
+        return False
+    _schedule_reminder(dict(reminder, time=next_time.isoformat()))
+    return True
+
+
+def _fire_reminder(reminder):
+    """Timer callback: announce, then deactivate or compute the next occurrence (single-row update)"""
+    if reminder.get('recurrence'):
+        # Skip announcing if the reminder was deleted meanwhile
+        if storage.reminders.get(reminder['id']) is None:
+            return
+        _speak(f"Hatırlatma: {reminder['message']}", key=_reminder_key(reminder['id']))
+        _advance_recurring(reminder, datetime.now())
+    # Only fires if it was still active (not deleted meanwhile)
+    elif storage.reminders.deactivate(reminder['id']):
+        _speak(f"Hatırlatma: {reminder['message']}", key=_reminder_key(reminder['id']))
 
 
 def list_reminders(active_only=True):
     """List reminders"""
     try:
-        reminders = load_reminders()
+        total = storage.reminders.count(active_only)
         
-        if active_only:
-            reminders = [r for r in reminders if r.get('active', True)]
-        
-        if not reminders:
+        if not total:
             return True, "Aktif hatırlatıcı bulunmuyor"
         
-        result = f"{len(reminders)} hatırlatıcı:\n"
-        for reminder in reminders[:10]:  # Limit to 10
+        reminders = storage.reminders.list(active_only, limit=10)  # Limit to 10
+        
+        result = f"{total} hatırlatıcı:\n"
+        for reminder in reminders:
             reminder_time = datetime.fromisoformat(reminder['time'])
             time_str = reminder_time.strftime("%Y-%m-%d %H:%M")
             status = "Aktif" if reminder.get('active', True) else "Tamamlandı"
+            if reminder.get('recurrence'):
+                status += f", {recurrence_utils.describe(reminder['recurrence'])}"
             result += f"- [{reminder['id']}] {reminder['message']} - {time_str} ({status})\n"
         
         return True, result
@@ -148,15 +154,13 @@ def list_reminders(active_only=True):
 
 
 def delete_reminder(reminder_id):
-    """Delete a reminder"""
+    """Delete a reminder (and cancel its pending timer)"""
     try:
-        reminders = load_reminders()
-        reminders = [r for r in reminders if r['id'] != reminder_id]
-        
-        if save_reminders(reminders):
+        timer_service.cancel(_reminder_key(reminder_id))
+        if storage.reminders.delete(reminder_id):
             return True, f"Hatırlatıcı {reminder_id} silindi"
         else:
-            return False, "Hatırlatıcı silinemedi"
+            return False, f"Hatırlatıcı {reminder_id} bulunamadı"
     
     except Exception as e:
         return False, f"Hata: {str(e)}"
@@ -171,12 +175,8 @@ def start_timer(duration_str):
         
         total_seconds = int(duration.total_seconds())
         
-        def timer_callback():
-            time.sleep(total_seconds)
-            tts.speak("Zamanlayıcı bitti!")
-        
-        thread = threading.Thread(target=timer_callback, daemon=True)
-        thread.start()
+        timer_id = next(_timer_ids)
+        timer_service.schedule_in(total_seconds, _speak, "Zamanlayıcı bitti!", key=('timer', timer_id))
         
         minutes = total_seconds // 60
         seconds = total_seconds % 60
@@ -185,24 +185,74 @@ def start_timer(duration_str):
         else:
             time_str = f"{seconds} saniye"
         
-        return True, f"Zamanlayıcı başlatıldı: {time_str}"
+        return True, f"Zamanlayıcı {timer_id} başlatıldı: {time_str}"
+    
+    except Exception as e:
+        return False, f"Hata: {str(e)}"
+
+
+def cancel_timer(timer_id=None):
+    """Cancel a running timer (the most recently started one if no ID is given)"""
+    try:
+        running = [key[1] for key, _ in timer_service.pending() if key[0] == 'timer']
+        if not running:
+            return False, "Çalışan zamanlayıcı bulunmuyor"
+        
+        if timer_id is None:
+            timer_id = max(running)
+        try:
+            timer_id = int(timer_id)
+        except (TypeError, ValueError):
+            return False, f"Geçersiz zamanlayıcı numarası: {timer_id}"
+        
+        if timer_service.cancel(('timer', timer_id)):
+            return True, f"Zamanlayıcı {timer_id} iptal edildi"
+        else:
+            return False, f"Zamanlayıcı {timer_id} bulunamadı"
     
     except Exception as e:
         return False, f"Hata: {str(e)}"
 
 
 # Load and start existing active reminders on import
-def _initialize_reminders():
-    """Initialize and start existing active reminders"""
+def _initialize_reminders(now=None):
+    """
+    Schedule existing active reminders on the timer service.
+    
+    Occurrences of recurring reminders that fell due while the app was not
+    running follow the 'reminders.catch_up' policy: "skip" drops them, "once"
+    announces them once, "all" announces each missed occurrence (up to
+    recurrence.MAX_CATCH_UP). A one-time reminder is announced late only if
+    it fell due within 'reminders.catch_up_window' seconds; older ones (e.g.
+    stale entries from an import) are retired silently. Announcements go
+    through the timer service, so nothing is spoken during import.
+    """
     try:
-        reminders = load_reminders()
-        for reminder in reminders:
-            if reminder.get('active', True):
-                reminder_time = datetime.fromisoformat(reminder['time'])
-                if reminder_time > datetime.now():
-                    _start_reminder_timer(reminder)
-    except:
-        pass
+        policy = config.get('reminders.catch_up', 'once')
+        window = timedelta(seconds=config.get('reminders.catch_up_window', 900))
+        now = now or datetime.now()
+        for reminder in storage.reminders.list(active_only=True):
+            reminder_time = datetime.fromisoformat(reminder['time'])
+            if reminder_time > now:
+                _schedule_reminder(reminder)
+                continue
+            
+            # Missed while the app was not running
+            if not reminder.get('recurrence'):
+                missed = 1 if policy != 'skip' and now - reminder_time <= window else 0
+            elif policy == 'all':
+                missed = recurrence_utils.missed_occurrences(reminder['recurrence'], reminder_time, now)
+            else:
+                missed = 0 if policy == 'skip' else 1
+            for _ in range(missed):
+                timer_service.schedule_in(0, _speak, f"Kaçırılan hatırlatma: {reminder['message']}")
+            
+            if reminder.get('recurrence'):
+                _advance_recurring(reminder, now)
+            else:
+                storage.reminders.deactivate(reminder['id'])
+    except Exception as e:
+        print(f"Error initializing reminders: {e}")
 
 
 # Initialize on module load
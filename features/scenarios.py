@@ -1,47 +1,21 @@
 """
 Scenario management for predefined task sequences
 """
-import json
-from pathlib import Path
 from datetime import datetime
 from core.multi_step_processor import MultiStepProcessor
 from core.command_processor import CommandProcessor
 from utils.config import config
-
-SCENARIOS_FILE = Path(__file__).parent.parent / "scenarios.json"
-
-
-def load_scenarios():
-    """Load scenarios from file"""
-    try:
-        if SCENARIOS_FILE.exists():
-            with open(SCENARIOS_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {}
-    except Exception as e:
-        print(f"Error loading scenarios: {e}")
-        return {}
-
-
-def save_scenarios(scenarios):
-    """Save scenarios to file"""
-    try:
-        with open(SCENARIOS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(scenarios, f, indent=2, ensure_ascii=False)
-    except Exception as e:
-        print(f"Error saving scenarios: {e}")
+from utils.storage import storage
 
 
 def create_scenario(name, tasks):
     """Create a new scenario"""
     try:
-        scenarios = load_scenarios()
-        scenarios[name.lower()] = {
+        storage.scenarios.put(name, {
             'name': name,
             'tasks': tasks,
             'created_at': datetime.now().isoformat()
-        }
-        save_scenarios(scenarios)
+        })
         return True, f"Senaryo oluşturuldu: {name}"
     except Exception as e:
         print(f"Error creating scenario: {e}")
@@ -51,8 +25,7 @@ def create_scenario(name, tasks):
 def run_scenario(name, command_processor=None):
     """Run a saved scenario"""
     try:
-        scenarios = load_scenarios()
-        scenario = scenarios.get(name.lower())
+        scenario = storage.scenarios.get(name)
         
         if not scenario:
             return False, f"'{name}' adında senaryo bulunamadı"
@@ -82,7 +55,7 @@ def run_scenario(name, command_processor=None):
 def list_scenarios():
     """List all saved scenarios"""
     try:
-        scenarios = load_scenarios()
+        scenarios = storage.scenarios.all()
         
         if not scenarios:
             return True, "Kayıtlı senaryo bulunamadı"
@@ -101,14 +74,9 @@ def list_scenarios():
 def delete_scenario(name):
     """Delete a scenario"""
     try:
-        scenarios = load_scenarios()
-        
-        if name.lower() not in scenarios:
+        if not storage.scenarios.delete(name):
             return False, f"'{name}' adında senaryo bulunamadı"
         
-        del scenarios[name.lower()]
-        save_scenarios(scenarios)
-        
         return True, f"Senaryo silindi: {name}"
     except Exception as e:
         print(f"Error deleting scenario: {e}")
@@ -137,11 +105,9 @@ PREDEFINED_SCENARIOS = {
 def initialize_predefined_scenarios():
     """Initialize predefined scenarios if they don't exist"""
     try:
-        scenarios = load_scenarios()
-        for key, scenario in PREDEFINED_SCENARIOS.items():
-            if key not in scenarios:
-                scenarios[key] = scenario
-        save_scenarios(scenarios)
+        with storage.transaction():
+            for key, scenario in PREDEFINED_SCENARIOS.items():
+                storage.scenarios.put_if_missing(key, scenario)
     except Exception as e:
         print(f"Error initializing predefined scenarios: {e}")
 
@@ -3,6 +3,8 @@ System control features (applications, volume, brightness, etc.)
 """
 import subprocess
 import os
+import time
+import shutil
 import platform
 from utils.config import config
 
@@ -23,8 +25,51 @@ except ImportError:
     PYCAW_AVAILABLE = False
 
 
+# Resolved executable paths are reused this long (seconds)
+PATH_CACHE_SECONDS = 60.0
+_resolved_paths = {}  # normalized app name -> (resolved at, path or None)
+
+# Spoken application names -> executable names
+APP_NAME_MAPPING = {
+    'microsoft edge': 'msedge',
+    'edge': 'msedge',
+    'chrome': 'chrome',
+    'google chrome': 'chrome',
+    'firefox': 'firefox',
+    'mozilla firefox': 'firefox',
+    'notepad': 'notepad',
+    'calculator': 'calc',
+    'hesap makinesi': 'calc',
+    'kalkülatör': 'calc',
+    'paint': 'mspaint',
+    'word': 'winword',
+    'excel': 'excel',
+    'powerpoint': 'powerpnt',
+}
+
+EDGE_PATHS = [
+    r'C:\Program Files (x86)\Microsoft\Edge\Application\msedge.exe',
+    r'C:\Program Files\Microsoft\Edge\Application\msedge.exe',
+]
+
+
 def _find_whatsapp_path():
-    """Find WhatsApp executable path"""
+    """Find WhatsApp executable path (cached for PATH_CACHE_SECONDS)"""
+    return _cached_path('whatsapp', _search_whatsapp_path)
+
+
+def _cached_path(name, search):
+    """search() result for name, reused for PATH_CACHE_SECONDS (misses included)"""
+    cached = _resolved_paths.get(name)
+    if cached and time.monotonic() - cached[0] < PATH_CACHE_SECONDS:
+        return cached[1]
+    path = search()
+    _resolved_paths[name] = (time.monotonic(), path)
+    return path
+
+
+def _search_whatsapp_path():
+    """Look for the WhatsApp executable in the usual install locations"""
     possible_paths = [
         os.path.join(os.environ.get('LOCALAPPDATA', ''), 'WhatsApp', 'WhatsApp.exe'),
         os.path.join(os.environ.get('APPDATA', ''), 'WhatsApp', 'WhatsApp.exe'),
@@ -40,39 +85,64 @@ def _find_whatsapp_path():
     return None
 
 
+def _search_executable(normalized_name):
+    """Known install locations, then PATH, for an executable name"""
+    if normalized_name == 'msedge':
+        for path in EDGE_PATHS:
+            if os.path.exists(path):
+                return path
+    return shutil.which(normalized_name)
+
+
+def resolve_application(app_name):
+    """
+    Executable path for a spoken application name, or None if only the
+    shell can find it (Start Menu entries, UWP apps): a path configured
+    under 'applications', else WhatsApp's or a known install location or
+    PATH (searches cached for PATH_CACHE_SECONDS)
+    """
+    app_name_lower = app_name.lower().strip()
+    normalized_name = APP_NAME_MAPPING.get(app_name_lower, app_name_lower)
+    apps = config.get('applications', {})
+    app_path = apps.get(app_name_lower, None) or apps.get(normalized_name, None)
+    if app_path and os.path.exists(app_path):
+        return app_path
+    if 'whatsapp' in app_name_lower:
+        return _find_whatsapp_path()
+    if not normalized_name:
+        return None
+    return _cached_path(normalized_name, lambda: _search_executable(normalized_name))
+
+
+def prewarm_application(app_name):
+    """
+    Resolve the executable open_application(app_name) will start ahead of
+    time, e.g. while the command is still being spoken
+    """
+    resolve_application(app_name)
+
+
 def open_application(app_name):
     """Open an application by name"""
     try:
         if platform.system() == 'Windows':
             app_name_lower = app_name.lower().strip()
+            normalized_name = APP_NAME_MAPPING.get(app_name_lower, app_name_lower)
             
-            # Normalize app name
-            app_name_mapping = {
-                'microsoft edge': 'msedge',
-                'edge': 'msedge',
-                'chrome': 'chrome',
-                'google chrome': 'chrome',
-                'firefox': 'firefox',
-                'mozilla firefox': 'firefox',
-                'notepad': 'notepad',
-                'calculator': 'calc',
-                'hesap makinesi': 'calc',
-                'kalkülatör': 'calc',
-                'paint': 'mspaint',
-                'word': 'winword',
-                'excel': 'excel',
-                'powerpoint': 'powerpnt',
-            }
-            
-            normalized_name = app_name_mapping.get(app_name_lower, app_name_lower)
-            
-            # First, try config
-            apps = config.get('applications', {})
-            app_path = apps.get(app_name_lower, None) or apps.get(normalized_name, None)
-            
-            if app_path and os.path.exists(app_path):
-                subprocess.Popen([app_path])
-                return True, f"{app_name} açılıyor"
+            # First, a resolved executable (configured path, known location or PATH;
+            # usually already resolved by prewarm_application while the command was spoken)
+            app_path = resolve_application(app_name)
+            if app_path:
+                try:
+                    if 'whatsapp' in app_name_lower:
+                        subprocess.Popen([app_path], creationflags=subprocess.CREATE_NO_WINDOW)
+                        return True, "WhatsApp açılıyor"
+                    subprocess.Popen([app_path])
+                    if normalized_name == 'msedge':
+                        return True, "Microsoft Edge açılıyor"
+                    return True, f"{app_name} açılıyor"
+                except Exception:
+                    pass  # Fall back to the shell below
             
             # Try direct execution for known Windows apps (BEFORE Start Menu search)
             if normalized_name == 'msedge':
@@ -88,28 +158,15 @@ def open_application(app_name):
                     except:
                         try:
                             # Try with full path
-                            edge_paths = [
-                                r'C:\Program Files (x86)\Microsoft\Edge\Application\msedge.exe',
-                                r'C:\Program Files\Microsoft\Edge\Application\msedge.exe',
-                            ]
-                            for path in edge_paths:
+                            for path in EDGE_PATHS:
                                 if os.path.exists(path):
                                     subprocess.Popen([path])
                                     return True, "Microsoft Edge açılıyor"
                         except:
                             pass
             
-            # Special handling for WhatsApp
+            # Special handling for WhatsApp (a direct path was tried above)
             if 'whatsapp' in app_name_lower:
-                # Method 1: Find and use direct path
-                whatsapp_path = _find_whatsapp_path()
-                if whatsapp_path:
-                    try:
-                        subprocess.Popen([whatsapp_path], creationflags=subprocess.CREATE_NO_WINDOW)
-                        return True, "WhatsApp açılıyor"
-                    except Exception:
-                        pass
-                
                 # Method 2: Try Windows App ID (UWP app)
                 app_ids = [
                     '5319275A.WhatsAppDesktop_cv1g1gvanyjgm!App',
@@ -254,7 +311,7 @@ def open_application(app_name):
                 return False, f"{app_name} bulunamadı. Lütfen uygulama adını kontrol edin veya ayarlardan yolunu belirtin."
         else:
             # Linux/Mac
-            subprocess.Popen([app_name])
+            subprocess.Popen([resolve_application(app_name) or app_name])
             return True, f"{app_name} açılıyor"
     
     except Exception as e:
@@ -6,8 +6,9 @@ from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QPushButton, QTextEdit, QLabel, QFrame)
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QPropertyAnimation, QRect
 from PyQt5.QtGui import QFont, QColor, QPalette, QPainter, QBrush
-from core.voice_recognition import VoiceRecognition
-from core.text_to_speech import TextToSpeech
+from core.audio_worker import create_listener
+from core.level_meter import BANDS
+from core.text_to_speech import get_tts, PRIORITY_RESULT, PRIORITY_CHAT
 from core.command_processor import CommandProcessor
 from core.llm_client import LLMClient
 from gui.settings_window import SettingsWindow
@@ -16,11 +17,13 @@ from gui.settings_window import SettingsWindow
 class VoiceRecognitionThread(QThread):
     """Thread for voice recognition to avoid blocking UI"""
     command_received = pyqtSignal(str, str)  # text, language
+    partial_received = pyqtSignal(str)  # interim text while the user is still speaking
     error_occurred = pyqtSignal(str)
     
     def __init__(self):
         super().__init__()
-        self.voice_recognition = VoiceRecognition()
+        # Capture and recognition run in a worker process unless configured otherwise
+        self.voice_recognition = create_listener()
         self.is_running = False
         self.listen_thread = None
     
@@ -32,9 +35,15 @@ class VoiceRecognitionThread(QThread):
             if self.is_running:
                 self.command_received.emit(text, language)
         
-        self.listen_thread = self.voice_recognition.listen_continuous(callback)
+        def on_partial(text):
+            if self.is_running:
+                self.partial_received.emit(text)
+        
+        self.listen_thread = self.voice_recognition.listen_continuous(callback, on_partial=on_partial)
         if self.listen_thread:
             self.listen_thread.join()
+        # Each start creates a new thread and listener: release this one's recognition threads
+        self.voice_recognition.close()
     
     def stop(self):
         """Stop listening"""
@@ -43,17 +52,26 @@ class VoiceRecognitionThread(QThread):
 
 
 class WaveformWidget(QWidget):
-    """Animated waveform widget for visual feedback"""
+    """Input level bars (spectrum bands of the microphone) for visual feedback"""
+    
+    DECAY = 0.8  # per update, so bars fall smoothly instead of flickering
+    STALE_SECONDS = 0.5  # levels older than this count as silence
     
     def __init__(self):
         super().__init__()
         self.amplitude = 0
+        self.bars = [0.0] * BANDS
+        self.meter = None
         self.is_active = False
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_animation)
         self.setFixedHeight(80)
         self.setMinimumWidth(200)
     
+    def set_meter(self, meter):
+        """Read levels from a core.level_meter.LevelMeter"""
+        self.meter = meter
+    
     def start_animation(self):
         """Start waveform animation"""
         self.is_active = True
@@ -64,13 +82,18 @@ class WaveformWidget(QWidget):
         self.is_active = False
         self.timer.stop()
         self.amplitude = 0
+        self.bars = [0.0] * BANDS
         self.update()
     
     def update_animation(self):
-        """Update animation frame"""
+        """Update animation frame from the latest published input levels"""
         if self.is_active:
-            import random
-            self.amplitude = random.randint(20, 80)
+            levels = self.meter.read() if self.meter is not None else None
+            if levels is None or levels.age > self.STALE_SECONDS:
+                bands, self.amplitude = [0.0] * BANDS, 0
+            else:
+                bands, self.amplitude = levels.bands.tolist(), int(levels.level * 100)
+            self.bars = [max(new, old * self.DECAY) for new, old in zip(bands, self.bars)]
         self.update()
     
     def paintEvent(self, event):
@@ -83,18 +106,18 @@ class WaveformWidget(QWidget):
         center_y = height // 2
         
         # Draw waveform bars
-        bar_count = 20
+        bar_count = len(self.bars)
         bar_width = width // bar_count
         spacing = 2
         
         if self.is_active:
-            for i in range(bar_count):
+            for i, level in enumerate(self.bars):
                 x = i * (bar_width + spacing)
-                bar_height = int(self.amplitude * (0.5 + 0.5 * abs(i - bar_count/2) / (bar_count/2)))
+                bar_height = 5 + int(level * (height - 15))
                 bar_height = max(5, min(bar_height, height - 10))
                 
                 # Create gradient color (blue to cyan)
-                color = QColor(0, 150 + bar_height, 255)
+                color = QColor(0, min(255, 150 + bar_height), 255)
                 painter.setBrush(QBrush(color))
                 painter.setPen(Qt.NoPen)
                 
@@ -118,7 +141,7 @@ class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.voice_thread = None
-        self.tts = TextToSpeech()
+        self.tts = get_tts()
         self.command_processor = CommandProcessor()
         self.llm_client = LLMClient()
         self.is_listening = False
@@ -277,12 +300,14 @@ class MainWindow(QMainWindow):
         # Start voice recognition thread
         self.voice_thread = VoiceRecognitionThread()
         self.voice_thread.command_received.connect(self.on_command_received)
+        self.voice_thread.partial_received.connect(self.on_partial_received)
+        self.waveform.set_meter(self.voice_thread.voice_recognition.meter)
         self.voice_thread.error_occurred.connect(self.on_error)
         self.voice_thread.start()
         
         self.add_to_history("Ses tanıma başlatıldı.")
         try:
-            self.tts.speak("Jarvis hazır. Komutlarınızı dinliyorum.")
+            self.tts.speak("Jarvis hazır. Komutlarınızı dinliyorum.", key='status')
         except Exception as e:
             print(f"TTS error on start: {e}")
     
@@ -314,10 +339,19 @@ class MainWindow(QMainWindow):
         
         self.add_to_history("Ses tanıma durduruldu.")
         try:
-            self.tts.speak("Jarvis durduruldu.")
+            self.tts.speak("Jarvis durduruldu.", key='status')
         except Exception as e:
             print(f"TTS error on stop: {e}")
     
+    def on_partial_received(self, text):
+        """Show interim text and prepare the command it most likely is"""
+        self.status_label.setText(f"Duyuluyor: {text[:40]}...")
+        self.status_label.setStyleSheet("color: #88ccff; font-size: 14px;")
+        try:
+            self.command_processor.prewarm(text)
+        except Exception as e:
+            print(f"Error preparing command: {e}")
+    
     def on_command_received(self, text, language):
         """Handle received command"""
         try:
@@ -352,10 +386,11 @@ class MainWindow(QMainWindow):
                     self.status_label.setText("Başarılı")
                     self.status_label.setStyleSheet("color: #00ff00; font-size: 14px;")
                     self.add_to_history(f"✓ {message}")
-                    # Limit TTS message length and handle TTS errors
+                    # Long answers are read in full, sentence by sentence
                     try:
-                        tts_message = message[:200] if len(message) > 200 else message
-                        self.tts.speak(tts_message)
+                        is_chat = self.command_processor.last_intent == 'chat'
+                        self.tts.speak(message, priority=PRIORITY_CHAT if is_chat else PRIORITY_RESULT,
+                                       key='response')
                     except Exception as tts_error:
                         print(f"TTS error: {tts_error}")
                 else:
@@ -365,7 +400,7 @@ class MainWindow(QMainWindow):
                     # Only speak error if it's a user-friendly message
                     try:
                         if "anlaşılamadı" in message.lower() or "anlayamadım" in message.lower():
-                            self.tts.speak("Üzgünüm, komutu anlayamadım. Lütfen tekrar deneyin.")
+                            self.tts.speak("Üzgünüm, komutu anlayamadım. Lütfen tekrar deneyin.", key='response')
                     except Exception as tts_error:
                         print(f"TTS error: {tts_error}")
                 
@@ -405,31 +440,27 @@ class MainWindow(QMainWindow):
     
     def on_settings_changed(self):
         """Handle settings change"""
-        # Reload TTS with new settings
-        if hasattr(self, 'tts'):
-            self.tts = TextToSpeech()
-        
-        # Update LLM client
-        if hasattr(self, 'llm_client'):
-            self.llm_client = LLMClient()
-        
-        # Update command processor
-        if hasattr(self, 'command_processor'):
-            self.command_processor = CommandProcessor()
-        
+        # TTS, LLM client and command processor follow config changes through
+        # their config subscriptions; only the status display needs a refresh
         self.add_to_history("Ayarlar güncellendi.")
+        self.llm_status_label.setText("LLM: Kontrol ediliyor...")
+        QTimer.singleShot(0, self.refresh_llm_status)
     
     def check_llm_status(self):
         """Check LLM connection status"""
+        self.refresh_llm_status()
+        
+        # Check again after 30 seconds
+        QTimer.singleShot(30000, self.check_llm_status)
+    
+    def refresh_llm_status(self):
+        """Update the LLM status label"""
         if self.llm_client.is_available():
             self.llm_status_label.setText("LLM: ✓ Bağlı (Akıllı Mod)")
             self.llm_status_label.setStyleSheet("color: #00ff00; font-size: 11px;")
         else:
             self.llm_status_label.setText("LLM: ✗ Bağlı Değil (Basit Mod)")
             self.llm_status_label.setStyleSheet("color: #ff8800; font-size: 11px;")
-        
-        # Check again after 30 seconds
-        QTimer.singleShot(30000, self.check_llm_status)
     
     def add_to_history(self, message):
         """Add message to history"""
@@ -321,31 +321,33 @@ class SettingsWindow(QDialog):
     def save_settings(self):
         """Save settings to config"""
         try:
-            # General
-            config.set('user.name', self.name_input.text())
-            lang_index = self.lang_combo.currentIndex()
-            lang_map = {0: 'tr', 1: 'en', 2: 'both'}
-            config.set('language', lang_map[lang_index])
+            # All keys are applied together and written to disk once
+            with config.batch():
+                # General
+                config.set('user.name', self.name_input.text())
+                lang_index = self.lang_combo.currentIndex()
+                lang_map = {0: 'tr', 1: 'en', 2: 'both'}
+                config.set('language', lang_map[lang_index])
             
-            # TTS
-            provider = 'elevenlabs' if self.provider_combo.currentIndex() == 0 else 'pyttsx3'
-            config.set('tts.provider', provider)
+                # TTS
+                provider = 'elevenlabs' if self.provider_combo.currentIndex() == 0 else 'pyttsx3'
+                config.set('tts.provider', provider)
             
-            # ElevenLabs
-            config.set('tts.elevenlabs.api_key', self.api_key_input.text())
-            config.set('tts.elevenlabs.voice_id', self.voice_id_input.text())
-            config.set('tts.elevenlabs.stability', self.stability_slider.value() / 100)
+                # ElevenLabs
+                config.set('tts.elevenlabs.api_key', self.api_key_input.text())
+                config.set('tts.elevenlabs.voice_id', self.voice_id_input.text())
+                config.set('tts.elevenlabs.stability', self.stability_slider.value() / 100)
             
-            # pyttsx3
-            config.set('tts.rate', self.rate_slider.value())
-            config.set('tts.volume', self.volume_slider.value() / 100)
+                # pyttsx3
+                config.set('tts.rate', self.rate_slider.value())
+                config.set('tts.volume', self.volume_slider.value() / 100)
             
-            # LLM
-            config.set('llm.enabled', self.llm_enabled_check.isChecked())
-            config.set('llm.api_url', self.api_url_input.text())
-            config.set('llm.model', self.model_input.text())
-            config.set('llm.temperature', self.temp_spin.value() / 100)
-            config.set('llm.max_tokens', self.max_tokens_spin.value())
+                # LLM
+                config.set('llm.enabled', self.llm_enabled_check.isChecked())
+                config.set('llm.api_url', self.api_url_input.text())
+                config.set('llm.model', self.model_input.text())
+                config.set('llm.temperature', self.temp_spin.value() / 100)
+                config.set('llm.max_tokens', self.max_tokens_spin.value())
             
             QMessageBox.information(self, "Başarılı", "Ayarlar kaydedildi!")
             self.settings_changed.emit()
@@ -5,7 +5,6 @@ Main entry point
 import sys
 import traceback
 from PyQt5.QtWidgets import QApplication, QMessageBox
-from gui.main_window import MainWindow
 
 
 def exception_hook(exctype, value, tb):
@@ -33,6 +32,11 @@ def main():
     # Set global exception handler
     sys.excepthook = exception_hook
     
+    # Imported here, not at module level: worker processes are spawned and
+    # re-import this module, and must not start the GUI, TTS or reminders
+    from gui.main_window import MainWindow
+    from utils.config_watcher import ConfigWatcher
+    
     try:
         app = QApplication(sys.argv)
         
@@ -50,6 +54,10 @@ def main():
             traceback.print_exc()
             return 1
         
+        # Pick up external edits to config.json without a restart
+        config_watcher = ConfigWatcher()
+        config_watcher.start()
+        
         # Run application
         try:
             return app.exec_()
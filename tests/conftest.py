@@ -0,0 +1,15 @@
+import os
+import sys
+import atexit
+import shutil
+import tempfile
+from pathlib import Path
+
+# Before any application module loads: config.json, jarvis.db and the other data
+# files go to a throwaway directory instead of the repository root. Registered
+# first, the cleanup runs after the config's own exit-time flush.
+os.environ['JARVIS_DATA_DIR'] = tempfile.mkdtemp(prefix='jarvis-tests-')
+atexit.register(shutil.rmtree, os.environ['JARVIS_DATA_DIR'], True)
+
+# Tests import the application packages (core, utils, features) from the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
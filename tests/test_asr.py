@@ -0,0 +1,36 @@
+import pytest
+from core import asr
+from utils.config import Config
+
+
+class Backend:
+    def __init__(self, local):
+        self.local = local
+
+
+@pytest.mark.parametrize('setting, local, enabled', [
+    ('auto', True, True),
+    ('auto', False, False),
+    (True, False, True),
+    (False, True, False),
+])
+def test_partials_enabled(tmp_path, monkeypatch, setting, local, enabled):
+    cfg = Config(path=tmp_path / "config.json", save_delay=60)
+    cfg.set('asr.partials', setting)
+    monkeypatch.setattr(asr, 'config', cfg)
+    assert asr.partials_enabled(Backend(local)) is enabled
+
+
+class EchoBackend(asr.ASRBackend):
+    name = 'echo'
+
+    def _recognize(self, audio, language):
+        return language, 0.9 if language == 'tr-TR' else 0.5
+
+
+def test_multi_language_close_releases_pool():
+    recognizer = asr.MultiLanguageRecognizer(EchoBackend(), ['tr-TR', 'en-US'], learn=False)
+    assert recognizer.recognize(None).text == 'tr-TR'
+    recognizer.close()
+    with pytest.raises(RuntimeError):
+        recognizer.recognize(None)
@@ -0,0 +1,61 @@
+import threading
+import numpy as np
+from core.audio_buffer import AudioRingBuffer
+
+
+def ramp(start, count):
+    return np.arange(start, start + count, dtype=np.int16)
+
+
+def test_view_across_wrap_returns_samples_in_order():
+    buffer = AudioRingBuffer(1000, seconds=1.0)
+    buffer.write(ramp(0, 700))
+    buffer.write(ramp(700, 700))
+    assert buffer.written == 1400
+    assert np.array_equal(buffer.view(600, 1200), ramp(600, 600))
+
+
+def test_oldest_trails_written_by_capacity():
+    buffer = AudioRingBuffer(1000, seconds=1.0)
+    assert buffer.capacity == 900  # ring minus the 0.1 s guard
+    buffer.write(ramp(0, 500))
+    assert buffer.oldest == 0
+    buffer.write(ramp(500, 1000))
+    assert buffer.oldest == 600
+    # Overwritten audio is clipped from views
+    assert np.array_equal(buffer.view(0, 700), ramp(600, 100))
+    assert len(buffer.view(0, 500)) == 0
+
+
+def test_write_accepts_pcm_bytes():
+    buffer = AudioRingBuffer(1000, seconds=1.0)
+    buffer.write(ramp(0, 10).tobytes())
+    assert np.array_equal(buffer.view(0, 10), ramp(0, 10))
+
+
+def test_lossless_writer_waits_for_release():
+    buffer = AudioRingBuffer(1000, seconds=1.0, lossless=True)
+    buffer.write(ramp(0, 800))
+    writer = threading.Thread(target=buffer.write, args=(ramp(800, 400),))
+    writer.start()
+    writer.join(0.1)
+    assert writer.is_alive()  # would overwrite audio the reader still needs
+    buffer.release(600)
+    writer.join(1.0)
+    assert not writer.is_alive()
+    assert np.array_equal(buffer.view(600, 1200), ramp(600, 600))
+
+
+def test_attached_reader_sees_writes_and_generation():
+    header = np.zeros(3, dtype=np.int64)
+    ring = np.zeros(1000, dtype=np.int16)
+    writer = AudioRingBuffer(1000, storage=(header, ring))
+    reader = AudioRingBuffer.attach(header, ring)
+    writer.write(ramp(0, 50))
+    assert reader.written == 50
+    assert reader.sample_rate == 1000
+    assert np.array_equal(reader.view(0, 50), ramp(0, 50))
+    generation = reader.generation
+    AudioRingBuffer(1000, storage=(header, ring))  # a restarted writer
+    assert reader.generation == generation + 1
+    assert reader.written == 0
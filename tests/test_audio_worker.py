@@ -0,0 +1,103 @@
+import time
+import types
+import threading
+import multiprocessing
+import pytest
+from core import audio_worker
+from core.audio_worker import AudioWorker
+from core.audio_source import ScriptedSource
+from core.voice_benchmark import StubBackend
+
+
+def live_workers():
+    return [p for p in multiprocessing.active_children() if p.name == "AudioWorker"]
+
+
+def test_failing_pump_leaves_one_live_worker(monkeypatch):
+    monkeypatch.setattr(audio_worker, 'RESTART_DELAY', 0.01)
+    source = ScriptedSource([30.0], realtime=True)  # a worker that would keep capturing
+    worker = AudioWorker(barge_in=False, source=source, backend=StubBackend(), wake_word=False)
+    stop_event = threading.Event()
+    alive, conns = [], []
+
+    def pump(self, callback, stop_event_, tap, on_partial):
+        alive.append(len(live_workers()))
+        conns.append(self._conn)
+        if len(alive) == 3:
+            stop_event.set()
+        raise RuntimeError("callback failed")
+
+    monkeypatch.setattr(AudioWorker, '_pump', pump)
+    worker.listen_continuous(None, stop_event=stop_event).join(30)
+    assert alive == [1, 1, 1]
+    assert worker.restarts == 2
+    assert all(conn.closed for conn in conns)
+    assert live_workers() == []
+
+
+class FakeConn:
+    closed = False
+
+    def send(self, message):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class FakeProcess:
+    def __init__(self, exitcode):
+        self.exitcode = exitcode
+
+    def join(self, timeout=None):
+        pass
+
+    def is_alive(self):
+        return False
+
+
+@pytest.fixture
+def scripted(monkeypatch):
+    """AudioWorker whose workers exit with the given codes, one per spawn"""
+    delays = []
+    # The supervisor's clock only: back-off sleeps are recorded instead of slept
+    monkeypatch.setattr(audio_worker, 'time', types.SimpleNamespace(sleep=delays.append, monotonic=time.monotonic))
+    monkeypatch.setattr(AudioWorker, '_pump', lambda self, *args: None)
+
+    def run(exitcodes):
+        codes = list(exitcodes)
+
+        def spawn(self, partials):
+            self._process = FakeProcess(codes.pop(0))
+            self._conn = FakeConn()
+
+        monkeypatch.setattr(AudioWorker, '_spawn', spawn)
+        worker = AudioWorker(barge_in=False)
+        worker.listen_continuous(None).join(5)
+        assert not codes
+        return worker, delays
+    return run
+
+
+def test_restarts_with_exponential_backoff_until_source_ends(scripted):
+    worker, delays = scripted([1, 1, 1, 0])
+    assert worker.restarts == 3
+    assert delays == [0.5, 1.0, 2.0]
+    assert not worker.is_listening
+
+
+def test_backoff_is_capped(scripted):
+    worker, delays = scripted([1] * 7 + [0])
+    assert delays == [0.5, 1.0, 2.0, 4.0, 8.0, 10.0, 10.0]
+
+
+def test_backoff_resets_after_a_stable_run(scripted, monkeypatch):
+    monkeypatch.setattr(audio_worker, 'STABLE_SECONDS', -1.0)  # every run counts as stable
+    worker, delays = scripted([1, 1, 1, 0])
+    assert delays == [0.5, 0.5, 0.5]
+
+
+def test_missing_microphone_is_not_restarted(scripted):
+    worker, delays = scripted([audio_worker.EXIT_NO_MICROPHONE])
+    assert worker.restarts == 0
+    assert delays == []
@@ -0,0 +1,74 @@
+import time
+from collections import deque
+import numpy as np
+import pytest
+from core.barge_in import BargeInMonitor
+
+
+class FakeTts:
+    def __init__(self):
+        self.speaking = True
+        self.last_speech_end = 0.0
+        self.recent_speech = deque(maxlen=5)
+        self.barge_ins = 0
+
+    def in_echo_window(self, tail=0.0):
+        return self.speaking or time.monotonic() - self.last_speech_end < tail
+
+    def barge_in(self):
+        self.barge_ins += 1
+        self.speaking = False
+        self.last_speech_end = time.monotonic()
+
+
+class FakeRecognizer:
+    energy_threshold = 300
+
+
+def chunk(rms, frame=320):
+    return np.full(frame, rms, dtype=np.int16).tobytes()
+
+
+@pytest.fixture
+def monitor():
+    monitor = BargeInMonitor(FakeTts(), FakeRecognizer())
+    monitor.attach_frames(16000, 320)  # 20 ms blocks
+    monitor.start_phrase()
+    return monitor
+
+
+def test_sustained_loud_speech_interrupts_once(monitor):
+    for _ in range(2):
+        monitor.feed(chunk(3000))
+    assert monitor.tts.barge_ins == 0  # 40 ms is not enough
+    monitor.feed(chunk(3000))
+    assert monitor.tts.barge_ins == 1
+    monitor.tts.speaking = True
+    for _ in range(5):
+        monitor.feed(chunk(3000))
+    assert monitor.tts.barge_ins == 1  # once per phrase
+    assert not monitor.is_echo("dur artık")
+
+
+def test_own_output_level_does_not_interrupt_and_is_echo(monitor):
+    # Above the speech threshold, below factor times it: the assistant hearing itself
+    for _ in range(20):
+        monitor.feed(chunk(500))
+    assert monitor.tts.barge_ins == 0
+    assert monitor.is_echo("herhangi bir şey")
+
+
+def test_short_bursts_do_not_add_up(monitor):
+    for _ in range(5):
+        monitor.feed(chunk(3000))
+        monitor.feed(chunk(3000))
+        monitor.feed(chunk(0))
+    assert monitor.tts.barge_ins == 0
+
+
+def test_repeat_of_recent_speech_is_echo(monitor):
+    monitor.tts.speaking = False
+    monitor.tts.last_speech_end = time.monotonic()
+    monitor.tts.recent_speech.append("Ses seviyesi artırıldı")
+    assert monitor.is_echo("ses seviyesi artırıldı")
+    assert not monitor.is_echo("hava nasıl")
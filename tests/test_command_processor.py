@@ -0,0 +1,33 @@
+import pytest
+from core import command_processor
+from utils.config import config
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    enabled = config.get('llm.enabled', True)
+    available = {'value': False}
+    monkeypatch.setattr(command_processor.LLMClient, 'is_available', lambda self: available['value'])
+    processor = command_processor.CommandProcessor()
+    processor.available = available
+    yield processor
+    config.set('llm.enabled', enabled)
+
+
+def test_enabling_llm_checks_that_the_server_is_available(processor):
+    config.set('llm.enabled', False)
+    assert not processor.use_llm
+    config.set('llm.enabled', True)
+    assert not processor.use_llm  # enabled, but nothing answers
+    config.set('llm.enabled', False)
+    processor.available['value'] = True
+    config.set('llm.enabled', True)
+    assert processor.use_llm
+
+
+@pytest.mark.parametrize('reminder_id', ['üç', 'son'])
+def test_delete_reminder_with_unparsable_id_is_refused(processor, monkeypatch, reminder_id):
+    command = {'intent': 'delete_reminder', 'parameters': {'reminder_id': reminder_id}, 'response': "Silindi"}
+    monkeypatch.setattr(processor.llm_client, 'parse_command', lambda text, prompt: (True, command, ''))
+    assert processor._process_with_llm("hatırlatıcıyı sil", 'tr') == (
+        False, f"Geçersiz hatırlatıcı numarası: {reminder_id}")
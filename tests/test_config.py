@@ -0,0 +1,70 @@
+import json
+import threading
+import pytest
+from utils.config import Config, validate_config
+from utils.config_watcher import ConfigWatcher
+
+
+def test_concurrent_saves_leave_newest_snapshot_on_disk(tmp_path):
+    path = tmp_path / "config.json"
+    cfg = Config(path=path, save_delay=60)
+    threads = []
+    for i in range(20):
+        cfg.set('tts.rate', 100 + i)
+        threads.append(threading.Thread(target=cfg.save_config))
+        threads[-1].start()
+    for thread in threads:
+        thread.join()
+    text = path.read_text(encoding='utf-8')
+    assert text == cfg.last_written_text
+    assert json.loads(text)['tts']['rate'] == 119
+
+
+def test_flush_writes_pending_changes(tmp_path):
+    path = tmp_path / "config.json"
+    cfg = Config(path=path, save_delay=60)
+    cfg.set('user.name', 'Ayşe')
+    cfg.flush()
+    assert json.loads(path.read_text(encoding='utf-8'))['user']['name'] == 'Ayşe'
+
+
+@pytest.mark.parametrize('partials', [True, False, 'auto'])
+def test_reload_accepts_each_documented_partials_value(tmp_path, partials):
+    path = tmp_path / "config.json"
+    cfg = Config(path=path, save_delay=60)
+    path.write_text(json.dumps({'asr': {'partials': partials}}), encoding='utf-8')
+    assert validate_config(json.loads(path.read_text(encoding='utf-8'))) == []
+    ConfigWatcher(cfg).reload()
+    assert cfg.get('asr.partials') == partials
+
+
+@pytest.mark.parametrize('partials', [1, 0, 'false', 'off', 'no', None])
+def test_validate_rejects_other_partials_values(partials):
+    errors = validate_config({'asr': {'partials': partials}})
+    assert len(errors) == 1 and errors[0].startswith('asr.partials: expected one of true, false, "auto"')
+
+
+def test_flush_inside_batch_raises_and_rolls_back(tmp_path):
+    cfg = Config(path=tmp_path / "config.json", save_delay=60)
+    with pytest.raises(RuntimeError):
+        with cfg.batch():
+            cfg.set('tts.rate', 123)
+            cfg.flush()
+    assert cfg.get('tts.rate') != 123
+    # Saving works again once the batch is over
+    cfg.set('tts.rate', 124)
+    cfg.flush()
+    assert json.loads((tmp_path / "config.json").read_text(encoding='utf-8'))['tts']['rate'] == 124
+
+
+def test_save_timer_is_not_blocked_by_batch_on_other_thread(tmp_path):
+    cfg = Config(path=tmp_path / "config.json", save_delay=0.01)
+    with cfg.batch():
+        cfg.set('tts.rate', 125)
+        saver = threading.Thread(target=cfg.save_config)
+        saver.start()
+        saver.join(0.1)  # waits for the batch, without deadlocking it
+    saver.join(1.0)
+    assert not saver.is_alive()
+    cfg.flush()
+    assert json.loads((tmp_path / "config.json").read_text(encoding='utf-8'))['tts']['rate'] == 125
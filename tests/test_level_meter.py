@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from core.audio_buffer import AudioRingBuffer
+from core.level_meter import LevelMeter, BANDS, VALUE_FIELDS, FFT_SIZE
+
+SAMPLE_RATE = 16000
+
+
+def tone(frequency, amplitude, seconds=0.1):
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    return (np.sin(2 * np.pi * frequency * t) * amplitude).astype(np.int16)
+
+
+@pytest.fixture
+def buffer():
+    return AudioRingBuffer(SAMPLE_RATE, seconds=1.0)
+
+
+def test_nothing_to_read_before_first_publication(buffer):
+    meter = LevelMeter()
+    assert meter.read() is None
+    buffer.write(tone(440, 10000, seconds=0.01))  # fewer than FFT_SIZE samples
+    meter.publish(buffer)
+    assert meter.read() is None
+
+
+def test_tone_shows_in_level_and_its_band(buffer):
+    meter = LevelMeter()
+    buffer.write(tone(1000, 16000))
+    meter.publish(buffer)
+    levels = meter.read()
+    assert levels.rms == pytest.approx(16000 / np.sqrt(2), rel=0.05)
+    assert 0.8 < levels.level <= 1.0
+    assert len(levels.bands) == BANDS
+    loudest = int(np.argmax(levels.bands))
+    edges = meter._edges * SAMPLE_RATE / FFT_SIZE
+    assert edges[loudest] <= 1000 < edges[loudest + 1]
+    assert levels.age < 1.0
+
+
+def test_publications_are_rate_limited(buffer):
+    meter = LevelMeter()
+    buffer.write(tone(1000, 16000))
+    meter.publish(buffer)
+    first = meter.read()
+    buffer.write(np.zeros(FFT_SIZE, dtype=np.int16))
+    meter.publish(buffer)  # within 1/RATE of the first: only a clock read
+    assert meter.read().rms == first.rms
+    meter._next = 0.0
+    meter.publish(buffer)
+    assert meter.read().rms == 0.0
+
+
+def test_reader_skips_a_publication_in_progress(buffer):
+    meter = LevelMeter()
+    buffer.write(tone(1000, 16000))
+    meter.publish(buffer)
+    meter._sequence[0] += 1  # writer stopped mid-publication (odd sequence)
+    assert meter.read() is None
+
+
+def test_reader_on_shared_storage_sees_writer(buffer):
+    storage = (np.zeros(1, dtype=np.int64), np.zeros(VALUE_FIELDS + BANDS, dtype=np.float64))
+    storage[0][0] = 7  # left odd by a writer that was killed
+    writer = LevelMeter(storage=storage)
+    reader = LevelMeter(storage=storage)
+    assert reader.read() is None
+    buffer.write(tone(440, 8000))
+    writer.publish(buffer)
+    assert reader.read().rms == pytest.approx(8000 / np.sqrt(2), rel=0.05)
@@ -0,0 +1,67 @@
+import threading
+import pytest
+from core import llm_client
+
+
+class FakeResponse:
+    status_code = 200
+
+    def json(self):
+        return {'choices': [{'message': {'content': 'tamam'}}]}
+
+
+class FakeSession:
+    created = []
+
+    def __init__(self):
+        self.requests = 0
+        self.busy = False
+        FakeSession.created.append(self)
+
+    def _request(self, *args, **kwargs):
+        assert not self.busy, "session used by two threads at once"
+        self.busy = True
+        try:
+            self.requests += 1
+            gate = kwargs.get('json', {}).get('gate')
+            if gate is not None:
+                gate.wait(1.0)
+            return FakeResponse()
+        finally:
+            self.busy = False
+
+    get = post = _request
+
+
+@pytest.fixture
+def client(monkeypatch):
+    FakeSession.created = []
+    monkeypatch.setattr(llm_client.requests, 'Session', FakeSession)
+    return llm_client.LLMClient()
+
+
+def test_request_after_warm_up_reuses_warmed_session(client):
+    warm = threading.Thread(target=client.warm_up)
+    warm.start()
+    warm.join()
+    assert client.chat([{'role': 'user', 'content': 'merhaba'}]) == (True, 'tamam')
+    assert len(FakeSession.created) == 1
+    assert FakeSession.created[0].requests == 2
+
+
+def test_concurrent_requests_use_separate_sessions(client):
+    gate = threading.Barrier(2)
+
+    def request():
+        # Both requests are in flight at the same time
+        with client._session() as session:
+            session.post(client.api_url, json={'gate': gate})
+
+    threads = [threading.Thread(target=request) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(FakeSession.created) == 2
+    assert client.chat([{'role': 'user', 'content': 'merhaba'}]) == (True, 'tamam')
+    assert len(FakeSession.created) == 2  # idle sessions are reused
@@ -0,0 +1,60 @@
+from datetime import datetime
+import pytest
+from utils import recurrence
+
+
+@pytest.mark.parametrize('text, spec', [
+    ("her gün 08:30", "cron:30 8 * * *"),
+    ("hafta içi 9:00", "cron:0 9 * * 1-5"),
+    ("hafta sonu 10:15", "cron:15 10 * * 0,6"),
+    ("her pazartesi 10:00", "cron:0 10 * * 1"),
+    ("her 15 dakikada", "every:900"),
+    ("every 2 hours", "every:7200"),
+    ("cron: */5 * * * *", "cron:*/5 * * * *"),
+    ("yarın 10:00", None),
+])
+def test_parse_recurrence(text, spec):
+    assert recurrence.parse_recurrence(text) == spec
+
+
+def test_daily_next_fire_is_next_day_after_due_time():
+    due = datetime(2026, 3, 2, 8, 30)
+    assert recurrence.next_fire("cron:30 8 * * *", due, due) == datetime(2026, 3, 3, 8, 30)
+
+
+def test_weekday_schedule_skips_weekend():
+    friday = datetime(2026, 3, 6, 9, 0)
+    assert recurrence.next_fire("cron:0 9 * * 1-5", friday, friday) == datetime(2026, 3, 9, 9, 0)
+
+
+def test_cron_crosses_month_and_year():
+    assert recurrence.CronSchedule("0 0 1 * *").next_after(datetime(2026, 12, 15)) == datetime(2027, 1, 1)
+
+
+def test_cron_day_fields_match_either_when_both_restricted():
+    # The 13th of the month or any Friday
+    schedule = recurrence.CronSchedule("0 12 13 * 5")
+    assert schedule.next_after(datetime(2026, 3, 1)) == datetime(2026, 3, 6, 12, 0)
+
+
+def test_interval_next_fire_stays_anchored_after_downtime():
+    due = datetime(2026, 3, 2, 8, 0)
+    now = datetime(2026, 3, 2, 9, 7)
+    assert recurrence.next_fire("every:900", due, now) == datetime(2026, 3, 2, 9, 15)
+
+
+def test_missed_occurrences_is_capped():
+    due = datetime(2026, 3, 2, 8, 0)
+    assert recurrence.missed_occurrences("every:60", due, datetime(2026, 3, 2, 8, 2, 30)) == 3
+    assert recurrence.missed_occurrences("every:60", due, datetime(2026, 3, 2, 12, 0)) == recurrence.MAX_CATCH_UP
+    assert recurrence.missed_occurrences("cron:30 8 * * *", due, datetime(2026, 3, 1)) == 0
+
+
+def test_invalid_cron_is_rejected():
+    with pytest.raises(ValueError):
+        recurrence.CronSchedule("61 * * * *")
+
+
+def test_describe():
+    assert recurrence.describe("cron:30 8 * * 1-5") == "hafta içi 08:30"
+    assert recurrence.describe("every:1800") == "her 30 dakikada"
@@ -0,0 +1,65 @@
+import time
+from datetime import datetime, timedelta
+import pytest
+from features import reminders
+from utils.scheduler import TimerService
+from utils.storage import Storage
+
+
+@pytest.fixture
+def isolated(tmp_path, monkeypatch):
+    store = Storage(tmp_path / "jarvis.db")
+    timers = TimerService()
+    spoken = []
+    monkeypatch.setattr(reminders, 'storage', store)
+    monkeypatch.setattr(reminders, 'timer_service', timers)
+    monkeypatch.setattr(reminders, '_speak', lambda text, key=None: spoken.append(text))
+    yield store, timers, spoken
+    store.close()
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_stale_one_time_reminders_are_retired_silently(isolated):
+    store, timers, spoken = isolated
+    now = datetime.now()
+    stale = store.reminders.add("eski", (now - timedelta(days=200)).isoformat())
+    recent = store.reminders.add("yeni", (now - timedelta(minutes=5)).isoformat())
+    future = store.reminders.add("sonra", (now + timedelta(hours=1)).isoformat())
+
+    reminders._initialize_reminders(now)
+
+    assert _wait_for(lambda: len(spoken) == 1)
+    time.sleep(0.05)
+    assert spoken == ["Kaçırılan hatırlatma: yeni"]
+    assert not store.reminders.get(stale['id'])['active']
+    assert not store.reminders.get(recent['id'])['active']
+    assert timers.is_pending(reminders._reminder_key(future['id']))
+
+
+def test_missed_recurring_reminder_is_announced_once_and_advanced(isolated):
+    store, timers, spoken = isolated
+    now = datetime.now()
+    first = (now - timedelta(days=3)).replace(hour=8, minute=30, second=0, microsecond=0)
+    daily = store.reminders.add("ilaç", first.isoformat(), recurrence="cron:30 8 * * *")
+
+    reminders._initialize_reminders(now)
+
+    assert _wait_for(lambda: len(spoken) == 1)
+    assert spoken == ["Kaçırılan hatırlatma: ilaç"]
+    next_time = datetime.fromisoformat(store.reminders.get(daily['id'])['time'])
+    assert next_time > now and next_time - now <= timedelta(days=1)
+    assert (next_time.hour, next_time.minute) == (8, 30)
+    assert timers.is_pending(reminders._reminder_key(daily['id']))
+
+
+def test_cancel_timer_with_unparsable_id_is_refused(isolated):
+    store, timers, spoken = isolated
+    assert reminders.start_timer("5 dakika")[0]
+    assert reminders.cancel_timer("üç") == (False, "Geçersiz zamanlayıcı numarası: üç")
+    assert reminders.cancel_timer()[0]
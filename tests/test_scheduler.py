@@ -0,0 +1,67 @@
+import time
+import threading
+from utils.scheduler import TimerService
+
+
+def _collector():
+    fired = []
+    event = threading.Event()
+
+    def callback(name):
+        fired.append(name)
+        event.set()
+    return fired, event, callback
+
+
+def test_timers_fire_in_due_order():
+    timers = TimerService()
+    fired, _, callback = _collector()
+    timers.schedule_in(0.10, callback, 'second')
+    timers.schedule_in(0.05, callback, 'first')
+    timers.schedule_in(0.15, callback, 'third')
+    deadline = time.monotonic() + 2
+    while len(fired) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert fired == ['first', 'second', 'third']
+
+
+def test_cancelled_timer_does_not_fire():
+    timers = TimerService()
+    fired, event, callback = _collector()
+    timers.schedule_in(0.05, callback, 'cancelled', key='a')
+    assert timers.is_pending('a')
+    assert timers.cancel('a')
+    assert not timers.cancel('a')
+    assert not event.wait(0.2)
+    assert fired == []
+    assert len(timers) == 0
+
+
+def test_rescheduling_a_key_replaces_the_timer():
+    timers = TimerService()
+    fired, event, callback = _collector()
+    timers.schedule_in(0.05, callback, 'old', key='reminder')
+    timers.schedule_in(0.10, callback, 'new', key='reminder')
+    assert [key for key, _ in timers.pending()] == ['reminder']
+    assert event.wait(2)
+    time.sleep(0.1)
+    assert fired == ['new']
+
+
+def test_many_cancellations_compact_the_heap():
+    timers = TimerService()
+    for i in range(200):
+        timers.schedule_in(3600, lambda: None, key=i)
+    for i in range(150):
+        timers.cancel(i)
+    assert len(timers) == 50
+    assert len(timers._heap) < 200
+
+
+def test_failing_callback_does_not_stop_the_service():
+    timers = TimerService()
+    fired, event, callback = _collector()
+    timers.schedule_in(0, lambda: 1 / 0)
+    timers.schedule_in(0.05, callback, 'after')
+    assert event.wait(2)
+    assert fired == ['after']
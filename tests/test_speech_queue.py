@@ -0,0 +1,64 @@
+import time
+import threading
+from core.speech_queue import SpeechQueue, PRIORITY_ALERT, PRIORITY_RESULT, PRIORITY_CHAT
+
+
+def drain(queue):
+    texts = []
+    while True:
+        item = queue.get(timeout=0)
+        if item is None:
+            return texts
+        texts.append(item.text)
+
+
+def test_served_by_priority_then_fifo():
+    queue = SpeechQueue()
+    queue.put("sohbet", priority=PRIORITY_CHAT)
+    queue.put("sonuç 1", priority=PRIORITY_RESULT)
+    queue.put("alarm", priority=PRIORITY_ALERT)
+    queue.put("sonuç 2", priority=PRIORITY_RESULT)
+    assert len(queue) == 4
+    assert drain(queue) == ["alarm", "sonuç 1", "sonuç 2", "sohbet"]
+    assert len(queue) == 0
+
+
+def test_same_key_replaces_queued_utterance_and_releases_waiter():
+    queue = SpeechQueue()
+    waiting = threading.Event()
+    queue.put("eski durum", key='status', done=waiting)
+    queue.put("araya giren")
+    queue.put("yeni durum", key='status')
+    assert waiting.is_set()  # a speak_sync caller on the replaced item is not left hanging
+    assert queue.replaced == 1
+    assert drain(queue) == ["araya giren", "yeni durum"]
+
+
+def test_expired_utterances_are_dropped_unspoken():
+    queue = SpeechQueue()
+    done = threading.Event()
+    queue.put("geç kaldı", ttl=0.01, done=done)
+    queue.put("alarm", priority=PRIORITY_ALERT)  # alerts never expire by default
+    time.sleep(0.03)
+    assert drain(queue) == ["alarm"]
+    assert queue.expired == 1
+    assert done.is_set()
+
+
+def test_flush_below_keeps_higher_priorities():
+    queue = SpeechQueue()
+    queue.put("alarm", priority=PRIORITY_ALERT)
+    queue.put("sonuç", priority=PRIORITY_RESULT)
+    queue.put("sohbet", priority=PRIORITY_CHAT, key='chat')
+    assert queue.flush(below=PRIORITY_RESULT) == 1
+    queue.put("yeni sohbet", priority=PRIORITY_CHAT, key='chat')
+    assert queue.replaced == 0  # the flushed item no longer holds the key
+    assert queue.flush() == 3
+    assert drain(queue) == []
+
+
+def test_get_waits_for_put():
+    queue = SpeechQueue()
+    threading.Timer(0.05, queue.put, args=("merhaba",)).start()
+    assert queue.get(timeout=2).text == "merhaba"
+    assert queue.get(timeout=0.01) is None
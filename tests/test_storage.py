@@ -0,0 +1,71 @@
+import json
+import pytest
+from utils import storage
+from utils.storage import Storage
+from utils.text_normalize import fold, tokenize, turkish_lower
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = Storage(tmp_path / "jarvis.db")
+    yield store
+    store.close()
+
+
+def test_turkish_folding():
+    assert turkish_lower("ISPARTA İzmir") == "ısparta izmir"
+    assert fold("İSTANBUL'de Şoför") == "istanbul'de sofor"
+    assert tokenize("Toplantıya GİT!") == ["toplantiya", "git"]
+
+
+def test_search_is_case_and_diacritic_insensitive(store):
+    meeting = store.notes.add("Yarın İstanbul'da toplantıya git")
+    store.notes.add("Süt ve ekmek al")
+    assert [n['id'] for n in store.notes.search("ISTANBUL")] == [meeting['id']]
+    assert [n['id'] for n in store.notes.search("toplanti")] == [meeting['id']]
+    assert store.notes.search("toplantı süt") == []
+
+
+def test_search_ranks_better_matches_first(store):
+    store.notes.add("alışveriş listesi: elma, armut, süt, ekmek, peynir, zeytin")
+    best = store.notes.add("süt süt süt")
+    assert store.notes.search("süt")[0]['id'] == best['id']
+
+
+def test_deleted_notes_leave_the_index(store):
+    note = store.notes.add("doktor randevusu")
+    assert store.notes.delete(note['id'])
+    assert store.notes.search("doktor") == []
+    assert not store.notes.delete(note['id'])
+
+
+def test_scan_fallback_matches_index(store):
+    note = store.notes.add("Şifreyi değiştir")
+    store.notes.add("başka bir not")
+    store.connection()
+    store.fts_available = False
+    assert [n['id'] for n in store.notes.search("sifre")] == [note['id']]
+
+
+def test_legacy_json_import_keeps_ids(tmp_path, monkeypatch):
+    notes = [{'id': 3, 'text': "üç", 'timestamp': "2024-01-01T10:00:00"},
+             {'id': 5, 'text': "beş", 'timestamp': "2024-01-02T10:00:00"},
+             {'id': 5, 'text': "yine beş", 'timestamp': "2024-01-03T10:00:00"}]
+    reminders = [{'id': 2, 'message': "ilaç", 'time': "2024-01-01T09:00:00", 'active': True},
+                 {'message': "numarasız", 'time': "2024-01-01T09:30:00"}]
+    files = {name: tmp_path / f"{name}.json" for name in storage.LEGACY_FILES}
+    files['notes'].write_text(json.dumps(notes), encoding='utf-8')
+    files['reminders'].write_text(json.dumps(reminders), encoding='utf-8')
+    monkeypatch.setattr(storage, 'LEGACY_FILES', files)
+
+    store = Storage(tmp_path / "jarvis.db")
+    try:
+        texts = {note['id']: note['text'] for note in store.notes.recent(10)}
+        assert texts[3] == "üç" and texts[5] == "beş"
+        assert texts[6] == "yine beş"  # duplicate id renumbered after the kept ones
+        assert store.reminders.get(2)['message'] == "ilaç"
+        assert store.reminders.get(3)['message'] == "numarasız"
+        assert store.notes.add("yeni")['id'] == 7
+        assert [note['id'] for note in store.notes.search("beş")] and not files['notes'].exists()
+    finally:
+        store.close()
@@ -0,0 +1,42 @@
+import pytest
+from features import system_control
+from utils.config import config
+
+
+@pytest.fixture
+def which(monkeypatch):
+    calls = []
+
+    def fake_which(name):
+        calls.append(name)
+        return f"/usr/bin/{name}" if name in ('firefox', 'calc') else None
+
+    monkeypatch.setattr(system_control.shutil, 'which', fake_which)
+    monkeypatch.setattr(system_control, '_resolved_paths', {})
+    return calls
+
+
+def test_prewarm_resolves_any_app_once(which):
+    system_control.prewarm_application("Mozilla Firefox")
+    assert which == ['firefox']
+    assert system_control.resolve_application("firefox") == "/usr/bin/firefox"
+    assert system_control.resolve_application("hesap makinesi") == "/usr/bin/calc"
+    assert which == ['firefox', 'calc']  # the firefox search was reused
+
+
+def test_misses_are_cached_too(which):
+    assert system_control.resolve_application("bilinmeyen") is None
+    assert system_control.resolve_application("bilinmeyen") is None
+    assert which == ['bilinmeyen']
+
+
+def test_configured_path_wins(which, tmp_path):
+    executable = tmp_path / "firefox-nightly"
+    executable.write_text("")
+    saved = config.get('applications', {})
+    config.set('applications', {'firefox': str(executable)})
+    try:
+        assert system_control.resolve_application("Firefox") == str(executable)
+    finally:
+        config.set('applications', saved)
+    assert which == []
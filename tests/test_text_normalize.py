@@ -0,0 +1,31 @@
+import pytest
+from utils.text_normalize import split_sentences, tokenize
+
+
+@pytest.mark.parametrize('text, sentences', [
+    ("Merhaba efendim. Bugün hava çok güzel görünüyor.",
+     ["Merhaba efendim. Bugün hava çok güzel görünüyor."]),
+    ("Dr. Ali geldi mi? 1. madde, 2. madde",
+     ["Dr. Ali geldi mi?", "1. madde, 2. madde"]),
+    ("Yapılacaklar şunlar:\n1. Süt al.\n2. Faturayı öde.",
+     ["Yapılacaklar şunlar:", "1. Süt al.", "2. Faturayı öde."]),
+    ("Toplantı saat üçte başlıyor. Lütfen geç kalmayın!",
+     ["Toplantı saat üçte başlıyor.", "Lütfen geç kalmayın!"]),
+    ("Tamam. Hallettim.", ["Tamam. Hallettim."]),
+    ("", []),
+])
+def test_split_sentences(text, sentences):
+    assert split_sentences(text) == sentences
+
+
+def test_split_sentences_splits_long_sentence_at_commas():
+    clause = "bu cümle epey uzun bir yan cümle içeriyor"
+    text = ", ".join([clause] * 10) + "."
+    pieces = split_sentences(text, max_length=100)
+    assert len(pieces) > 1
+    assert all(len(piece) <= 100 for piece in pieces)
+    assert " ".join(pieces) == text
+
+
+def test_tokenize_folds_turkish_text():
+    assert tokenize("İSTANBUL'da Şoför ILIK") == ['istanbul', 'da', 'sofor', 'ilik']
@@ -0,0 +1,51 @@
+import os
+from core.tts_cache import TtsCache, cache_key
+
+
+def test_key_covers_everything_that_changes_the_audio():
+    base = cache_key("Merhaba", 'voice', 'model', 0.5, 0.75)
+    assert cache_key(" Merhaba ", 'voice', 'model', 0.5, 0.75) == base
+    others = [cache_key("Merhaba!", 'voice', 'model', 0.5, 0.75),
+              cache_key("Merhaba", 'other', 'model', 0.5, 0.75),
+              cache_key("Merhaba", 'voice', 'other', 0.5, 0.75),
+              cache_key("Merhaba", 'voice', 'model', 0.6, 0.75),
+              cache_key("Merhaba", 'voice', 'model', 0.5, 0.8)]
+    assert len({base, *others}) == 6
+
+
+def test_put_and_get(tmp_path):
+    cache = TtsCache(tmp_path, max_bytes=1000)
+    assert cache.get('a') is None
+    cache.put('a', b'\x01\x02' * 10)
+    assert cache.get('a') == b'\x01\x02' * 10
+    assert 'a' in cache
+    stats = cache.stats()
+    assert (stats['entries'], stats['bytes'], stats['hits'], stats['misses']) == (1, 20, 1, 1)
+
+
+def test_evicts_least_recently_played(tmp_path):
+    cache = TtsCache(tmp_path, max_bytes=250)
+    for key in 'abc':
+        cache.put(key, bytes(100))  # 'a' is evicted when 'c' goes over the bound
+    assert 'a' not in cache and 'b' in cache and 'c' in cache
+    cache.get('b')  # now 'c' is the least recently played
+    cache.put('d', bytes(100))
+    assert 'c' not in cache and 'b' in cache and 'd' in cache
+    assert not (tmp_path / 'c.pcm').exists()
+    assert cache.stats()['bytes'] == 200
+
+
+def test_oversized_entry_is_not_stored(tmp_path):
+    cache = TtsCache(tmp_path, max_bytes=10)
+    cache.put('big', bytes(11))
+    assert 'big' not in cache
+
+
+def test_recency_survives_restart(tmp_path):
+    cache = TtsCache(tmp_path, max_bytes=1000)
+    cache.put('old', bytes(100))
+    cache.put('new', bytes(100))
+    os.utime(tmp_path / 'old.pcm', (1, 1))
+    os.utime(tmp_path / 'new.pcm', (2, 2))
+    reopened = TtsCache(tmp_path, max_bytes=150)  # rebuilt from the directory, over the bound
+    assert 'old' not in reopened and 'new' in reopened
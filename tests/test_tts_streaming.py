@@ -0,0 +1,98 @@
+import pytest
+import requests
+from core import text_to_speech
+from core.elevenlabs_stream import ElevenLabsStreamer, SAMPLE_WIDTH
+from core.elevenlabs_stub import StubElevenLabsServer, measure, tone
+from utils.config import config
+
+
+@pytest.fixture
+def stub():
+    server = StubElevenLabsServer(first_chunk_delay=0.05, chunk_delay=0.0)
+    server.start()
+    yield server
+    server.stop()
+
+
+def test_time_to_first_audio_follows_first_chunk_delay():
+    samples = measure(3, first_chunk_delay=0.05, chunk_delay=0.0)
+    assert len(samples) == 3
+    assert all(50 <= ms < 1000 for ms in samples)
+
+
+def test_streamed_chunks_hold_whole_samples(stub):
+    stub.audio = tone(0.2)
+    stub.chunk_size = 1001  # network chunks ending mid-sample
+    streamer = ElevenLabsStreamer('key', api_base=stub.url)
+    try:
+        chunks = list(streamer.stream("Merhaba", 'voice', 'model'))
+    finally:
+        streamer.close()
+    assert all(len(chunk) % SAMPLE_WIDTH == 0 for chunk in chunks)
+    assert b''.join(chunks) == stub.audio
+    assert stub.requests[0] == ('voice', {'text': "Merhaba", 'model_id': 'model',
+                                          'voice_settings': {'stability': 0.5, 'similarity_boost': 0.75}})
+
+
+def test_rejected_request_raises(stub):
+    streamer = ElevenLabsStreamer('', api_base=stub.url)
+    with pytest.raises(requests.HTTPError):
+        list(streamer.stream("Merhaba", 'voice', 'model'))
+
+
+class _RecordingWorker:
+    """Stands in for the pyttsx3 engine worker"""
+
+    def __init__(self, mode=None):
+        self.spoken = []
+        self.failed = False
+
+    def start(self):
+        return True
+
+    def speak(self, text, language, rate, volume):
+        self.spoken.append(text)
+        return True
+
+    def interrupt(self):
+        pass
+
+
+@pytest.fixture
+def tts(stub, monkeypatch):
+    monkeypatch.setattr(text_to_speech, 'Pyttsx3Worker', _RecordingWorker)
+    settings = {
+        'tts.provider': 'elevenlabs',
+        'tts.output': 'null',
+        'tts.elevenlabs.api_key': 'stub-key',
+        'tts.elevenlabs.api_base': stub.url,
+        'tts.cache.enabled': False,
+    }
+    saved = {key: config.get(key) for key in settings}
+    config.update(settings)
+    service = text_to_speech.TextToSpeech()
+    yield service
+    service.stop()
+    config.update(saved)
+
+
+def test_speech_streams_from_elevenlabs(tts, stub):
+    tts.speak_sync("Merhaba, bu bir deneme cümlesidir.", timeout=5)
+    assert [body['text'] for _, body in stub.requests] == ["Merhaba, bu bir deneme cümlesidir."]
+    assert tts.stats()['ttfa']['count'] == 1
+    assert tts.stats()['ttfa']['last'] >= 50
+    assert tts.pyttsx3_worker.spoken == []
+
+
+def test_falls_back_to_pyttsx3_when_streaming_fails(tts, stub):
+    stub.stop()
+    tts.speak_sync("Sunucu kapalı.", timeout=15)
+    assert tts.pyttsx3_worker.spoken == ["Sunucu kapalı."]
+    assert tts.stats()['ttfa']['count'] == 0
+
+
+def test_no_pyttsx3_fallback_after_stop(tts, stub):
+    stub.stop()
+    tts._interrupted.set()  # stop() arrived while ElevenLabs was failing
+    tts._play_utterance("Sunucu kapalı.", 'tr')
+    assert tts.pyttsx3_worker.spoken == []
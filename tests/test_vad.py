@@ -0,0 +1,58 @@
+import numpy as np
+from core.audio_buffer import AudioRingBuffer
+from core.audio_source import ScriptedSource
+from core.vad import StreamingVAD, HANGOVER_MS, FRAME_MS
+from core.voice_benchmark import synthetic_script, score
+
+
+def endpoint(source, vad):
+    phrases = []
+    audio = source._audio
+    for i in range(0, len(audio), source.CHUNK):
+        phrases += vad.process(audio[i:i + source.CHUNK].tobytes())
+    return phrases + vad.finish()
+
+
+def test_scripted_utterances_come_out_as_one_phrase_each():
+    source = ScriptedSource(synthetic_script(10), noise=50.0)
+    vad = StreamingVAD(AudioRingBuffer(source.SAMPLE_RATE))
+    phrases = endpoint(source, vad)
+    correct, missed, split, merged, spurious = score(source.segments, phrases)
+    assert len(correct) == len(source.segments)
+    assert (missed, split, merged, spurious) == (0, 0, 0, 0)
+    # Endpointed one hangover (plus at most a chunk of frame slack) after speech stops
+    for segment, phrase in correct:
+        delay_ms = (phrase.detected - segment.speech_end) * 1000 / source.SAMPLE_RATE
+        assert HANGOVER_MS - FRAME_MS <= delay_ms <= HANGOVER_MS + 3 * FRAME_MS
+        assert phrase.start <= segment.start  # pre-roll keeps the first syllable
+        assert len(phrase.pcm) == (phrase.end - phrase.start) * 2
+
+
+def test_click_shorter_than_min_phrase_is_dropped():
+    rng = np.random.default_rng(0)
+    click = (rng.normal(0, 8000, 1600)).astype(np.int16)  # 0.1 s
+    source = ScriptedSource([1.0, click, 1.0])
+    vad = StreamingVAD(AudioRingBuffer(source.SAMPLE_RATE), threshold=lambda: 500.0)
+    assert endpoint(source, vad) == []
+
+
+def test_long_phrase_is_cut_into_overlapping_segments():
+    rng = np.random.default_rng(0)
+    speech = rng.normal(0, 5000, 16000 * 12).astype(np.int16)
+    source = ScriptedSource([0.5, speech, 1.0])
+    vad = StreamingVAD(AudioRingBuffer(source.SAMPLE_RATE), threshold=lambda: 500.0)
+    phrases = endpoint(source, vad)
+    assert len(phrases) == 2
+    first, second = phrases
+    assert first.end - first.start <= vad.max_phrase
+    assert second.start == first.end - vad.overlap
+
+
+def test_reader_falling_behind_counts_lost_audio():
+    buffer = AudioRingBuffer(16000, seconds=1.0)
+    vad = StreamingVAD(buffer, threshold=lambda: 500.0)
+    buffer.write(np.zeros(16000 * 2, dtype=np.int16))
+    assert vad.advance() == []
+    assert vad.lost == buffer.oldest
+    assert vad.position == buffer.written
+    assert vad.lag == 0
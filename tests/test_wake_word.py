@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+import speech_recognition as sr
+from core.wake_word import WakeWordDetector, WakeWordGate, SAMPLE_RATE
+
+WAKE = (300, 800, 500)
+OTHER = (1200, 250, 2000)
+COMMAND = (1500, 200, 1000, 400)
+SILENCE = np.zeros(SAMPLE_RATE // 10, dtype=np.int16)
+
+
+def word(freqs, seconds, rng):
+    """A 'word' of voiced tones (three harmonics each) with a little noise"""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    envelope = np.sin(np.pi * t / seconds)
+    parts = [sum(np.sin(2 * np.pi * f * k * t) / k for k in (1, 2, 3)) * 6000 * envelope for f in freqs]
+    x = np.concatenate(parts)
+    return np.clip(x + rng.normal(0, 200, len(x)), -32768, 32767).astype(np.int16)
+
+
+def audio(*parts):
+    return sr.AudioData(np.concatenate(parts).tobytes(), SAMPLE_RATE, 2)
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
+
+
+@pytest.fixture
+def detector(tmp_path, rng):
+    detector = WakeWordDetector(tmp_path / "wake_word.npz")
+    assert not detector.ready
+    # Spoken at slightly different speeds
+    detector.enroll([word(WAKE, seconds, rng) for seconds in (0.14, 0.15, 0.17)])
+    return detector
+
+
+def test_enrolled_model_is_saved_and_reloaded(detector):
+    reloaded = WakeWordDetector(detector.path)
+    assert reloaded.ready
+    assert len(reloaded.templates) == 3
+    assert reloaded.threshold == pytest.approx(detector.threshold)
+
+
+def test_detects_wake_word_and_where_it_ends(detector, rng):
+    wake = word(WAKE, 0.16, rng)
+    end = detector.detect(np.concatenate([SILENCE, wake, word(COMMAND, 0.2, rng)]))
+    assert end is not None
+    assert abs(end - (len(SILENCE) + len(wake))) < 0.12 * SAMPLE_RATE  # the fading end of the last syllable is trimmed
+    assert detector.detect(np.concatenate([SILENCE, word(OTHER, 0.16, rng), word(COMMAND, 0.2, rng)])) is None
+    assert detector.cpu_load() > 0
+
+
+def test_gate_passes_only_the_command(detector, rng):
+    gate = WakeWordGate(detector)
+    command = word(COMMAND, 0.2, rng)
+    passed = gate.filter(audio(SILENCE, word(WAKE, 0.16, rng), command))
+    assert passed is not None
+    assert abs(len(passed.frame_data) // 2 - len(command)) < 0.12 * SAMPLE_RATE
+    assert gate.filter(audio(SILENCE, word(OTHER, 0.16, rng), command)) is None
+    assert (gate.checked, gate.passed) == (2, 1)
+
+
+def test_wake_word_alone_arms_gate_for_next_phrase(detector, rng):
+    gate = WakeWordGate(detector)
+    command = audio(SILENCE, word(COMMAND, 0.2, rng))
+    assert gate.filter(audio(SILENCE, word(WAKE, 0.16, rng), SILENCE)) is None
+    assert gate.filter(command, commit=False) is command  # peeking keeps it armed
+    assert gate.filter(command) is command
+    assert gate.filter(command) is None  # disarmed again
+
+
+def test_gate_without_model_passes_everything(tmp_path, rng):
+    gate = WakeWordGate(WakeWordDetector(tmp_path / "missing.npz"))
+    phrase = audio(word(OTHER, 0.16, rng))
+    assert gate.filter(phrase) is phrase
@@ -3,7 +3,15 @@ Configuration management for JARVIS
 """
 import os
 import json
+import copy
+import atexit
+import tempfile
+import threading
+import weakref
+import functools
+from contextlib import contextmanager
 from pathlib import Path
+from types import MappingProxyType
 
 # Default configuration
 DEFAULT_CONFIG = {
@@ -38,68 +46,430 @@ DEFAULT_CONFIG = {
     "conversation": {
         "max_history": 10,
         "save_history": False
+    },
+    "reminders": {
+        # Occurrences missed while the app was closed: "skip", "once" or "all"
+        "catch_up": "once",
+        # One-time reminders overdue by more than this many seconds are dropped silently
+        "catch_up_window": 900
+    },
+    "voice": {
+        "barge_in": {
+            "enabled": True,
+            "factor": 2.5,  # energy above the speech threshold needed while we speak
+            "min_ms": 60,  # sustained that long before speech is cut
+            "echo_tail": 0.5  # seconds after speech ends still treated as possible echo
+        },
+        "vad": {
+            "frame_ms": 20,
+            "start_ms": 60,  # speech needed to start a phrase
+            "hangover_ms": 300,  # silence that ends a phrase; lower is faster but may cut pauses
+            "pre_roll_ms": 300,
+            "max_phrase": 8.0,
+            "overlap_ms": 500  # shared by the two segments of a phrase cut at max_phrase
+        },
+        "noise": {
+            "percentile": 20,  # of recent frame energy, taken as the background level
+            "window": 3.0,  # seconds; shorter follows changes faster
+            "ratio": 2.5,  # speech threshold = background level x ratio
+            "min_threshold": 100.0
+        },
+        "capture": {
+            "buffer_seconds": 20.0,  # how far recognition may fall behind capture without losing audio
+            "process": True  # capture and recognize in a separate worker process
+        }
+    },
+    "wake_word": {
+        "enabled": True,  # needs a model: python -m core.wake_word --enroll 3
+        "follow_up": 5.0  # seconds a lone wake word keeps listening for the command
+    },
+    "asr": {
+        "backend": "google",  # "google", "whisper" (local, offline) or "auto"
+        "languages": ["tr-TR", "en-US"],  # recognized concurrently, best hypothesis wins
+        "partials": "auto",  # interim text while speaking: true, false or "auto" (local backends only)
+        "partial_interval": 0.5,  # seconds of new speech between interim results
+        "whisper": {
+            "model": "small",
+            "threads": 4,
+            "beam_size": 1,  # 1 = greedy (fastest), 5 = most accurate
+            "compute_type": "int8"
+        }
     }
 }
 
-CONFIG_FILE = Path(__file__).parent.parent / "config.json"
+# JARVIS_DATA_DIR moves config.json and the data files (see utils.storage) elsewhere
+CONFIG_FILE = Path(os.environ.get('JARVIS_DATA_DIR') or Path(__file__).parent.parent) / "config.json"
+
+# Changes are written to disk this many seconds after the first unsaved change
+SAVE_DELAY = 0.5
+
+
+def deep_merge(base, overrides):
+    """Return a copy of base with overrides merged in recursively"""
+    merged = copy.deepcopy(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = deep_merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+@functools.lru_cache(maxsize=1024)
+def _split_key(key):
+    """Dotted key -> tuple path (cached, keys are a small fixed set)"""
+    return tuple(key.split('.'))
+
+
+def _lookup(data, path, default=None):
+    value = data
+    for k in path:
+        if isinstance(value, (dict, MappingProxyType)) and k in value:
+            value = value[k]
+        else:
+            return default
+    return value
+
+
+def _freeze(value):
+    """Deep read-only copy: dicts become mapping proxies, lists become tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _flatten(value, prefix='', out=None):
+    """Leaf values keyed by dotted path"""
+    if out is None:
+        out = {}
+    if isinstance(value, (dict, MappingProxyType)) and value:
+        for k, v in value.items():
+            _flatten(v, f"{prefix}.{k}" if prefix else k, out)
+    else:
+        out[prefix] = value
+    return out
+
+
+_MISSING = object()
+
+# Keys that take a fixed set of values of mixed types instead of their default's type
+_ALLOWED_VALUES = {
+    'asr.partials': (True, False, 'auto'),
+}
+
+
+def diff_keys(old, new):
+    """Dotted leaf keys whose value differs between two config trees"""
+    old_flat = _flatten(old)
+    new_flat = _flatten(new)
+    return {key for key in old_flat.keys() | new_flat.keys()
+            if old_flat.get(key, _MISSING) != new_flat.get(key, _MISSING)}
+
+
+def validate_config(data):
+    """Problems in a config dict, checked against DEFAULT_CONFIG value types"""
+    if not isinstance(data, dict):
+        return ["top level must be a JSON object"]
+    errors = []
+    for key, default in _flatten(DEFAULT_CONFIG).items():
+        value = _lookup(data, _split_key(key), _MISSING)
+        if value is _MISSING or default is None:
+            continue
+        if key in _ALLOWED_VALUES:
+            allowed = _ALLOWED_VALUES[key]
+            # Compare types too: 1 == True, but 1 is not a valid setting
+            if not any(type(value) is type(option) and value == option for option in allowed):
+                expected = ', '.join(json.dumps(option) for option in allowed)
+                errors.append(f"{key}: expected one of {expected}, got {json.dumps(value)}")
+            continue
+        if isinstance(default, bool):
+            valid = isinstance(value, bool)
+        elif isinstance(default, (int, float)):
+            valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+        else:
+            valid = isinstance(value, type(default))
+        if not valid:
+            errors.append(f"{key}: expected {type(default).__name__}, got {type(value).__name__}")
+    return errors
+
+
+class ConfigSnapshot:
+    """Immutable view of the configuration at one version"""
+    
+    __slots__ = ('data', 'version')
+    
+    def __init__(self, data, version):
+        self.data = _freeze(data)
+        self.version = version
+    
+    def get(self, key, default=None):
+        """Get a value using dot notation"""
+        return _lookup(self.data, _split_key(key), default)
+
+
+class ConfigKey:
+    """
+    Precompiled accessor for one dotted key.
+    
+    The path is split once and the value is cached per snapshot version, so
+    reading it on a hot path is a version check instead of a dict walk.
+    """
+    
+    __slots__ = ('config', 'key', 'path', 'default', '_cached')
+    
+    def __init__(self, config, key, default=None):
+        self.config = config
+        self.key = key
+        self.path = _split_key(key)
+        self.default = default
+        self._cached = (-1, default)
+    
+    def get(self):
+        snapshot = self.config._snapshot
+        version, value = self._cached
+        if version != snapshot.version:
+            value = _lookup(snapshot.data, self.path, self.default)
+            self._cached = (snapshot.version, value)
+        return value
+    
+    __call__ = get
 
 
 class Config:
-    """Configuration manager"""
+    """Configuration manager (in-memory, with debounced atomic write-behind)"""
     
-    def __init__(self):
+    def __init__(self, path=CONFIG_FILE, save_delay=SAVE_DELAY):
+        self.path = Path(path)
+        self.save_delay = save_delay
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()  # held across serialize + write + rename
+        self._save_timer = None
+        self._dirty = False
+        self._batch_depth = 0
+        self._batch_thread = None  # ident of the thread inside batch()
+        self._subscribers = []
+        self._pending_notifications = []
+        # What config.json is known to contain, used to diff external edits
+        self._disk_config = copy.deepcopy(DEFAULT_CONFIG)
+        self.last_written_text = None
         self.config = self.load_config()
+        self._snapshot = ConfigSnapshot(self.config, 0)
+        atexit.register(self.flush)
     
     def load_config(self):
         """Load configuration from file or create default"""
-        if CONFIG_FILE.exists():
+        if self.path.exists():
             try:
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+                with open(self.path, 'r', encoding='utf-8') as f:
                     config = json.load(f)
-                    # Merge with defaults to ensure all keys exist
-                    merged = DEFAULT_CONFIG.copy()
-                    merged.update(config)
-                    return merged
+                # Merge with defaults to ensure all (nested) keys exist
+                merged = deep_merge(DEFAULT_CONFIG, config)
+                self._disk_config = copy.deepcopy(merged)
+                return merged
             except Exception as e:
                 print(f"Error loading config: {e}")
-                return DEFAULT_CONFIG.copy()
+                return copy.deepcopy(DEFAULT_CONFIG)
         else:
-            self.save_config(DEFAULT_CONFIG.copy())
-            return DEFAULT_CONFIG.copy()
+            self.save_config(DEFAULT_CONFIG)
+            return copy.deepcopy(DEFAULT_CONFIG)
+    
+    def _check_not_in_batch(self):
+        # batch() holds _lock; saving takes _write_lock and then _lock, so saving
+        # from inside a batch could deadlock against the save timer
+        if self._batch_thread == threading.get_ident():
+            raise RuntimeError("cannot save inside Config.batch(); it is saved when the batch ends")
     
     def save_config(self, config=None):
-        """Save configuration to file"""
-        if config is None:
-            config = self.config
-        try:
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=4, ensure_ascii=False)
-        except Exception as e:
-            print(f"Error saving config: {e}")
+        """Write configuration to file now (atomic temp file + rename); not inside batch()"""
+        self._check_not_in_batch()
+        # Serialize, write and rename as one step: concurrent flushes (the save
+        # timer and atexit or an explicit flush) then land on disk in order
+        with self._write_lock:
+            with self._lock:
+                if config is None:
+                    config = self.config
+                data = json.dumps(config, indent=4, ensure_ascii=False)
+                self._dirty = False
+                self._disk_config = copy.deepcopy(config)
+            self.last_written_text = data
+            try:
+                fd, temp_path = tempfile.mkstemp(prefix='.config-', suffix='.tmp', dir=str(self.path.parent))
+                try:
+                    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                        f.write(data)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(temp_path, self.path)
+                except BaseException:
+                    os.unlink(temp_path)
+                    raise
+            except Exception as e:
+                print(f"Error saving config: {e}")
+    
+    def flush(self):
+        """Write pending changes immediately; not inside batch()"""
+        self._check_not_in_batch()
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if not self._dirty:
+                return
+        self.save_config()
+    
+    def _schedule_save(self):
+        """Debounce writes: one save per SAVE_DELAY window (caller holds the lock)"""
+        self._dirty = True
+        if self._save_timer is not None:
+            return
+        self._save_timer = threading.Timer(self.save_delay, self.flush)
+        self._save_timer.daemon = True
+        self._save_timer.start()
     
     def get(self, key, default=None):
         """Get configuration value using dot notation (e.g., 'weather.api_key')"""
-        keys = key.split('.')
-        value = self.config
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return default
-        return value
+        return _lookup(self.config, _split_key(key), default)
     
-    def set(self, key, value):
-        """Set configuration value using dot notation"""
-        keys = key.split('.')
+    def snapshot(self):
+        """Current immutable configuration snapshot"""
+        return self._snapshot
+    
+    def key(self, key, default=None):
+        """Precompiled accessor for a dotted key (see ConfigKey)"""
+        return ConfigKey(self, key, default)
+    
+    def subscribe(self, callback, *prefixes):
+        """
+        Call callback(changed_keys, snapshot) after each committed change that
+        touches one of the dotted prefixes (any change if none are given).
+        Bound methods are held weakly, so subscribers can be garbage collected.
+        """
+        if hasattr(callback, '__self__'):
+            ref = weakref.WeakMethod(callback)
+        else:
+            ref = lambda: callback
+        with self._lock:
+            self._subscribers.append((ref, prefixes))
+        return callback
+    
+    def unsubscribe(self, callback):
+        """Remove a subscription added with subscribe()"""
+        with self._lock:
+            self._subscribers = [(ref, prefixes) for ref, prefixes in self._subscribers
+                                 if ref() is not None and ref() != callback]
+    
+    def _commit(self, save=True):
+        """Publish a new snapshot if anything changed (caller holds the lock)"""
+        snapshot = ConfigSnapshot(self.config, self._snapshot.version + 1)
+        changed = diff_keys(self._snapshot.data, snapshot.data)
+        if not changed:
+            return
+        self._snapshot = snapshot
+        self._pending_notifications.append((changed, snapshot))
+        if save:
+            self._schedule_save()
+    
+    def _notify(self):
+        """Deliver pending change notifications (outside the lock)"""
+        with self._lock:
+            pending = self._pending_notifications
+            self._pending_notifications = []
+            subscribers = list(self._subscribers)
+        for changed, snapshot in pending:
+            for ref, prefixes in subscribers:
+                callback = ref()
+                if callback is None:
+                    continue
+                if prefixes and not any(key == prefix or key.startswith(prefix + '.')
+                                        for key in changed for prefix in prefixes):
+                    continue
+                try:
+                    callback(changed, snapshot)
+                except Exception as e:
+                    print(f"Error in config subscriber: {e}")
+    
+    def apply_external(self, data):
+        """
+        Apply config.json contents edited outside the app.
+        
+        Only keys that differ from what the file held before are applied to the
+        live config, so unsaved in-app changes to other keys survive. Returns
+        the set of changed keys.
+        """
+        new_disk = deep_merge(DEFAULT_CONFIG, data)
+        with self._lock:
+            changed = diff_keys(self._disk_config, new_disk)
+            new_flat = _flatten(new_disk)
+            # Removals first, so a leaf that became a section is replaced cleanly
+            for key in sorted(changed, key=lambda k: k in new_flat):
+                if key in new_flat:
+                    self._assign(key, copy.deepcopy(new_flat[key]))
+                else:
+                    self._remove(key)
+            self._disk_config = new_disk
+            self._commit(save=False)
+        self._notify()
+        return changed
+    
+    def _remove(self, key):
+        keys = _split_key(key)
+        parent = _lookup(self.config, keys[:-1])
+        if isinstance(parent, dict):
+            parent.pop(keys[-1], None)
+    
+    def _assign(self, key, value):
+        keys = _split_key(key)
         config = self.config
         for k in keys[:-1]:
-            if k not in config:
+            if not isinstance(config.get(k), dict):
                 config[k] = {}
             config = config[k]
         config[keys[-1]] = value
-        self.save_config()
+    
+    def set(self, key, value):
+        """Set configuration value using dot notation (saved in the background)"""
+        with self._lock:
+            self._assign(key, value)
+            if not self._batch_depth:
+                self._commit()
+        self._notify()
+    
+    def update(self, values):
+        """Set several dotted keys at once, all or nothing"""
+        with self.batch():
+            for key, value in values.items():
+                self._assign(key, value)
+    
+    @contextmanager
+    def batch(self):
+        """
+        Group changes into one transaction: they become a single snapshot,
+        notification and save, and are rolled back together if the block raises.
+        Other threads' changes wait for the block; flush() and save_config()
+        raise inside it.
+        """
+        with self._lock:
+            backup = copy.deepcopy(self.config) if self._batch_depth == 0 else None
+            self._batch_depth += 1
+            self._batch_thread = threading.get_ident()
+            try:
+                yield self
+            except BaseException:
+                self._batch_depth -= 1
+                if backup is not None:
+                    self.config = backup
+                raise
+            else:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self._commit()
+            finally:
+                if self._batch_depth == 0:
+                    self._batch_thread = None
+        self._notify()
 
 
 # Global config instance
 config = Config()
-
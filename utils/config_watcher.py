@@ -0,0 +1,147 @@
+"""
+Hot reload of config.json edited outside the app
+
+Watches the config file with inotify (Linux) or by polling its mtime, then
+validates the new contents and applies only the changed keys through
+Config.apply_external, which notifies the config subscribers.
+"""
+import os
+import sys
+import json
+import time
+import ctypes
+import ctypes.util
+import select
+import struct
+import threading
+from pathlib import Path
+from utils.config import config as global_config, validate_config
+
+
+POLL_INTERVAL = 1.0
+# Editors often write a file in several steps; wait for it to settle
+SETTLE_DELAY = 0.1
+
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class _Inotify:
+    """Minimal inotify binding (ctypes) watching one directory"""
+
+    def __init__(self, directory):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+        if libc.inotify_add_watch(self.fd, str(directory).encode(), mask) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+
+    def wait(self, timeout):
+        """Names of files changed within timeout seconds"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        data = os.read(self.fd, 64 * 1024)
+        names = set()
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            names.add(data[offset:offset + length].rstrip(b'\0').decode(errors='replace'))
+            offset += length
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class ConfigWatcher:
+    """Background watcher that hot-reloads config.json"""
+
+    def __init__(self, config=None, poll_interval=POLL_INTERVAL):
+        self.config = config or global_config
+        self.path = Path(self.config.path)
+        self.poll_interval = poll_interval
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._last_stat = self._stat()
+
+    def start(self):
+        """Start watching in a daemon thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="ConfigWatcher")
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def _run(self):
+        inotify = None
+        if sys.platform.startswith('linux'):
+            try:
+                inotify = _Inotify(self.path.parent)
+            except Exception as e:
+                print(f"inotify unavailable, polling config.json instead: {e}")
+        try:
+            while not self._stop_event.is_set():
+                if inotify:
+                    if self.path.name not in inotify.wait(self.poll_interval):
+                        continue
+                else:
+                    self._stop_event.wait(self.poll_interval)
+                stat = self._stat()
+                if stat is None or stat == self._last_stat:
+                    continue
+                detected = time.perf_counter()
+                time.sleep(SETTLE_DELAY)
+                self._last_stat = self._stat()
+                self.reload(detected)
+        finally:
+            if inotify:
+                inotify.close()
+
+    def reload(self, detected=None):
+        """Read, validate and apply config.json; returns the changed keys (or None on failure)"""
+        detected = detected or time.perf_counter()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except OSError as e:
+            print(f"Config reload failed: cannot read {self.path.name}: {e}")
+            return None
+
+        # Our own atomic write-behind lands here too
+        if text == self.config.last_written_text:
+            return set()
+
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            print(f"Config reload failed: invalid JSON in {self.path.name}: {e}")
+            return None
+
+        errors = validate_config(data)
+        if errors:
+            print(f"Config reload failed, keeping current settings: {'; '.join(errors)}")
+            return None
+
+        changed = self.config.apply_external(data)
+        elapsed_ms = (time.perf_counter() - detected) * 1000
+        if changed:
+            print(f"Config reloaded in {elapsed_ms:.1f} ms, changed: {', '.join(sorted(changed))}")
+        return changed
@@ -0,0 +1,53 @@
+"""
+Lightweight in-process latency metrics
+"""
+import threading
+from collections import deque
+
+
+class LatencyStats:
+    """Rolling window of latency samples in milliseconds"""
+
+    def __init__(self, name, window=100):
+        self.name = name
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def __getstate__(self):
+        # Picklable (backends carry stats into spawned worker processes); the lock is not
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def record(self, milliseconds):
+        with self._lock:
+            self._samples.append(milliseconds)
+            self.count += 1
+
+    def summary(self):
+        """{'count', 'last', 'mean', 'p50', 'p95'} over the window (None values if empty)"""
+        with self._lock:
+            samples = list(self._samples)
+            count = self.count
+        if not samples:
+            return {'count': 0, 'last': None, 'mean': None, 'p50': None, 'p95': None}
+        ordered = sorted(samples)
+        return {
+            'count': count,
+            'last': samples[-1],
+            'mean': sum(samples) / len(samples),
+            'p50': ordered[len(ordered) // 2],
+            'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        }
+
+    def __str__(self):
+        s = self.summary()
+        if not s['count']:
+            return f"{self.name}: no samples"
+        return (f"{self.name}: last {s['last']:.0f} ms, mean {s['mean']:.0f} ms, "
+                f"p50 {s['p50']:.0f} ms, p95 {s['p95']:.0f} ms (n={s['count']})")
@@ -0,0 +1,222 @@
+"""
+Recurring schedules for reminders
+
+A schedule is stored as a short spec string:
+    "cron:<min> <hour> <day> <month> <weekday>"   (daily, weekdays, cron)
+    "every:<seconds>"                             (every N minutes/hours)
+Only the next fire time is ever computed; occurrences are never expanded.
+"""
+import re
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+
+# Upper bound on missed occurrences replayed by the 'all' catch-up policy
+MAX_CATCH_UP = 5
+
+_DAY_NAMES = {
+    'pazar': 0, 'sunday': 0,
+    'pazartesi': 1, 'monday': 1,
+    'salı': 2, 'sali': 2, 'tuesday': 2,
+    'çarşamba': 3, 'carsamba': 3, 'wednesday': 3,
+    'perşembe': 4, 'persembe': 4, 'thursday': 4,
+    'cuma': 5, 'friday': 5,
+    'cumartesi': 6, 'saturday': 6,
+}
+_TIME_PATTERN = r'(?:saat\s*)?(\d{1,2})(?:[:.](\d{2}))?'
+
+
+class CronSchedule:
+    """Five-field cron expression (minute hour day-of-month month day-of-week)"""
+
+    _RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron ifadesi 5 alan içermeli: '{expression}'")
+        parsed = [self._parse_field(field, low, high) for field, (low, high) in zip(fields, self._RANGES)]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = sorted({d % 7 for d in weekdays})  # 7 is also Sunday
+        # Standard cron: if both day fields are restricted, either may match
+        self.days_restricted = fields[2] != '*'
+        self.weekdays_restricted = fields[4] != '*'
+        self.expression = expression
+
+    @staticmethod
+    def _parse_field(field, low, high):
+        values = set()
+        for part in field.split(','):
+            step = 1
+            if '/' in part:
+                part, step = part.split('/', 1)
+                step = int(step)
+            if part == '*':
+                start, end = low, high
+            elif '-' in part:
+                start, end = (int(v) for v in part.split('-', 1))
+            else:
+                start = end = int(part)
+                if step != 1:
+                    end = high
+            if start < low or end > high or start > end or step < 1:
+                raise ValueError(f"Geçersiz cron alanı: '{field}'")
+            values.update(range(start, end + 1, step))
+        return sorted(values)
+
+    def _day_matches(self, day):
+        in_days = day.day in self.days
+        # datetime.weekday(): Monday=0; cron: Sunday=0
+        in_weekdays = (day.weekday() + 1) % 7 in self.weekdays
+        if self.days_restricted and self.weekdays_restricted:
+            return in_days or in_weekdays
+        return in_days and in_weekdays
+
+    def next_after(self, after):
+        """First matching minute strictly after `after` (None if there is none)"""
+        t = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=366 * 5)
+        while t < limit:
+            if t.month not in self.months:
+                # First day of the next month
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+                continue
+            if not self._day_matches(t):
+                t = (t + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            index = bisect_left(self.hours, t.hour)
+            if index == len(self.hours):
+                t = (t + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if self.hours[index] != t.hour:
+                t = t.replace(hour=self.hours[index], minute=0)
+            index = bisect_left(self.minutes, t.minute)
+            if index == len(self.minutes):
+                t = t.replace(minute=0) + timedelta(hours=1)
+                continue
+            return t.replace(minute=self.minutes[index])
+        return None
+
+
+class IntervalSchedule:
+    """Fixed interval anchored on the previous due time (no drift)"""
+
+    def __init__(self, seconds):
+        if seconds <= 0:
+            raise ValueError("Aralık pozitif olmalı")
+        self.seconds = seconds
+
+    def next_after(self, after, anchor=None):
+        """First point anchor + k * interval strictly after `after`"""
+        if anchor is None:
+            return after + timedelta(seconds=self.seconds)
+        if anchor > after:
+            return anchor
+        steps = int((after - anchor).total_seconds() // self.seconds) + 1
+        return anchor + timedelta(seconds=steps * self.seconds)
+
+
+def load_schedule(spec):
+    """Schedule object for a stored spec string"""
+    kind, _, value = spec.partition(':')
+    if kind == 'cron':
+        return CronSchedule(value)
+    if kind == 'every':
+        return IntervalSchedule(int(value))
+    raise ValueError(f"Bilinmeyen tekrar türü: '{spec}'")
+
+
+def next_fire(spec, previous_due, now=None):
+    """Next due time after now for a schedule that last fell due at previous_due"""
+    now = now or datetime.now()
+    schedule = load_schedule(spec)
+    if isinstance(schedule, IntervalSchedule):
+        return schedule.next_after(now, anchor=previous_due)
+    return schedule.next_after(max(now, previous_due))
+
+
+def missed_occurrences(spec, previous_due, now=None, cap=MAX_CATCH_UP):
+    """How many occurrences fell due between previous_due and now (counted up to cap)"""
+    now = now or datetime.now()
+    if previous_due > now:
+        return 0
+    schedule = load_schedule(spec)
+    if isinstance(schedule, IntervalSchedule):
+        return min(cap, int((now - previous_due).total_seconds() // schedule.seconds) + 1)
+    count = 1
+    due = previous_due
+    while count < cap:
+        due = schedule.next_after(due)
+        if due is None or due > now:
+            break
+        count += 1
+    return count
+
+
+def parse_recurrence(text):
+    """
+    Parse a spoken schedule into a spec string (None if not recurring).
+
+    Examples: 'her gün 08:30', 'hafta içi 9:00', 'her pazartesi 10:00',
+    'her 15 dakikada', 'every 2 hours', 'daily 7:15', 'cron: */5 * * * *'
+    """
+    text_lower = text.lower().strip()
+
+    match = re.match(r'^cron\s*:?\s*(.+)$', text_lower)
+    if match:
+        expression = match.group(1).strip()
+        CronSchedule(expression)  # validate
+        return f"cron:{expression}"
+
+    match = re.search(r'(?:her|every)\s+(\d+)\s*(saniye|second|dakika|minute|min|saat|hour)', text_lower)
+    if match:
+        amount = int(match.group(1))
+        unit = match.group(2)
+        if unit in ('saniye', 'second'):
+            seconds = amount
+        elif unit in ('dakika', 'minute', 'min'):
+            seconds = amount * 60
+        else:
+            seconds = amount * 3600
+        return f"every:{seconds}"
+
+    time_match = re.search(_TIME_PATTERN + r'\s*$', text_lower) or re.search(_TIME_PATTERN, text_lower)
+    if not time_match:
+        return None
+    hour = int(time_match.group(1))
+    minute = int(time_match.group(2) or 0)
+    if hour > 23 or minute > 59:
+        return None
+
+    if re.search(r'hafta\s*içi|weekdays?', text_lower):
+        return f"cron:{minute} {hour} * * 1-5"
+    if re.search(r'hafta\s*sonu|weekends?', text_lower):
+        return f"cron:{minute} {hour} * * 0,6"
+    for name, weekday in _DAY_NAMES.items():
+        if re.search(rf'(?:her|every)\s+{name}\b', text_lower):
+            return f"cron:{minute} {hour} * * {weekday}"
+    if re.search(r'her\s*gün|daily|every\s*day|hergün', text_lower):
+        return f"cron:{minute} {hour} * * *"
+    return None
+
+
+def describe(spec):
+    """Short Turkish description of a spec for listings"""
+    kind, _, value = spec.partition(':')
+    if kind == 'every':
+        seconds = int(value)
+        if seconds % 3600 == 0:
+            return f"her {seconds // 3600} saatte"
+        if seconds % 60 == 0:
+            return f"her {seconds // 60} dakikada"
+        return f"her {seconds} saniyede"
+    fields = value.split()
+    if len(fields) == 5 and fields[2] == '*' and fields[3] == '*' and fields[0].isdigit() and fields[1].isdigit():
+        time_str = f"{int(fields[1]):02d}:{int(fields[0]):02d}"
+        if fields[4] == '*':
+            return f"her gün {time_str}"
+        if fields[4] == '1-5':
+            return f"hafta içi {time_str}"
+        if fields[4] == '0,6':
+            return f"hafta sonu {time_str}"
+    return f"cron {value}"
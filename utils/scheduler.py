@@ -0,0 +1,137 @@
+"""
+Single-thread timer service for reminders and timers
+
+All pending timers live in one min-heap ordered by wall-clock due time and
+are served by one daemon thread, instead of one sleeping thread per timer.
+Cancellation marks the heap entry dead (lazy deletion) so both schedule and
+cancel stay O(log n).
+"""
+import heapq
+import itertools
+import threading
+import time
+from datetime import datetime
+
+
+# Upper bound on a single wait, so wall-clock jumps (sleep/resume, NTP
+# corrections) are noticed and due times are re-evaluated
+MAX_SLEEP = 5.0
+
+
+class _Entry:
+    __slots__ = ('due', 'seq', 'key', 'callback', 'args', 'cancelled')
+
+    def __init__(self, due, seq, key, callback, args):
+        self.due = due
+        self.seq = seq
+        self.key = key
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def __lt__(self, other):
+        return (self.due, self.seq) < (other.due, other.seq)
+
+
+class TimerService:
+    """Min-heap scheduler running callbacks on one background thread"""
+
+    def __init__(self):
+        self._heap = []
+        self._entries = {}
+        self._seq = itertools.count()
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._thread = None
+        self._dead = 0
+
+    def schedule(self, when, callback, *args, key=None):
+        """
+        Run callback(*args) at `when` (datetime or epoch seconds).
+
+        Scheduling an existing key replaces that timer. Returns the key.
+        Callbacks run on the scheduler thread and should return quickly.
+        """
+        due = when.timestamp() if isinstance(when, datetime) else float(when)
+        with self._cond:
+            if key is None:
+                key = next(self._ids)
+            else:
+                self._cancel_locked(key)
+            entry = _Entry(due, next(self._seq), key, callback, args)
+            self._entries[key] = entry
+            heapq.heappush(self._heap, entry)
+            self._ensure_thread()
+            # Wake the loop only if the new timer is now the earliest
+            if self._heap[0] is entry:
+                self._cond.notify()
+        return key
+
+    def schedule_in(self, seconds, callback, *args, key=None):
+        """Run callback(*args) after `seconds`"""
+        return self.schedule(time.time() + seconds, callback, *args, key=key)
+
+    def cancel(self, key):
+        """Cancel a pending timer; returns True if it was pending"""
+        with self._cond:
+            return self._cancel_locked(key)
+
+    def _cancel_locked(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        entry.cancelled = True
+        self._dead += 1
+        # Drop dead entries once they dominate the heap
+        if self._dead > 64 and self._dead > len(self._heap) // 2:
+            self._heap = [e for e in self._heap if not e.cancelled]
+            heapq.heapify(self._heap)
+            self._dead = 0
+        return True
+
+    def is_pending(self, key):
+        with self._cond:
+            return key in self._entries
+
+    def pending(self):
+        """[(key, due_epoch)] of pending timers, earliest first"""
+        with self._cond:
+            return sorted(((e.key, e.due) for e in self._entries.values()), key=lambda item: item[1])
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, daemon=True, name="TimerService")
+            self._thread.start()
+
+    def _pop_due(self):
+        """Wait for and pop the next due entry (called with the lock held)"""
+        while True:
+            while self._heap and self._heap[0].cancelled:
+                heapq.heappop(self._heap)
+                self._dead -= 1
+            if not self._heap:
+                self._cond.wait()
+                continue
+            # Re-read the wall clock on every wakeup: corrects for drift and jumps
+            remaining = self._heap[0].due - time.time()
+            if remaining <= 0:
+                entry = heapq.heappop(self._heap)
+                self._entries.pop(entry.key, None)
+                return entry
+            self._cond.wait(min(remaining, MAX_SLEEP))
+
+    def _run(self):
+        while True:
+            with self._cond:
+                entry = self._pop_due()
+            try:
+                entry.callback(*entry.args)
+            except Exception as e:
+                print(f"Error in timer callback {entry.key!r}: {e}")
+
+
+# Global timer service
+timer_service = TimerService()
@@ -0,0 +1,577 @@
+"""
+Embedded storage engine for JARVIS (SQLite in WAL mode)
+
+Notes, reminders, scenarios, user profiles and command history all live in a
+single database file. Every thread gets its own connection, writers are
+serialized with BEGIN IMMEDIATE transactions and readers never block writers
+thanks to WAL. Legacy JSON files are imported once on first start.
+"""
+import os
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from utils.text_normalize import fold, tokenize
+
+
+# The repository root unless JARVIS_DATA_DIR says otherwise (tests, benchmarks)
+DATA_DIR = Path(os.environ.get('JARVIS_DATA_DIR') or Path(__file__).parent.parent)
+DB_FILE = DATA_DIR / "jarvis.db"
+
+# Legacy JSON files imported by the one-time migration
+LEGACY_FILES = {
+    'notes': DATA_DIR / "notes.json",
+    'reminders': DATA_DIR / "reminders.json",
+    'scenarios': DATA_DIR / "scenarios.json",
+    'profiles': DATA_DIR / "user_profiles.json",
+    'command_history': DATA_DIR / "command_history.json",
+}
+
+
+def _create_notes_index(conn):
+    """Full-text index over folded note text (contentless FTS5, BM25 ranking)"""
+    try:
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(body, content='', prefix='2 3 4')")
+    except sqlite3.OperationalError as e:
+        print(f"FTS5 not available, note search will scan: {e}")
+        return
+    for row in conn.execute("SELECT id, text FROM notes").fetchall():
+        conn.execute("INSERT INTO notes_fts (rowid, body) VALUES (?, ?)", (row['id'], fold(row['text'])))
+
+
+# Schema migrations (SQL scripts or callables), applied in order and tracked
+# with PRAGMA user_version
+MIGRATIONS = [
+    """
+    CREATE TABLE IF NOT EXISTS notes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        text TEXT NOT NULL,
+        timestamp TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_notes_timestamp ON notes(timestamp);
+
+    CREATE TABLE IF NOT EXISTS reminders (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        message TEXT NOT NULL,
+        time TEXT NOT NULL,
+        created TEXT NOT NULL,
+        active INTEGER NOT NULL DEFAULT 1
+    );
+    CREATE INDEX IF NOT EXISTS idx_reminders_active_time ON reminders(active, time);
+
+    CREATE TABLE IF NOT EXISTS scenarios (
+        key TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        tasks TEXT NOT NULL,
+        created_at TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS profiles (
+        key TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        settings TEXT NOT NULL,
+        created_at TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS command_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        command TEXT NOT NULL,
+        command_key TEXT NOT NULL,
+        success INTEGER NOT NULL,
+        response TEXT,
+        timestamp TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_history_timestamp ON command_history(timestamp);
+    CREATE INDEX IF NOT EXISTS idx_history_command_key ON command_history(command_key);
+
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+    """,
+    _create_notes_index,
+    """
+    ALTER TABLE reminders ADD COLUMN recurrence TEXT;
+    """,
+]
+
+MAX_HISTORY = 1000
+
+
+def _split_statements(script):
+    """Split a SQL script into complete statements (trigger bodies stay intact)"""
+    statements = []
+    current = ''
+    for line in script.splitlines(keepends=True):
+        current += line
+        if sqlite3.complete_statement(current):
+            statements.append(current.strip())
+            current = ''
+    if current.strip():
+        statements.append(current.strip())
+    return statements
+
+
+class Storage:
+    """Thread-safe SQLite storage with per-thread connections"""
+
+    def __init__(self, path=DB_FILE):
+        self.path = Path(path)
+        self._local = threading.local()
+        self._write_lock = threading.RLock()
+        self._init_lock = threading.RLock()
+        self._initialized = False
+        self._initializing = False
+        self.fts_available = False
+
+        self.notes = NotesRepository(self)
+        self.reminders = RemindersRepository(self)
+        self.scenarios = ScenariosRepository(self)
+        self.profiles = ProfilesRepository(self)
+        self.command_history = CommandHistoryRepository(self)
+
+    def _connect(self):
+        """Open a new connection configured for concurrent access"""
+        conn = sqlite3.connect(str(self.path), timeout=10, isolation_level=None,
+                               check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=10000")
+        return conn
+
+    def connection(self):
+        """Get the connection of the current thread (created on first use)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.depth = 0
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized and not self._initializing:
+                    self._initializing = True
+                    try:
+                        self._initialize(conn)
+                        self._initialized = True
+                    finally:
+                        self._initializing = False
+        return conn
+
+    def _initialize(self, conn):
+        """Apply schema migrations and import legacy JSON files (once)"""
+        with self.transaction():
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for index, migration in enumerate(MIGRATIONS[version:], start=version):
+                if callable(migration):
+                    migration(conn)
+                else:
+                    for statement in _split_statements(migration):
+                        conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {index + 1}")
+            self.fts_available = self._has_table(conn, 'notes_fts')
+        try:
+            self._import_legacy_json()
+        except Exception as e:
+            print(f"Error importing legacy JSON data: {e}")
+
+    @contextmanager
+    def transaction(self):
+        """Run statements in a single write transaction (re-entrant per thread)"""
+        conn = self.connection()
+        with self._write_lock:
+            if self._local.depth == 0:
+                conn.execute("BEGIN IMMEDIATE")
+            self._local.depth += 1
+            try:
+                yield conn
+            except BaseException:
+                self._local.depth -= 1
+                if self._local.depth == 0:
+                    conn.execute("ROLLBACK")
+                raise
+            else:
+                self._local.depth -= 1
+                if self._local.depth == 0:
+                    conn.execute("COMMIT")
+
+    def query(self, sql, params=()):
+        """Run a read query and return rows as dicts"""
+        return [dict(row) for row in self.connection().execute(sql, params)]
+
+    def query_one(self, sql, params=()):
+        """Run a read query and return the first row as dict (or None)"""
+        row = self.connection().execute(sql, params).fetchone()
+        return dict(row) if row is not None else None
+
+    @staticmethod
+    def _has_table(conn, name):
+        row = conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).fetchone()
+        return row is not None
+
+    def get_meta(self, key, default=None):
+        """Get a value from the meta table"""
+        row = self.query_one("SELECT value FROM meta WHERE key = ?", (key,))
+        return row['value'] if row else default
+
+    def set_meta(self, key, value):
+        """Set a value in the meta table"""
+        with self.transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def close(self):
+        """Close the connection of the current thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _import_legacy_json(self):
+        """One-time migration from the old per-feature JSON files"""
+        importers = {
+            'notes': self.notes._import_legacy,
+            'reminders': self.reminders._import_legacy,
+            'scenarios': self.scenarios._import_legacy,
+            'profiles': self.profiles._import_legacy,
+            'command_history': self.command_history._import_legacy,
+        }
+        for name, importer in importers.items():
+            legacy_file = LEGACY_FILES[name]
+            meta_key = f"legacy_import.{name}"
+            if not legacy_file.exists() or self.get_meta(meta_key):
+                continue
+            try:
+                with open(legacy_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                with self.transaction() as conn:
+                    importer(conn, data)
+                    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                                 (meta_key, datetime.now().isoformat()))
+                legacy_file.rename(legacy_file.with_suffix('.json.migrated'))
+                print(f"Migrated {legacy_file.name} to {self.path.name}")
+            except Exception as e:
+                print(f"Error migrating {legacy_file.name}: {e}")
+
+
+def _with_legacy_ids(conn, table, items):
+    """
+    (id, item) pairs for importing legacy JSON items under their old ids, so
+    "not 5" still means the same note. An id that is missing, invalid or
+    already taken (the old files numbered items len + 1) gets a new one; such
+    items come last, so new ids are allocated after the kept ones.
+    """
+    used = {row[0] for row in conn.execute(f"SELECT id FROM {table}")}
+    kept, renumbered = [], []
+    for item in items:
+        item_id = item.get('id')
+        if isinstance(item_id, int) and not isinstance(item_id, bool) and item_id > 0 and item_id not in used:
+            used.add(item_id)
+            kept.append((item_id, item))
+        else:
+            renumbered.append((None, item))
+    return kept + renumbered
+
+
+class NotesRepository:
+    """Notes table access with a full-text index kept in the same transaction"""
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def _insert(self, conn, text, timestamp, note_id=None):
+        # A NULL id is allocated by SQLite
+        cursor = conn.execute("INSERT INTO notes (id, text, timestamp) VALUES (?, ?, ?)",
+                              (note_id, text, timestamp))
+        if self.storage.fts_available:
+            conn.execute("INSERT INTO notes_fts (rowid, body) VALUES (?, ?)", (cursor.lastrowid, fold(text)))
+        return cursor.lastrowid
+
+    def add(self, text, timestamp=None):
+        """Insert a note and return it"""
+        timestamp = timestamp or datetime.now().isoformat()
+        with self.storage.transaction() as conn:
+            note_id = self._insert(conn, text, timestamp)
+        return {'id': note_id, 'text': text, 'timestamp': timestamp}
+
+    def recent(self, limit=5):
+        """Most recent notes, oldest first"""
+        rows = self.storage.query("SELECT * FROM notes ORDER BY id DESC LIMIT ?", (limit,))
+        return list(reversed(rows))
+
+    def get(self, note_id):
+        return self.storage.query_one("SELECT * FROM notes WHERE id = ?", (note_id,))
+
+    def delete(self, note_id):
+        """Delete a note, returns True if a row was removed"""
+        with self.storage.transaction() as conn:
+            row = conn.execute("SELECT text FROM notes WHERE id = ?", (note_id,)).fetchone()
+            if row is None:
+                return False
+            conn.execute("DELETE FROM notes WHERE id = ?", (note_id,))
+            if self.storage.fts_available:
+                conn.execute("INSERT INTO notes_fts (notes_fts, rowid, body) VALUES ('delete', ?, ?)",
+                             (note_id, fold(row['text'])))
+        return True
+
+    def count(self):
+        return self.storage.query_one("SELECT COUNT(*) AS n FROM notes")['n']
+
+    def search(self, query, limit=10):
+        """
+        Full-text search, best matches first (BM25)
+        
+        Every query word is a prefix match on the case/diacritic-folded text,
+        so 'toplanti' finds 'Toplantıya' and 'ISTANBUL' finds 'İstanbul'.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+        self.storage.connection()  # make sure the schema (and fts_available) is initialized
+        if not self.storage.fts_available:
+            return self._scan(terms, limit)
+        match = ' '.join(f'"{term}"*' for term in terms)
+        return self.storage.query(
+            "SELECT notes.*, bm25(notes_fts) AS score FROM notes_fts "
+            "JOIN notes ON notes.id = notes_fts.rowid "
+            "WHERE notes_fts MATCH ? ORDER BY score LIMIT ?",
+            (match, limit)
+        )
+
+    def _scan(self, terms, limit):
+        """Fallback search when FTS5 is not compiled into SQLite"""
+        results = []
+        for note in self.storage.query("SELECT * FROM notes"):
+            words = tokenize(note['text'])
+            hits = [sum(1 for word in words if word.startswith(term)) for term in terms]
+            if all(hits):
+                note['score'] = -sum(hits) / (len(words) or 1)
+                results.append(note)
+        results.sort(key=lambda note: note['score'])
+        return results[:limit]
+
+    def _import_legacy(self, conn, data):
+        for note_id, note in _with_legacy_ids(conn, 'notes', data):
+            self._insert(conn, note.get('text', ''), note.get('timestamp') or datetime.now().isoformat(), note_id)
+
+
+class RemindersRepository:
+    """Reminders table access"""
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    @staticmethod
+    def _to_dict(row):
+        if row is None:
+            return None
+        row['active'] = bool(row['active'])
+        return row
+
+    def add(self, message, time, created=None, active=True, recurrence=None):
+        """Insert a reminder and return it (recurrence: spec from utils.recurrence)"""
+        created = created or datetime.now().isoformat()
+        with self.storage.transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO reminders (message, time, created, active, recurrence) VALUES (?, ?, ?, ?, ?)",
+                (message, time, created, int(active), recurrence)
+            )
+        return {'id': cursor.lastrowid, 'message': message, 'time': time,
+                'created': created, 'active': active, 'recurrence': recurrence}
+
+    def get(self, reminder_id):
+        return self._to_dict(self.storage.query_one("SELECT * FROM reminders WHERE id = ?", (reminder_id,)))
+
+    def list(self, active_only=True, limit=None):
+        """List reminders ordered by fire time"""
+        sql = "SELECT * FROM reminders"
+        if active_only:
+            sql += " WHERE active = 1"
+        sql += " ORDER BY time"
+        params = ()
+        if limit is not None:
+            sql += " LIMIT ?"
+            params = (limit,)
+        return [self._to_dict(row) for row in self.storage.query(sql, params)]
+
+    def count(self, active_only=True):
+        sql = "SELECT COUNT(*) AS n FROM reminders"
+        if active_only:
+            sql += " WHERE active = 1"
+        return self.storage.query_one(sql)['n']
+
+    def deactivate(self, reminder_id):
+        """Mark a reminder as done; returns True if it was still active"""
+        with self.storage.transaction() as conn:
+            cursor = conn.execute("UPDATE reminders SET active = 0 WHERE id = ? AND active = 1", (reminder_id,))
+        return cursor.rowcount > 0
+
+    def reschedule(self, reminder_id, time):
+        """Move an active (recurring) reminder to its next fire time; False if gone"""
+        with self.storage.transaction() as conn:
+            cursor = conn.execute("UPDATE reminders SET time = ? WHERE id = ? AND active = 1", (time, reminder_id))
+        return cursor.rowcount > 0
+
+    def delete(self, reminder_id):
+        with self.storage.transaction() as conn:
+            cursor = conn.execute("DELETE FROM reminders WHERE id = ?", (reminder_id,))
+        return cursor.rowcount > 0
+
+    def _import_legacy(self, conn, data):
+        for reminder_id, reminder in _with_legacy_ids(conn, 'reminders', data):
+            conn.execute(
+                "INSERT INTO reminders (id, message, time, created, active) VALUES (?, ?, ?, ?, ?)",
+                (reminder_id, reminder.get('message', ''), reminder['time'],
+                 reminder.get('created') or datetime.now().isoformat(),
+                 int(reminder.get('active', True)))
+            )
+
+
+class ScenariosRepository:
+    """Scenarios table access (keyed by lower-case name)"""
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    @staticmethod
+    def _to_dict(row):
+        if row is None:
+            return None
+        return {'name': row['name'], 'tasks': json.loads(row['tasks']), 'created_at': row['created_at']}
+
+    def get(self, key):
+        return self._to_dict(self.storage.query_one("SELECT * FROM scenarios WHERE key = ?", (key.lower(),)))
+
+    def all(self):
+        """All scenarios as {key: scenario}"""
+        rows = self.storage.query("SELECT * FROM scenarios ORDER BY key")
+        return {row['key']: self._to_dict(row) for row in rows}
+
+    def put(self, key, scenario):
+        with self.storage.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO scenarios (key, name, tasks, created_at) VALUES (?, ?, ?, ?)",
+                (key.lower(), scenario['name'], json.dumps(scenario.get('tasks', []), ensure_ascii=False),
+                 scenario.get('created_at'))
+            )
+
+    def put_if_missing(self, key, scenario):
+        """Insert a scenario only when the key is free; returns True if inserted"""
+        with self.storage.transaction() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO scenarios (key, name, tasks, created_at) VALUES (?, ?, ?, ?)",
+                (key.lower(), scenario['name'], json.dumps(scenario.get('tasks', []), ensure_ascii=False),
+                 scenario.get('created_at'))
+            )
+        return cursor.rowcount > 0
+
+    def delete(self, key):
+        with self.storage.transaction() as conn:
+            cursor = conn.execute("DELETE FROM scenarios WHERE key = ?", (key.lower(),))
+        return cursor.rowcount > 0
+
+    def _import_legacy(self, conn, data):
+        for key, scenario in data.items():
+            conn.execute(
+                "INSERT OR REPLACE INTO scenarios (key, name, tasks, created_at) VALUES (?, ?, ?, ?)",
+                (key.lower(), scenario.get('name', key), json.dumps(scenario.get('tasks', []), ensure_ascii=False),
+                 scenario.get('created_at'))
+            )
+
+
+class ProfilesRepository:
+    """User profiles table access (keyed by lower-case name)"""
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    @staticmethod
+    def _to_dict(row):
+        if row is None:
+            return None
+        return {'name': row['name'], 'settings': json.loads(row['settings']), 'created_at': row['created_at']}
+
+    def get(self, key):
+        return self._to_dict(self.storage.query_one("SELECT * FROM profiles WHERE key = ?", (key.lower(),)))
+
+    def all(self):
+        rows = self.storage.query("SELECT * FROM profiles ORDER BY key")
+        return {row['key']: self._to_dict(row) for row in rows}
+
+    def put(self, key, profile):
+        with self.storage.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO profiles (key, name, settings, created_at) VALUES (?, ?, ?, ?)",
+                (key.lower(), profile['name'], json.dumps(profile.get('settings', {}), ensure_ascii=False),
+                 profile.get('created_at'))
+            )
+
+    def delete(self, key):
+        with self.storage.transaction() as conn:
+            cursor = conn.execute("DELETE FROM profiles WHERE key = ?", (key.lower(),))
+        return cursor.rowcount > 0
+
+    def _import_legacy(self, conn, data):
+        for key, profile in data.items():
+            conn.execute(
+                "INSERT OR REPLACE INTO profiles (key, name, settings, created_at) VALUES (?, ?, ?, ?)",
+                (key.lower(), profile.get('name', key), json.dumps(profile.get('settings', {}), ensure_ascii=False),
+                 profile.get('created_at'))
+            )
+
+
+class CommandHistoryRepository:
+    """Command history table access (capped at MAX_HISTORY rows)"""
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def add(self, command, success=True, response="", timestamp=None):
+        timestamp = timestamp or datetime.now().isoformat()
+        with self.storage.transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO command_history (command, command_key, success, response, timestamp) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (command, command.lower(), int(bool(success)), response, timestamp)
+            )
+            conn.execute("DELETE FROM command_history WHERE id <= ?", (cursor.lastrowid - MAX_HISTORY,))
+
+    def count(self):
+        return self.storage.query_one("SELECT COUNT(*) AS n FROM command_history")['n']
+
+    def success_count(self):
+        return self.storage.query_one("SELECT COUNT(*) AS n FROM command_history WHERE success = 1")['n']
+
+    def most_common(self, limit=5):
+        """[(command_key, count)] ordered by frequency"""
+        rows = self.storage.query(
+            "SELECT command_key, COUNT(*) AS n FROM command_history "
+            "GROUP BY command_key ORDER BY n DESC, MAX(id) DESC LIMIT ?",
+            (limit,)
+        )
+        return [(row['command_key'], row['n']) for row in rows]
+
+    def since(self, cutoff, limit=10):
+        """Most recent commands newer than cutoff (datetime), oldest first"""
+        rows = self.storage.query(
+            "SELECT * FROM command_history WHERE timestamp >= ? ORDER BY id DESC LIMIT ?",
+            (cutoff.isoformat(), limit)
+        )
+        for row in rows:
+            row['success'] = bool(row['success'])
+        return list(reversed(rows))
+
+    def _import_legacy(self, conn, data):
+        for cmd in data[-MAX_HISTORY:]:
+            command = cmd.get('command', '')
+            conn.execute(
+                "INSERT INTO command_history (command, command_key, success, response, timestamp) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (command, command.lower(), int(bool(cmd.get('success', False))),
+                 cmd.get('response', ''), cmd.get('timestamp') or datetime.now().isoformat())
+            )
+
+
+# Global storage instance
+storage = Storage()
@@ -0,0 +1,80 @@
+"""
+Turkish-aware text normalization for search and matching
+"""
+import re
+import unicodedata
+
+
+# Turkish dotted/dotless I need explicit handling: str.lower() maps 'I' to 'i'
+# and 'İ' to 'i' + combining dot, both wrong for Turkish text.
+_TURKISH_UPPER_MAP = str.maketrans({'İ': 'i', 'I': 'ı'})
+_TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def turkish_lower(text):
+    """Lower-case text using Turkish rules for I/İ"""
+    return text.translate(_TURKISH_UPPER_MAP).lower()
+
+
+def fold(text):
+    """Case- and diacritic-insensitive form ('İSTANBUL'de Şoför' -> 'istanbul'de sofor')"""
+    text = turkish_lower(text).replace('ı', 'i')
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text):
+    """Folded word tokens of text"""
+    return _TOKEN_PATTERN.findall(fold(text))
+
+
+_SENTENCE_END = re.compile(r'(?<=[.!?…])\s+|\n+')
+_CLAUSE_END = re.compile(r'(?<=[,;])\s+')
+_LIST_MARKER = re.compile(r'\d+\.')
+_LIST_START = re.compile(r'\d+\.\s')
+
+
+def split_sentences(text, min_length=20, max_length=250):
+    """
+    Split text into speakable sentences.
+
+    Fragments shorter than min_length (list numbers, abbreviations) are
+    joined to the next one; sentences longer than max_length are split at
+    commas where possible. A list marker ("1.") after a finished sentence
+    starts a new one instead of trailing the previous sentence.
+    """
+    sentences = []
+    pending = ''
+    for part in _SENTENCE_END.split(text.strip()):
+        part = part.strip()
+        if not part:
+            continue
+        if pending and _LIST_MARKER.fullmatch(part) and pending[-1] in '.!?…:':
+            sentences.extend(_split_long(pending, max_length))
+            pending = ''
+        pending = f"{pending} {part}" if pending else part
+        if len(pending) >= min_length:
+            sentences.extend(_split_long(pending, max_length))
+            pending = ''
+    if pending:
+        if sentences and len(pending) < min_length and not _LIST_START.match(pending):
+            sentences[-1] = f"{sentences[-1]} {pending}"
+        else:
+            sentences.append(pending)
+    return sentences
+
+
+def _split_long(sentence, max_length):
+    if len(sentence) <= max_length:
+        return [sentence]
+    pieces = []
+    current = ''
+    for clause in _CLAUSE_END.split(sentence):
+        if current and len(current) + len(clause) + 1 > max_length:
+            pieces.append(current)
+            current = clause
+        else:
+            current = f"{current} {clause}" if current else clause
+    if current:
+        pieces.append(current)
+    return pieces